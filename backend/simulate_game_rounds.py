@@ -1,14 +1,37 @@
-import requests
+"""Load generator for /api/solve_tsp.
+
+    python simulate_game_rounds.py --rounds 200 --concurrency 8 --cities 3 5 7 9
+    python simulate_game_rounds.py --url http://127.0.0.1:5000 --format csv --output rounds.csv
+
+Without --url the rounds run against the app in-process through Flask's test client, so no
+server has to be running. Reports request latency and each algorithm's solver time as
+p50 / p95 / p99 plus throughput, as JSON (summary and rounds) or CSV (one row per round,
+summary on stderr).
+"""
+import argparse
+import contextlib
+import csv
+import json
+import logging
 import random
+import sys
+import threading
 import time
-import csv
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+SOLVE_PATH = "/api/solve_tsp"
+# City names are single letters, so a map holds at most 26 cities
+MAX_MAP_SIZE = 26
+PERCENTILES = (50, 95, 99)
 
-API_URL = "http://127.0.0.1:5000/api/solve_tsp"
 
 def generate_city_list(n=10):
     return [{'id': i, 'name': chr(65 + i)} for i in range(n)]
 
-def generate_distance_matrix(n=10, min_km=50, max_km=100):
+
+def generate_distance_matrix(n=10, min_km=50, max_km=100, rng=random):
     matrix = {}
     for i in range(n):
         matrix[i] = {}
@@ -18,75 +41,193 @@ def generate_distance_matrix(n=10, min_km=50, max_km=100):
             elif j in matrix and i in matrix[j]:
                 matrix[i][j] = matrix[j][i]
             else:
-                matrix[i][j] = round(random.uniform(min_km, max_km), 2)
+                matrix[i][j] = round(rng.uniform(min_km, max_km), 2)
     return matrix
 
-def simulate_game_round(round_number):
-    NUM_SELECTED_CITIES = 5  # fixed number of cities to visit (excluding home)
-    all_cities = generate_city_list()
-    distance_matrix = generate_distance_matrix()
-
-    all_city_ids = list(range(10))
-    home_index = random.choice(all_city_ids)
-
-    # Select cities to visit, excluding home
-    remaining_ids = [i for i in all_city_ids if i != home_index]
-    selected_city_ids = random.sample(remaining_ids, NUM_SELECTED_CITIES)
-
-    visited_chars = [chr(65 + city_id) for city_id in selected_city_ids]
-    home_char = chr(65 + home_index)
 
+def generate_round(round_number, num_selected, map_size, seed, algorithms=None):
+    """The payload of one game round: a random map, home city and `num_selected` cities to visit."""
+    rng = random.Random(seed * 1_000_003 + round_number)
+    home_index = rng.randrange(map_size)
+    remaining_ids = [i for i in range(map_size) if i != home_index]
+    selected_city_ids = rng.sample(remaining_ids, num_selected)
     payload = {
         "player_name": f"Tester_{round_number}",
-        "home_city": home_char,
-        "human_route": visited_chars,
-        "cities": all_cities,
-        "distances": distance_matrix
+        "home_city": chr(65 + home_index),
+        "human_route": [chr(65 + city_id) for city_id in selected_city_ids],
+        "cities": generate_city_list(map_size),
+        "distances": generate_distance_matrix(map_size, rng=rng),
     }
-
+    if algorithms:
+        payload["algorithms"] = algorithms
+    return payload
+
+
+class HTTPTarget:
+    """Posts rounds to a running server."""
+
+    def __init__(self, base_url, timeout=120.0):
+        import requests
+        self.url = base_url.rstrip("/") + SOLVE_PATH
+        self.timeout = timeout
+        self._local = threading.local()
+        self._requests = requests
+
+    def post(self, payload):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self._requests.Session()
+        response = session.post(self.url, json=payload, timeout=self.timeout)
+        return response.status_code, response.json()
+
+
+class InProcessTarget:
+    """Posts rounds to the Flask app in this process; one test client per thread."""
+
+    def __init__(self):
+        # Importing the app prints database setup messages; keep stdout for the report
+        with contextlib.redirect_stdout(sys.stderr):
+            from app import app
+        self.app = app
+        self._local = threading.local()
+
+    def post(self, payload):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.post(SOLVE_PATH, json=payload)
+        return response.status_code, response.get_json()
+
+
+def play_round(target, round_number, payload):
+    record = {"round": round_number, "cities": len(payload["human_route"])}
+    start_time = time.perf_counter()
     try:
-        response = requests.post(API_URL, json=payload)
-        response.raise_for_status()
-        data = response.json()
-        return {
-            "Round": round_number,
-            "NumCities": NUM_SELECTED_CITIES,
-            "NN_Time": round(data["nearest_neighbor"]["time"] * 1000, 2),
-            "BB_Time": round(data["branch_bound"]["time"] * 1000, 2),
-            "HK_Time": round(data["held_karp"]["time"] * 1000, 2),
-            "NN_Distance": round(data["nearest_neighbor"]["distance"], 2),
-            "BB_Distance": round(data["branch_bound"]["distance"], 2),
-            "HK_Distance": round(data["held_karp"]["distance"], 2),
-            "Human_Distance": round(data["human_route"]["distance"], 2),
-        }
+        status_code, data = target.post(payload)
     except Exception as e:
-        print(f"[ERROR] Round {round_number} failed: {e}")
-        return None
+        record.update(latency_ms=(time.perf_counter() - start_time) * 1000, ok=False, error=str(e))
+        return record
+    record["latency_ms"] = (time.perf_counter() - start_time) * 1000
+    record["ok"] = status_code == 200
+    if not record["ok"]:
+        record["error"] = (data or {}).get("error", f"HTTP {status_code}")
+        return record
+    record["algorithms"] = {
+        name: {"time_ms": result["time"] * 1000, "distance": result["distance"], "status": result.get("status")}
+        for name, result in data.items()
+        if isinstance(result, dict) and "time" in result and "route" in result and result["time"] is not None
+    }
+    return record
 
-def main():
-    results = []
-    print("Starting simulation of 10 game rounds...\n")
 
-    for i in range(1, 11):
-        print(f"Running round {i}...")
-        result = simulate_game_round(i)
-        if result:
-            results.append(result)
+def run_load(target, rounds, concurrency, city_counts, map_size, seed=0, algorithms=None):
+    """Play `rounds` rounds (cycling through `city_counts`) with `concurrency` rounds in flight.
+    Returns (records in round order, wall-clock seconds)."""
+    payloads = [
+        generate_round(number, city_counts[(number - 1) % len(city_counts)], map_size, seed, algorithms)
+        for number in range(1, rounds + 1)
+    ]
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(play_round, target, number, payload) for number, payload in enumerate(payloads, 1)]
+        records = [future.result() for future in futures]
+    return records, time.perf_counter() - start_time
 
-    print("\nSimulation complete.\n")
 
-    # Output results
-    for row in results:
-        print(row)
+def _percentiles(values):
+    if not values:
+        return None
+    points = np.percentile(values, PERCENTILES)
+    summary = {f"p{p}": round(float(v), 3) for p, v in zip(PERCENTILES, points)}
+    summary["mean"] = round(float(np.mean(values)), 3)
+    summary["count"] = len(values)
+    return summary
+
+
+def summarize(records, wall_time):
+    ok = [record for record in records if record["ok"]]
+    per_algorithm = {}
+    for record in ok:
+        for name, result in record["algorithms"].items():
+            per_algorithm.setdefault(name, []).append(result["time_ms"])
+    per_cities = {}
+    for record in ok:
+        per_cities.setdefault(record["cities"], []).append(record["latency_ms"])
+    return {
+        "rounds": len(records),
+        "errors": len(records) - len(ok),
+        "wall_time_s": round(wall_time, 3),
+        "throughput_rps": round(len(ok) / wall_time, 3) if wall_time > 0 else None,
+        "request_latency_ms": _percentiles([record["latency_ms"] for record in ok]),
+        "request_latency_ms_by_cities": {str(n): _percentiles(v) for n, v in sorted(per_cities.items())},
+        "solver_time_ms": {name: _percentiles(values) for name, values in sorted(per_algorithm.items())},
+    }
+
 
-    # Save to CSV
-    if results:
-        with open("game_rounds_data.csv", "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=results[0].keys())
-            writer.writeheader()
-            writer.writerows(results)
+def write_csv(records, stream):
+    names = sorted({name for record in records for name in record.get("algorithms", {})})
+    fieldnames = ["round", "cities", "ok", "latency_ms", "error"]
+    for name in names:
+        fieldnames += [f"{name}_time_ms", f"{name}_distance", f"{name}_status"]
+    writer = csv.DictWriter(stream, fieldnames=fieldnames)
+    writer.writeheader()
+    for record in records:
+        row = {key: record.get(key) for key in ("round", "cities", "ok", "error")}
+        row["latency_ms"] = round(record["latency_ms"], 3)
+        for name, result in record.get("algorithms", {}).items():
+            row[f"{name}_time_ms"] = round(result["time_ms"], 3)
+            row[f"{name}_distance"] = result["distance"]
+            row[f"{name}_status"] = result["status"]
+        writer.writerow(row)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test /api/solve_tsp with simulated game rounds.")
+    parser.add_argument("--rounds", type=int, default=50, help="Number of rounds to play")
+    parser.add_argument("--concurrency", type=int, default=4, help="Rounds in flight at once")
+    parser.add_argument("--cities", type=int, nargs="+", default=[3, 5, 7, 9],
+                        help="Cities to visit per round (excluding home); rounds cycle through these")
+    parser.add_argument("--map-size", type=int, default=10, help=f"Cities on each map (at most {MAX_MAP_SIZE})")
+    parser.add_argument("--algorithms", nargs="+", help="Algorithms to request (default: the server's default set)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the generated rounds")
+    parser.add_argument("--url", help="Base URL of a running server, e.g. http://127.0.0.1:5000 (default: in-process)")
+    parser.add_argument("--format", choices=("json", "csv"), default="json", help="Report format")
+    parser.add_argument("--output", help="Write the report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if not 2 <= args.map_size <= MAX_MAP_SIZE:
+        parser.error(f"--map-size must be between 2 and {MAX_MAP_SIZE}")
+    if any(not 1 <= n < args.map_size for n in args.cities):
+        parser.error("--cities must be between 1 and map size - 1")
+    if args.rounds < 1 or args.concurrency < 1:
+        parser.error("--rounds and --concurrency must be positive")
+
+    if args.url:
+        target = HTTPTarget(args.url)
+    else:
+        target = InProcessTarget()
+        # The app logs every request at DEBUG; keep the report readable
+        logging.getLogger().setLevel(logging.WARNING)
+
+    records, wall_time = run_load(
+        target, args.rounds, args.concurrency, args.cities, args.map_size, args.seed, args.algorithms
+    )
+    summary = summarize(records, wall_time)
+    summary.update(concurrency=args.concurrency, target=args.url or "in-process", seed=args.seed)
+
+    stream = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        if args.format == "csv":
+            write_csv(records, stream)
+            print(json.dumps(summary, indent=2), file=sys.stderr)
+        else:
+            json.dump({"summary": summary, "rounds": records}, stream, indent=2)
+            stream.write("\n")
+    finally:
+        if args.output:
+            stream.close()
+    return 1 if summary["errors"] else 0
 
-        print("\nSaved results to game_rounds_data.csv")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
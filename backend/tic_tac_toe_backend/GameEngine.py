@@ -1,28 +1,81 @@
+import threading
+from collections import OrderedDict
 import numpy as np
 from tic_tac_toe_backend.GameState import GameState
-from tic_tac_toe_backend.MinMax import minimax
-from tic_tac_toe_backend.MCTS import mcts
+from tic_tac_toe_backend.MinMax import iterative_deepening, AI_MOVE_BUDGET_MS
+from tic_tac_toe_backend.MCTS import mcts, UCTTree
+from tic_tac_toe_backend.TranspositionTable import TranspositionTable
+
+# Longest a request may let the AI think about one move
+MAX_AI_MOVE_BUDGET_MS = 10000
+# Most playouts MCTS runs for one move; the time budget usually stops it first
+MCTS_SIMULATIONS = 20000
+# Game sessions whose search state is kept; the least recently used one is dropped first.
+# A minimax session's table is fixed at TT_SLOTS slots (about 330 KB), about 21 MB for all of them
+MAX_SEARCH_SESSIONS = 64
 
 games = {}
+# Minimax results and MCTS trees per game session, kept between moves; dropped when the game
+# ends or restarts
+transpositions = OrderedDict()
+search_trees = OrderedDict()
+_search_lock = threading.Lock()
 
 def create_game():
     board = np.zeros((5, 5), dtype=int)
     return GameState(board, turn_O=True)
 
+def _session_entry(store, session_id, create):
+    with _search_lock:
+        entry = store.get(session_id)
+        if entry is None:
+            entry = store[session_id] = create()
+            while len(store) > MAX_SEARCH_SESSIONS:
+                store.popitem(last=False)
+        else:
+            store.move_to_end(session_id)
+        return entry
+
+def session_table(session_id):
+    return _session_entry(transpositions, session_id, TranspositionTable)
+
+def session_tree(session_id):
+    return _session_entry(search_trees, session_id, UCTTree)
+
+def session_search(session_id, algorithm):
+    # get_ai_move keyword arguments carrying the session state the algorithm reuses; only that
+    # structure is created
+    if algorithm == "minimax":
+        return {"table": session_table(session_id)}
+    if algorithm == "mcts":
+        return {"tree": session_tree(session_id)}
+    return {}
+
+def reset_session_search(session_id):
+    with _search_lock:
+        transpositions.pop(session_id, None)
+        search_trees.pop(session_id, None)
+
+def validate_time_budget(time_budget_ms):
+    if isinstance(time_budget_ms, bool) or not isinstance(time_budget_ms, (int, float)) \
+            or not 0 < time_budget_ms <= MAX_AI_MOVE_BUDGET_MS:
+        raise ValueError(f"time_budget_ms must be a number between 0 and {MAX_AI_MOVE_BUDGET_MS}.")
+
 def apply_player_move(game, move):
     if game.is_terminal():
         raise ValueError("Game is already over.")
-    if game.board_state[move] != 0:
+    if not game.is_empty(move):
         raise ValueError("Invalid move.")
     return game.get_new_state(move)
 
-def get_ai_move(game, algorithm="minimax"):
+def get_ai_move(game, algorithm="minimax", table=None, time_budget_ms=AI_MOVE_BUDGET_MS, tree=None):
     if game.is_terminal():
         raise ValueError("Game is already over.")
+    validate_time_budget(time_budget_ms)
     if algorithm == "minimax":
-        _, move = minimax(game, depth=4, maximizingPlayer=not game.turn_O)
+        _, move, _ = iterative_deepening(game, not game.turn_O, time_budget_ms, table=table)
     elif algorithm == "mcts":
-        _, move = mcts(game, simulations=1000)
+        _, move = mcts(game, simulations=MCTS_SIMULATIONS, time_budget_ms=time_budget_ms, tree=tree)
     else:
         raise ValueError("Unknown algorithm.")
     if move is None:
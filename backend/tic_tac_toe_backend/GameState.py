@@ -1,92 +1,127 @@
+from functools import lru_cache
 import numpy as np
 
+
+@lru_cache(maxsize=None)
+def win_masks(size, win_length):
+    # Every run of win_length cells in a row, column or diagonal, as a bitmask over
+    # the board (bit x * size + y is cell (x, y))
+    masks = []
+    for x in range(size):
+        for y in range(size):
+            for dx, dy in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_x, end_y = x + dx * (win_length - 1), y + dy * (win_length - 1)
+                if 0 <= end_x < size and 0 <= end_y < size:
+                    masks.append(sum(1 << ((x + dx * k) * size + y + dy * k) for k in range(win_length)))
+    return tuple(masks)
+
+
+@lru_cache(maxsize=None)
+def cell_win_masks(size, win_length):
+    # For every cell, only the winning lines that pass through it
+    masks = win_masks(size, win_length)
+    return tuple(tuple(mask for mask in masks if mask >> cell & 1) for cell in range(size * size))
+
+
+@lru_cache(maxsize=None)
+def cell_moves(size):
+    return tuple((x, y) for x in range(size) for y in range(size))
+
+
 class GameState:
+    """A board as two bitboards: bit x * size + y of o_bits / x_bits is set when O / X holds (x, y).
+
+    States are immutable; `board_state` rebuilds the familiar array (1 for O, -1 for X, 0 empty)
+    for callers that want one.
+    """
+
+    __slots__ = ('o_bits', 'x_bits', 'turn_O', 'size', 'win_length', 'last_move', '_winner')
 
     def __init__(self, board_state, turn_O, win_length=5):
-        self.board_state = board_state
+        board = np.asarray(board_state)
+        self.o_bits = sum(1 << int(cell) for cell in np.flatnonzero(board.ravel() == 1))
+        self.x_bits = sum(1 << int(cell) for cell in np.flatnonzero(board.ravel() == -1))
         self.turn_O = turn_O
-        self.winner = ""
-        self.size = board_state.shape[0]
+        self.size = board.shape[0]
         self.win_length = win_length
+        self.last_move = None
+        self._winner = None
+
+    @classmethod
+    def _from_bits(cls, o_bits, x_bits, turn_O, size, win_length=5, last_move=None):
+        state = cls.__new__(cls)
+        state.o_bits = o_bits
+        state.x_bits = x_bits
+        state.turn_O = turn_O
+        state.size = size
+        state.win_length = win_length
+        state.last_move = last_move
+        state._winner = None
+        return state
+
+    @property
+    def board_state(self):
+        cells = np.arange(self.size * self.size)
+        board = ((self.o_bits >> cells) & 1) - ((self.x_bits >> cells) & 1)
+        return board.reshape(self.size, self.size)
+
+    @property
+    def full_mask(self):
+        return (1 << (self.size * self.size)) - 1
+
+    @property
+    def empty_bits(self):
+        return self.full_mask & ~(self.o_bits | self.x_bits)
+
+    @property
+    def winner(self):
+        # "O", "X", "Draw", or "" while the game is still going
+        if self._winner is None:
+            self._winner = self._find_winner()
+        return self._winner
+
+    def _find_winner(self):
+        if self.last_move is not None:
+            # Only the player who just moved can have completed a line, through the cell they took
+            masks = cell_win_masks(self.size, self.win_length)[self.last_move]
+            bits, name = (self.x_bits, "X") if self.turn_O else (self.o_bits, "O")
+            if any(bits & mask == mask for mask in masks):
+                return name
+        else:
+            for mask in win_masks(self.size, self.win_length):
+                if self.o_bits & mask == mask:
+                    return "O"
+                if self.x_bits & mask == mask:
+                    return "X"
+        if not self.empty_bits:
+            return "Draw"
+        return ""
 
     def is_terminal(self):
-        # Check all directions for win_length in a row
-        for i in range(self.size):
-            for j in range(self.size - self.win_length + 1):
-                # Check rows
-                row = self.board_state[i, j:j+self.win_length]
-                if np.all(row == 1):
-                    self.winner = "O"
-                    return True
-                elif np.all(row == -1):
-                    self.winner = "X"
-                    return True
-
-                # Check columns
-                col = self.board_state[j:j+self.win_length, i]
-                if np.all(col == 1):
-                    self.winner = "O"
-                    return True
-                elif np.all(col == -1):
-                    self.winner = "X"
-                    return True
-
-        # Check diagonals
-        for i in range(self.size - self.win_length + 1):
-            for j in range(self.size - self.win_length + 1):
-                # Main diagonal
-                main_diag = [self.board_state[i+k, j+k] for k in range(self.win_length)]
-                if all(val == 1 for val in main_diag):
-                    self.winner = "O"
-                    return True
-                elif all(val == -1 for val in main_diag):
-                    self.winner = "X"
-                    return True
-
-                # Anti-diagonal
-                anti_diag = [self.board_state[i+k, j+self.win_length-1-k] for k in range(self.win_length)]
-                if all(val == 1 for val in anti_diag):
-                    self.winner = "O"
-                    return True
-                elif all(val == -1 for val in anti_diag):
-                    self.winner = "X"
-                    return True
-
-        # Check draw
-        if not np.any(self.board_state == 0):
-            self.winner = "Draw"
-            return True
-
-        self.winner = ""
-        return False
+        return self.winner != ""
 
     def score(self):
-        # Similar to is_terminal but returns score
-        for i in range(self.size):
-            for j in range(self.size - self.win_length + 1):
-                row = self.board_state[i, j:j+self.win_length]
-                col = self.board_state[j:j+self.win_length, i]
-                if np.all(row == 1) or np.all(col == 1):
-                    return 1
-                elif np.all(row == -1) or np.all(col == -1):
-                    return -1
-
-        for i in range(self.size - self.win_length + 1):
-            for j in range(self.size - self.win_length + 1):
-                main_diag = [self.board_state[i+k, j+k] for k in range(self.win_length)]
-                anti_diag = [self.board_state[i+k, j+self.win_length-1-k] for k in range(self.win_length)]
-                if all(val == 1 for val in main_diag) or all(val == 1 for val in anti_diag):
-                    return 1
-                elif all(val == -1 for val in main_diag) or all(val == -1 for val in anti_diag):
-                    return -1
-
+        winner = self.winner
+        if winner == "O":
+            return 1
+        if winner == "X":
+            return -1
         return 0  # draw or ongoing
 
+    def is_empty(self, move):
+        x, y = move
+        if not (0 <= x < self.size and 0 <= y < self.size):
+            return False
+        return not (self.o_bits | self.x_bits) >> (x * self.size + y) & 1
+
     def get_possible_moves(self):
-        return [(x, y) for x in range(self.size) for y in range(self.size) if self.board_state[x, y] == 0]
+        moves = cell_moves(self.size)
+        empty = self.empty_bits
+        return [moves[cell] for cell in range(self.size * self.size) if empty >> cell & 1]
 
     def get_new_state(self, move):
-        new_board = self.board_state.copy()
         x, y = move
-        new_board[x, y] = 1 if self.turn_O else -1
-        return GameState(new_board, not self.turn_O, self.win_length)
+        cell = x * self.size + y
+        if self.turn_O:
+            return GameState._from_bits(self.o_bits | 1 << cell, self.x_bits, False, self.size, self.win_length, cell)
+        return GameState._from_bits(self.o_bits, self.x_bits | 1 << cell, True, self.size, self.win_length, cell)
@@ -1,34 +1,209 @@
+import math
 import random
 import time
-from tic_tac_toe_backend.GameState import GameState
+from array import array
+from tic_tac_toe_backend.GameState import GameState, cell_moves, cell_win_masks
 
-def simulate_random_game(game_state: GameState):
-    current_state = game_state
-    while not current_state.is_terminal():
-        possible_moves = current_state.get_possible_moves()
-        move = random.choice(possible_moves)
-        current_state = current_state.get_new_state(move)
-    return current_state.winner
+# Exploration constant of UCB1
+UCB_C = math.sqrt(2)
+# Nodes one tree may hold; past this the search keeps playing out from existing leaves
+# without expanding, so a long time budget cannot exhaust memory
+MAX_TREE_NODES = 200000
+# Node outcomes
+ONGOING, O_WINS, X_WINS, DRAW = 0, 1, 2, 3
+# Per-node arrays and their typecodes; cell is the move that led to the node (-1 at the root)
+NODE_TYPES = {
+    'o_bits': 'q', 'x_bits': 'q', 'turn_O': 'b', 'cell': 'b', 'parent': 'i', 'first_child': 'i',
+    'next_sibling': 'i', 'untried': 'q', 'outcome': 'b', 'visits': 'i', 'wins': 'd',
+}
+NODE_FIELDS = tuple(NODE_TYPES)
 
-def mcts(game_state: GameState, simulations=500):
-    moves = game_state.get_possible_moves()
 
-    if len(moves) == 1:
-        return 1.0, moves[0]
+def random_playout(o_bits, x_bits, turn_O, size, win_length, rng):
+    """Finish a game with uniformly random moves on the bitboards; returns O_WINS, X_WINS or DRAW."""
+    masks = cell_win_masks(size, win_length)
+    empty = [cell for cell in range(size * size) if not (o_bits | x_bits) >> cell & 1]
+    rng.shuffle(empty)
+    for cell in empty:
+        if turn_O:
+            o_bits |= 1 << cell
+            if any(o_bits & mask == mask for mask in masks[cell]):
+                return O_WINS
+        else:
+            x_bits |= 1 << cell
+            if any(x_bits & mask == mask for mask in masks[cell]):
+                return X_WINS
+        turn_O = not turn_O
+    return DRAW
+
+
+def _outcome(state: GameState):
+    return {"O": O_WINS, "X": X_WINS, "Draw": DRAW}.get(state.winner, ONGOING)
+
+
+class UCTTree:
+    """Monte Carlo tree search with UCB1 selection, kept between moves of one game.
+
+    Nodes live in flat typed arrays indexed by node id (children as first-child /
+    next-sibling links), about 50 bytes a node. `wins` counts results for the player who
+    made the move into the node, a draw counting half.
+    """
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.size = None
+        self.win_length = None
+        self._reset()
+
+    def _reset(self):
+        for name in NODE_FIELDS:
+            setattr(self, name, array(NODE_TYPES[name]))
+
+    def __len__(self):
+        return len(self.parent)
 
-    wins = {move: 0 for move in moves}
-    plays = {move: 0 for move in moves}
+    def _add_node(self, state: GameState, parent, cell):
+        node = len(self.parent)
+        self.o_bits.append(state.o_bits)
+        self.x_bits.append(state.x_bits)
+        self.turn_O.append(state.turn_O)
+        self.cell.append(cell)
+        self.parent.append(parent)
+        self.first_child.append(-1)
+        self.next_sibling.append(-1)
+        outcome = _outcome(state)
+        self.outcome.append(outcome)
+        self.untried.append(state.empty_bits if outcome == ONGOING else 0)
+        self.visits.append(0)
+        self.wins.append(0.0)
+        if parent >= 0:
+            self.next_sibling[node] = self.first_child[parent]
+            self.first_child[parent] = node
+        return node
 
-    for _ in range(simulations):
-        move = random.choice(moves)
-        new_state = game_state.get_new_state(move)
-        result = simulate_random_game(new_state)
+    def _state(self, node):
+        return GameState._from_bits(
+            self.o_bits[node], self.x_bits[node], bool(self.turn_O[node]), self.size, self.win_length,
+            self.cell[node] if self.cell[node] >= 0 else None
+        )
 
-        plays[move] += 1
-        if (result == "O" and game_state.turn_O) or (result == "X" and not game_state.turn_O):
-            wins[move] += 1
+    def children(self, node):
+        child = self.first_child[node]
+        while child >= 0:
+            yield child
+            child = self.next_sibling[child]
 
-    best_move = max(moves, key=lambda m: wins[m] / plays[m] if plays[m] > 0 else 0)
-    win_rate = wins[best_move] / plays[best_move] if plays[best_move] > 0 else 0
+    def _find(self, game_state: GameState, max_depth=2):
+        # The node for game_state among the root and its descendants down to max_depth
+        # (the AI's last move and the player's reply)
+        frontier = [0] if len(self) else []
+        for _ in range(max_depth + 1):
+            for node in frontier:
+                if self.o_bits[node] == game_state.o_bits and self.x_bits[node] == game_state.x_bits \
+                        and bool(self.turn_O[node]) == game_state.turn_O:
+                    return node
+            frontier = [child for node in frontier for child in self.children(node)]
+        return None
+
+    def set_root(self, game_state: GameState):
+        """Make game_state the root, keeping the subtree already grown below it (if any)
+        and dropping the rest, so memory stays proportional to the live part of the tree."""
+        if (self.size, self.win_length) != (game_state.size, game_state.win_length):
+            self.size, self.win_length = game_state.size, game_state.win_length
+            self._reset()
+        node = self._find(game_state)
+        if node == 0:
+            return
+        if node is None:
+            self._reset()
+            self._add_node(game_state, -1, -1)
+            return
+        # Copy the kept subtree breadth first into fresh arrays, then relink the children
+        old = {name: getattr(self, name) for name in NODE_FIELDS}
+        self._reset()
+        queue = [(node, -1)]
+        for old_node, new_parent in queue:
+            for name in NODE_FIELDS:
+                getattr(self, name).append(old[name][old_node])
+            new_node = len(self.parent) - 1
+            self.parent[new_node] = new_parent
+            self.first_child[new_node] = -1
+            self.next_sibling[new_node] = -1
+            child = old['first_child'][old_node]
+            while child >= 0:
+                queue.append((child, new_node))
+                child = old['next_sibling'][child]
+        self.cell[0] = -1
+        # Prepending in reverse keeps every node's children in their original order
+        for new_node in range(len(self.parent) - 1, 0, -1):
+            new_parent = self.parent[new_node]
+            self.next_sibling[new_node] = self.first_child[new_parent]
+            self.first_child[new_parent] = new_node
+
+    def _select_child(self, node):
+        log_visits = math.log(self.visits[node])
+        best, best_score = -1, -1.0
+        for child in self.children(node):
+            visits = self.visits[child]
+            score = self.wins[child] / visits + UCB_C * math.sqrt(log_visits / visits)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+    def _expand(self, node):
+        untried = self.untried[node]
+        cells = [cell for cell in range(self.size * self.size) if untried >> cell & 1]
+        cell = self.rng.choice(cells)
+        self.untried[node] = untried & ~(1 << cell)
+        return self._add_node(self._state(node).get_new_state(cell_moves(self.size)[cell]), node, cell)
+
+    def _iterate(self):
+        # Selection: descend through fully expanded nodes by UCB1
+        node = 0
+        while self.outcome[node] == ONGOING and not self.untried[node] and self.first_child[node] >= 0:
+            node = self._select_child(node)
+        # Expansion: one new child, unless the game is over here or the tree is full
+        if self.outcome[node] == ONGOING and self.untried[node] and len(self) < MAX_TREE_NODES:
+            node = self._expand(node)
+        # Simulation
+        outcome = self.outcome[node]
+        if outcome == ONGOING:
+            outcome = random_playout(
+                self.o_bits[node], self.x_bits[node], bool(self.turn_O[node]), self.size, self.win_length, self.rng
+            )
+        # Backpropagation: a node's wins belong to the player who moved into it
+        while node >= 0:
+            self.visits[node] += 1
+            if outcome == DRAW:
+                self.wins[node] += 0.5
+            elif (outcome == O_WINS) != bool(self.turn_O[node]):
+                self.wins[node] += 1.0
+            node = self.parent[node]
+
+    def search(self, game_state: GameState, simulations=500, time_budget_ms=None):
+        """Run simulations from game_state (reusing the tree grown under it by earlier
+        searches) until `simulations` playouts or `time_budget_ms` milliseconds, whichever
+        comes first. Returns (win rate, move) of the most visited root move."""
+        self.set_root(game_state)
+        deadline = time.time() + time_budget_ms / 1000.0 if time_budget_ms is not None else None
+        for _ in range(simulations):
+            if deadline is not None and time.time() >= deadline:
+                break
+            self._iterate()
+        children = list(self.children(0))
+        if not children:
+            moves = game_state.get_possible_moves()
+            return 0.0, moves[0] if moves else None
+        best = max(children, key=lambda child: self.visits[child])
+        return self.wins[best] / self.visits[best], cell_moves(self.size)[self.cell[best]]
+
+
+def mcts(game_state: GameState, simulations=500, time_budget_ms=None, tree: UCTTree = None):
+    moves = game_state.get_possible_moves()
+
+    if len(moves) == 1:
+        return 1.0, moves[0]
 
-    return win_rate, best_move
+    if tree is None:
+        tree = UCTTree()
+    return tree.search(game_state, simulations, time_budget_ms)
@@ -1,70 +1,238 @@
+from functools import lru_cache
 from tic_tac_toe_backend.GameState import GameState
+from tic_tac_toe_backend.TranspositionTable import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
 import numpy as np
+import time
 
-def evaluate_heuristic(game_state: GameState):
-    board = game_state.board_state
-    size = game_state.size
-    score = 0
-    lines = []
+# Default time for one AI move; iterative deepening returns the deepest finished search within it
+AI_MOVE_BUDGET_MS = 500
+# Half-width of the first aspiration window around the previous iteration's value; it grows
+# by ASPIRATION_GROWTH on every fail and gives way to a full window past ASPIRATION_MAX
+ASPIRATION_WINDOW = 8
+ASPIRATION_GROWTH = 4
+ASPIRATION_MAX = 512
+# Killer moves remembered per ply
+KILLER_SLOTS = 2
 
-    # Rows and columns
+@lru_cache(maxsize=None)
+def heuristic_lines(size):
+    """The cells of every line the heuristic scores, as one (lines x cells) index array into a
+    flattened board: every row and column, and every 3-cell main and anti diagonal. Shorter
+    lines are padded with index size * size, an extra cell that is always 0 and never empty."""
+    lines = []
     for i in range(size):
-        lines.append(board[i, :])       # Row
-        lines.append(board[:, i])       # Column
-
-    # Diagonals (main and anti)
+        lines.append([i * size + k for k in range(size)])  # Row
+        lines.append([k * size + i for k in range(size)])  # Column
     for i in range(size - 2):
         for j in range(size - 2):
-            # Main diag
-            main_diag = np.array([board[i + k, j + k] for k in range(3)])
-            lines.append(main_diag)
-            # Anti diag
-            anti_diag = np.array([board[i + k, j + 2 - k] for k in range(3)])
-            lines.append(anti_diag)
-
-    for line in lines:
-        zeros = np.count_nonzero(line == 0)
-        if zeros < 1:
-            continue
-        line_sum = np.sum(line)
-        # Encourage O (1), discourage X (-1)
-        if line_sum > 0:
-            score += line_sum ** 2
-        elif line_sum < 0:
-            score += line_sum ** 2
-    return score
-
-
-def minimax(game_state: GameState, depth: int, maximizingPlayer: bool, alpha=float('-inf'), beta=float('inf')):
+            lines.append([(i + k) * size + j + k for k in range(3)])  # Main diag
+            lines.append([(i + k) * size + j + 2 - k for k in range(3)])  # Anti diag
+    width = max(len(line) for line in lines)
+    return np.array([line + [size * size] * (width - len(line)) for line in lines])
+
+
+def board_matrix(states):
+    # Flattened boards of many states as one (states x cells) array: 1 for O, -1 for X
+    cells = np.arange(states[0].size * states[0].size)
+    o_bits = np.array([state.o_bits for state in states], dtype=np.int64)[:, None]
+    x_bits = np.array([state.x_bits for state in states], dtype=np.int64)[:, None]
+    return ((o_bits >> cells) & 1) - ((x_bits >> cells) & 1)
+
+
+def evaluate_heuristic_batch(states):
+    """evaluate_heuristic for many states of one board size at once: a single gather of every
+    line's cells and one reduction per line. Returns an int array of scores."""
+    size = states[0].size
+    boards = board_matrix(states)
+    padded = np.zeros((len(states), size * size + 1), dtype=boards.dtype)
+    padded[:, :-1] = boards
+    lines = heuristic_lines(size)
+    cells = padded[:, lines]
+    line_sums = cells.sum(axis=2)
+    # Lines with no empty cell left score nothing; the padding cell never counts as empty
+    empty = padded == 0
+    empty[:, -1] = False
+    open_lines = empty[:, lines].any(axis=2)
+    # Encourage O (1), discourage X (-1)
+    return (line_sums ** 2 * open_lines).sum(axis=1)
+
+
+def evaluate_heuristic(game_state: GameState):
+    return int(evaluate_heuristic_batch([game_state])[0])
+
+
+def evaluate_children(children):
+    # Leaf values of all children of a node in one batched heuristic call; finished games score as before
+    values = evaluate_heuristic_batch(children).tolist()
+    for i, child in enumerate(children):
+        if child.is_terminal():
+            values[i] = child.score()
+    return values
+
+class SearchTimeout(Exception):
+    pass
+
+
+class SearchContext:
+    """State shared by one iterative-deepening search: its deadline, the killer moves per ply
+    (quiet moves that caused a cutoff among siblings) and the history score of every move."""
+
+    def __init__(self, deadline=None):
+        self.deadline = deadline
+        self.killers = {}
+        self.history = {}
+        self.nodes = 0
+
+    def check(self):
+        self.nodes += 1
+        if self.deadline is not None and time.time() >= self.deadline:
+            raise SearchTimeout()
+
+    def order(self, moves, ply, first=None):
+        # Principal-variation move first, then this ply's killers, then by history score;
+        # ties keep the row-major order of get_possible_moves
+        killers = self.killers.get(ply, [])
+
+        def rank(move):
+            if move == first:
+                return (0, 0)
+            if move in killers:
+                return (1, killers.index(move))
+            return (2, -self.history.get(move, 0))
+
+        return sorted(moves, key=rank)
+
+    def cutoff(self, move, ply, depth):
+        killers = self.killers.setdefault(ply, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[KILLER_SLOTS:]
+        self.history[move] = self.history.get(move, 0) + depth * depth
+
+
+def minimax(game_state: GameState, depth: int, maximizingPlayer: bool, alpha=float('-inf'), beta=float('inf'),
+            table: TranspositionTable = None, key=None, search: SearchContext = None, ply=0):
+    if search is not None:
+        search.check()
     if depth == 0 or game_state.is_terminal():
         if game_state.is_terminal():
             return game_state.score(), None
         else:
             return evaluate_heuristic(game_state), None
 
+    # With a transposition table, positions already searched at least this deep are answered
+    # (or their window narrowed) from it, and their best move is tried first
+    moves = game_state.get_possible_moves()
+    best_known = None
+    if table is not None:
+        if key is None:
+            key = table.hash(game_state)
+        entry = table.get(key)
+        if entry is not None:
+            if entry.depth >= depth:
+                if entry.flag == EXACT:
+                    return entry.value, entry.move
+                if entry.flag == LOWER_BOUND:
+                    alpha = max(alpha, entry.value)
+                else:
+                    beta = min(beta, entry.value)
+                if alpha >= beta:
+                    return entry.value, entry.move
+            best_known = entry.move
+    if search is not None:
+        moves = search.order(moves, ply, best_known)
+    elif best_known in moves:
+        moves.remove(best_known)
+        moves.insert(0, best_known)
+    # The window actually searched; a result outside it is only a bound
+    alpha_orig, beta_orig = alpha, beta
+
     best_movement = None
+    children = [game_state.get_new_state(move) for move in moves]
+    # One level above the leaves, every child is scored in one batched call instead of recursing
+    leaf_values = evaluate_children(children) if depth == 1 else None
 
     if maximizingPlayer:
         value = float('-inf')
-        for move in game_state.get_possible_moves():
-            child = game_state.get_new_state(move)
-            tmp = minimax(child, depth - 1, False, alpha, beta)[0]
+        for i, (move, child) in enumerate(zip(moves, children)):
+            if leaf_values is not None:
+                tmp = leaf_values[i]
+            else:
+                child_key = table.child_hash(key, game_state, move) if table is not None else None
+                tmp = minimax(child, depth - 1, False, alpha, beta, table, child_key, search, ply + 1)[0]
             if tmp > value:
                 value = tmp
                 best_movement = move
             alpha = max(alpha, value)
             if alpha >= beta:
+                if search is not None:
+                    search.cutoff(move, ply, depth)
                 break
     else:
         value = float('inf')
-        for move in game_state.get_possible_moves():
-            child = game_state.get_new_state(move)
-            tmp = minimax(child, depth - 1, True, alpha, beta)[0]
+        for i, (move, child) in enumerate(zip(moves, children)):
+            if leaf_values is not None:
+                tmp = leaf_values[i]
+            else:
+                child_key = table.child_hash(key, game_state, move) if table is not None else None
+                tmp = minimax(child, depth - 1, True, alpha, beta, table, child_key, search, ply + 1)[0]
             if tmp < value:
                 value = tmp
                 best_movement = move
             beta = min(beta, value)
             if alpha >= beta:
+                if search is not None:
+                    search.cutoff(move, ply, depth)
                 break
 
+    if table is not None:
+        if value <= alpha_orig:
+            flag = UPPER_BOUND
+        elif value >= beta_orig:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        table.store(key, depth, value, flag, best_movement)
+
     return value, best_movement
+
+
+def aspiration_search(game_state: GameState, depth, maximizingPlayer, guess, table, key, search):
+    # Search a narrow window around the previous iteration's value; widen it only if the
+    # value falls outside, which costs a re-search but is rare between consecutive depths
+    delta = ASPIRATION_WINDOW
+    while guess is not None and delta <= ASPIRATION_MAX:
+        alpha, beta = guess - delta, guess + delta
+        value, move = minimax(game_state, depth, maximizingPlayer, alpha, beta, table, key, search)
+        if alpha < value < beta:
+            return value, move
+        delta *= ASPIRATION_GROWTH
+    return minimax(game_state, depth, maximizingPlayer, float('-inf'), float('inf'), table, key, search)
+
+
+def iterative_deepening(game_state: GameState, maximizingPlayer: bool, time_budget_ms=AI_MOVE_BUDGET_MS,
+                        table: TranspositionTable = None, max_depth=None):
+    """Search depth 1, 2, 3, ... until the time budget runs out and return (value, move, depth)
+    of the deepest search that finished.
+
+    Every iteration orders moves by the previous one's principal variation (kept in the
+    transposition table), killer moves and history scores, so the deeper searches cut off early.
+    """
+    deadline = time.time() + time_budget_ms / 1000.0
+    if table is None:
+        table = TranspositionTable(game_state.size)
+    search = SearchContext(deadline)
+    key = table.hash(game_state)
+    moves = game_state.get_possible_moves()
+    if not moves or game_state.is_terminal():
+        return game_state.score(), None, 0
+    max_depth = min(max_depth or len(moves), len(moves))
+
+    value, move, completed = None, moves[0], 0
+    for depth in range(1, max_depth + 1):
+        try:
+            value, move = aspiration_search(game_state, depth, maximizingPlayer, value, table, key, search)
+        except SearchTimeout:
+            break
+        completed = depth
+    return value, move, completed
@@ -0,0 +1,117 @@
+from array import array
+from collections import namedtuple
+from functools import lru_cache
+import random
+
+# Entries hold the search depth below the position, its value, whether that value is exact
+# or only a bound (alpha-beta cut the search short), and the best move found
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+TTEntry = namedtuple('TTEntry', ['depth', 'value', 'flag', 'move'])
+
+# Slots per table (one table per game session), a power of two so a key's slot is
+# `key & (slots - 1)`. A 500 ms search stores a few thousand positions, so this holds
+# several moves' worth; at 20 bytes a slot a table takes about 330 KB
+TT_SLOTS = 1 << 14
+ZOBRIST_SEED = 0x7A0B
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(size, seed=ZOBRIST_SEED):
+    # One random 64-bit key per (cell, player), plus one for "X to move"
+    rng = random.Random(seed)
+    o_keys = tuple(rng.getrandbits(64) for _ in range(size * size))
+    x_keys = tuple(rng.getrandbits(64) for _ in range(size * size))
+    return o_keys, x_keys, rng.getrandbits(64)
+
+
+class TranspositionTable:
+    """Zobrist-hashed minimax results, kept between moves so the next search starts warm.
+
+    Entries live in preallocated typed arrays, so a table's memory is fixed however many
+    positions a game visits. A key may sit in either slot of the pair `key & mask` /
+    `(key & mask) ^ 1`. A position is only overwritten by a search at least as deep; a new
+    position takes an empty slot of its pair, or else the one holding the shallower search.
+    """
+
+    def __init__(self, size=5, slots=TT_SLOTS):
+        if slots <= 0 or slots & (slots - 1):
+            raise ValueError("slots must be a power of two")
+        self.size = size
+        self.slots = slots
+        self.mask = slots - 1
+        self.o_keys, self.x_keys, self.x_to_move = zobrist_keys(size)
+        self._keys = array('Q', bytes(8 * slots))
+        self._depths = array('b', [-1]) * slots  # -1 marks an empty slot
+        self._values = array('q', bytes(8 * slots))
+        self._flags = array('b', bytes(slots))
+        self._cells = array('h', bytes(2 * slots))  # best move as a cell index, -1 for none
+        self._used = 0
+        self.hits = 0
+        self.misses = 0
+
+    def hash(self, game_state):
+        key = 0 if game_state.turn_O else self.x_to_move
+        for cell in range(self.size * self.size):
+            if game_state.o_bits >> cell & 1:
+                key ^= self.o_keys[cell]
+            elif game_state.x_bits >> cell & 1:
+                key ^= self.x_keys[cell]
+        return key
+
+    def child_hash(self, key, game_state, move):
+        # Hash of game_state.get_new_state(move), from the parent's hash
+        cell = move[0] * self.size + move[1]
+        return key ^ (self.o_keys[cell] if game_state.turn_O else self.x_keys[cell]) ^ self.x_to_move
+
+    def _find(self, key):
+        slot = key & self.mask
+        for slot in (slot, slot ^ 1):
+            if self._depths[slot] >= 0 and self._keys[slot] == key:
+                return slot
+        return None
+
+    def get(self, key):
+        slot = self._find(key)
+        if slot is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        cell = self._cells[slot]
+        move = divmod(cell, self.size) if cell >= 0 else None
+        return TTEntry(self._depths[slot], self._values[slot], self._flags[slot], move)
+
+    def store(self, key, depth, value, flag, move):
+        slot = self._find(key)
+        if slot is not None:
+            if self._depths[slot] > depth:
+                return
+        else:
+            slot = key & self.mask
+            if self._depths[slot ^ 1] < self._depths[slot]:
+                slot ^= 1
+            if self._depths[slot] < 0:
+                self._used += 1
+        self._keys[slot] = key
+        self._depths[slot] = depth
+        self._values[slot] = value
+        self._flags[slot] = flag
+        self._cells[slot] = move[0] * self.size + move[1] if move is not None else -1
+
+    def clear(self):
+        self._depths = array('b', [-1]) * self.slots
+        self._used = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return self._used
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': self._used,
+            'capacity': self.slots,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,115 @@
+import unittest
+import time
+import numpy as np
+from .GameState import GameState
+from .MinMax import iterative_deepening, minimax
+from .MCTS import UCTTree
+from .TranspositionTable import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
+
+
+def reference_winner(board, win_length=5):
+    """Winner of an array board by scanning every row, column and diagonal, as the engine did
+    before the bitboards: "O", "X", "Draw" or ""."""
+    size = len(board)
+    for x in range(size):
+        for y in range(size):
+            for dx, dy in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                cells = [(x + dx * k, y + dy * k) for k in range(win_length)]
+                if all(0 <= cx < size and 0 <= cy < size for cx, cy in cells):
+                    total = sum(board[cx][cy] for cx, cy in cells)
+                    if total == win_length:
+                        return "O"
+                    if total == -win_length:
+                        return "X"
+    return "Draw" if all(cell != 0 for row in board for cell in row) else ""
+
+
+def random_game(rng, size=5, win_length=5, max_moves=None):
+    """A state reached by random moves from the empty board, stopping at the end of the game."""
+    state = GameState(np.zeros((size, size), dtype=int), turn_O=True, win_length=win_length)
+    for _ in range(size * size if max_moves is None else max_moves):
+        if state.is_terminal():
+            break
+        moves = state.get_possible_moves()
+        state = state.get_new_state(moves[rng.integers(len(moves))])
+    return state
+
+
+class TestTicTacToeSearch(unittest.TestCase):
+    def test_bitboard_winner_matches_reference(self):
+        rng = np.random.default_rng(3)
+        for size, win_length in ((3, 3), (4, 3), (5, 5), (5, 4)):
+            for _ in range(200):
+                state = random_game(rng, size, win_length, max_moves=int(rng.integers(size * size + 1)))
+                board = state.board_state
+                self.assertEqual(state.winner, reference_winner(board.tolist(), win_length))
+                # A state rebuilt from the array has no last move and scans every line
+                self.assertEqual(GameState(board, state.turn_O, win_length).winner, state.winner)
+
+    def test_transposition_table_keeps_minimax_values(self):
+        rng = np.random.default_rng(5)
+        for _ in range(10):
+            state = random_game(rng, 4, 3, max_moves=int(rng.integers(2, 6)))
+            if state.is_terminal():
+                continue
+            for depth in (1, 2, 3):
+                maximizing = state.turn_O
+                plain, _ = minimax(state, depth, maximizing)
+                table = TranspositionTable(state.size)
+                cached, move = minimax(state, depth, maximizing, table=table)
+                self.assertEqual(cached, plain)
+                self.assertTrue(state.is_empty(move))
+                # A second search answers from the table with the same value
+                self.assertEqual(minimax(state, depth, maximizing, table=table)[0], plain)
+                self.assertGreater(table.hits, 0)
+
+    def test_transposition_table_has_fixed_slots(self):
+        table = TranspositionTable(5, slots=64)
+        # The empty board with O to move hashes to 0, which must still be found
+        table.store(0, 2, 7, EXACT, (2, 2))
+        self.assertEqual(table.get(0), (2, 7, EXACT, (2, 2)))
+        # A shallower search never overwrites a deeper one of the same position
+        table.store(0, 1, 3, LOWER_BOUND, None)
+        self.assertEqual(table.get(0).value, 7)
+        table.store(0, 4, -5, UPPER_BOUND, None)
+        self.assertEqual(table.get(0), (4, -5, UPPER_BOUND, None))
+        rng = np.random.default_rng(17)
+        for key in rng.integers(1, 1 << 62, 1000).tolist():
+            table.store(key, 1, 1, EXACT, (0, 0))
+        self.assertLessEqual(len(table), 64)
+        self.assertIsNotNone(table.get(key))
+        with self.assertRaises(ValueError):
+            TranspositionTable(5, slots=100)
+
+    def test_iterative_deepening_returns_a_legal_move_within_budget(self):
+        state = random_game(np.random.default_rng(11), max_moves=4)
+        for budget_ms in (20, 200):
+            start = time.time()
+            _, move, depth = iterative_deepening(state, state.turn_O, budget_ms)
+            elapsed_ms = (time.time() - start) * 1000
+            self.assertTrue(state.is_empty(move))
+            self.assertGreaterEqual(depth, 1)
+            # The iteration in flight is abandoned at the deadline, so only a little slack is needed
+            self.assertLess(elapsed_ms, budget_ms + 100)
+
+    def test_uct_tree_keeps_the_subtree_when_rerooted(self):
+        tree = UCTTree(seed=1)
+        state = random_game(np.random.default_rng(13), max_moves=2)
+        _, move = tree.search(state, simulations=2000)
+        reply = state.get_new_state(move)
+        reply = reply.get_new_state(reply.get_possible_moves()[0])
+        node = tree._find(reply)
+        self.assertIsNotNone(node)
+        kept_visits = tree.visits[node]
+        self.assertGreater(kept_visits, 0)
+        tree.search(reply, simulations=100)
+        self.assertEqual(tree.visits[0], kept_visits + 100)
+        self.assertEqual((tree.o_bits[0], tree.x_bits[0]), (reply.o_bits, reply.x_bits))
+        # Every kept node still describes a position reachable from the new root
+        for child in tree.children(0):
+            self.assertEqual(tree.parent[child], 0)
+            self.assertTrue(reply.is_empty(divmod(tree.cell[child], reply.size)))
+
+
+if __name__ == '__main__':
+    unittest.main()
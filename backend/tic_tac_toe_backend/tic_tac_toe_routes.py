@@ -1,5 +1,6 @@
 from flask import Flask, render_template, request, jsonify, Blueprint
-from tic_tac_toe_backend.GameEngine import create_game, apply_player_move, get_ai_move, games
+from tic_tac_toe_backend.GameEngine import create_game, apply_player_move, get_ai_move, games, session_search, reset_session_search, validate_time_budget
+from tic_tac_toe_backend.MinMax import AI_MOVE_BUDGET_MS
 from datetime import datetime
 from tic_tac_toe_backend.tic_tac_toe_db import TicTacToeDatabase
 
@@ -20,6 +21,7 @@ def start_game():
     
     # Create a new game in the database (in-memory here)
     games[session_id] = create_game()  # Initialize the game state in memory
+    reset_session_search(session_id)
 
     db.create_game_session(session_id, player_name=player_name, algorithm=algorithm)
     
@@ -32,6 +34,7 @@ def make_move():
     session_id = data.get("session_id")
     x, y = data.get("move", (None, None))  # Default to None if no move is provided
     algorithm = data.get("algorithm", "minimax")
+    time_budget_ms = data.get("time_budget_ms", AI_MOVE_BUDGET_MS)  # How long the AI may think
     player_name = data.get("playerName")  # Ensure player_name is included
     
     # Validate if session exists
@@ -43,16 +46,18 @@ def make_move():
         return jsonify({"error": "Move coordinates are required!"}), 400
     
     try:
+        validate_time_budget(time_budget_ms)
         # Apply the player's move
         game = apply_player_move(game, (x, y))
         print(f"Player move: ({x}, {y})")
         db.log_user_move(session_id, name=player_name, move=[x, y])  # Log the user's move
         if game.is_terminal():
+            reset_session_search(session_id)
             return jsonify({"board": game.board_state.tolist(), "winner": game.winner})
 
         # AI's move logic
         start_time = datetime.now()
-        move, game = get_ai_move(game, algorithm)
+        move, game = get_ai_move(game, algorithm, time_budget_ms=time_budget_ms, **session_search(session_id, algorithm))
         end_time = datetime.now()
 
         # Calculate the AI move duration in milliseconds
@@ -60,6 +65,8 @@ def make_move():
 
         print(f"AI move: {move}, Duration: {move_duration_ms} ms")
         games[session_id] = game  # Update the game state
+        if game.is_terminal():
+            reset_session_search(session_id)  # Nothing left to search in this game
         
         # Log an AI move with duration
         db.log_ai_move(session_id, algorithm, move, move_duration_ms)
@@ -87,6 +94,7 @@ def reset_game():
 
     # Reset the game state in memory
     games[session_id] = create_game()  # Recreate the game object for a new game session
+    reset_session_search(session_id)
     game = games.get(session_id)
     db.end_game_session(session_id, winner=game.winner)  # End the game session in the database
     return jsonify({"message": "Game has been reset and a new session started!"})
@@ -1,8 +1,32 @@
 import unittest
+import html
 import json
+import re
+import sqlite3
 import sys
+import tempfile
 import os
-from tsp_backend.tsp_routes import tsp_nearest_neighbor
+import time
+from itertools import permutations
+import numpy as np
+from tsp_backend.tsp_db import TSPDatabase
+from tsp_backend.tsp_routes import build_solve_response, db, parse_tsp_request, tsp_nearest_neighbor
+from tsp_backend.tsp_held_karp import held_karp_tour
+from tsp_backend.tsp_held_karp_parallel import parallel_held_karp_tour
+from tsp_backend.tsp_held_karp_mmap import out_of_core_held_karp_tour
+from tsp_backend.tsp_distance import DistanceMatrix, tour_length
+from tsp_backend.tsp_branch_bound import branch_and_bound_tour
+from tsp_backend.tsp_local_search import candidate_lists, improve_tour
+from tsp_backend.tsp_heuristics import multi_start_nearest_neighbor_tour, nearest_neighbor_tour
+from tsp_backend.tsp_lower_bound import held_karp_lower_bound
+from tsp_backend.tsp_metaheuristics import genetic_tour, simulated_annealing_tour
+from tsp_backend.tsp_tsplib import parse_tsplib
+from tsp_backend.tsp_corpus import generate_instance
+from tsp_backend.tsp_benchmark import find_regressions, run_benchmark
+from tsp_backend.tsp_stats import SolverStats
+from tsp_backend.tsp_route_codec import decode_route_column, pack_route, unpack_route
+from tsp_backend.tsp_executor import MAX_ITERATIONS, resolve_options, run_solver
+from tsp_backend.tsp_cache import TSPResultCache, canonical_instance, solve_cached
 
 # Setup import path to access app.py
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -51,6 +75,147 @@ class SalesmanAPITestCase(unittest.TestCase):
         self.assertIn("held_karp", data)
         print("✓ /api/solve_tsp returns valid algorithm data.")
 
+    def test_solve_tsp_reports_solver_status(self):
+        print("\nTesting /api/solve_tsp solver statuses and time budgets...")
+        payload = {
+            "cities": self.sample_cities,
+            "home_city": "A",
+            "human_route": ["B", "C"],
+            "distances": self.sample_distances,
+            "time_budget": {"held_karp": 5}
+        }
+        response = self.client.post("/api/solve_tsp", json=payload)
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data["held_karp"]["status"], "exact")
+        self.assertEqual(data["branch_bound"]["status"], "exact")
+        self.assertEqual(data["nearest_neighbor"]["status"], "heuristic")
+        self.assertEqual(data["held_karp"]["time_budget"], 5)
+        self.assertAlmostEqual(data["held_karp"]["distance"], 65)
+        self.assertAlmostEqual(data["lower_bound"]["distance"], 65)
+        self.assertAlmostEqual(data["human_route"]["gap"], 0)
+
+        payload["time_budget"] = -1
+        response = self.client.post("/api/solve_tsp", json=payload)
+        self.assertEqual(response.status_code, 400)
+        print("✓ /api/solve_tsp reports exact / heuristic results and validates budgets.")
+
+    def test_solve_response_without_any_solver_tour(self):
+        print("\nTesting the /solve_tsp response when every solver failed...")
+        payload = {
+            "cities": self.sample_cities,
+            "home_city": "A",
+            "human_route": ["B", "C"],
+            "distances": self.sample_distances
+        }
+        selected_cities, distances = parse_tsp_request(payload)
+        failed = {'tour': None, 'distance': None, 'time': 1.0, 'status': 'timed_out', 'stats': {}, 'error': "Out of time"}
+        results = {name: dict(failed) for name in ("nearest_neighbor", "branch_bound", "held_karp")}
+        budgets = {name: 1.0 for name in results}
+        data = build_solve_response(selected_cities, distances, results, budgets)
+        self.assertFalse(data["solved"])
+        self.assertNotIn("Congratulations", data["message"])
+        self.assertIsNone(data["branch_bound"]["route"])
+        results["held_karp"] = {'tour': [0, 1, 2, 0], 'distance': 65.0, 'time': 0.1, 'status': 'exact', 'stats': {}}
+        data = build_solve_response(selected_cities, distances, results, budgets)
+        self.assertTrue(data["solved"])
+        self.assertIn("Congratulations", data["message"])
+        print("✓ A round where no solver found a tour is neither won nor lost.")
+
+    def test_solve_tsp_session_reuses_previous_solve(self):
+        print("\nTesting incremental re-solve within a session...")
+        rng = np.random.default_rng(19)
+        points = rng.uniform(0, 100, (8, 2))
+        dist = np.linalg.norm(points[:, None] - points[None], axis=2)
+        cities = [{"id": i, "name": chr(65 + i)} for i in range(8)]
+        distances = {str(i): {str(j): float(dist[i, j]) for j in range(8)} for i in range(8)}
+        payload = {
+            "cities": cities,
+            "home_city": "A",
+            "human_route": ["B", "C", "D", "E", "F"],
+            "distances": distances,
+            "session_id": "test-session"
+        }
+        updates = []
+        for human_route in (["B", "C", "D", "E", "F"], ["B", "C", "D", "E", "F", "G", "H"], ["B", "D", "E", "G", "H"]):
+            payload["human_route"] = human_route
+            response = self.client.post("/api/solve_tsp", json=payload)
+            self.assertEqual(response.status_code, 200)
+            data = response.get_json()
+            ids = [0] + [ord(c) - 65 for c in human_route]
+            _, cost = held_karp_tour(dist[np.ix_(ids, ids)])
+            self.assertAlmostEqual(data["held_karp"]["distance"], cost)
+            self.assertAlmostEqual(data["branch_bound"]["distance"], cost)
+            updates.append(data["held_karp"]["stats"]["session_update"])
+        self.assertEqual(updates, ["cold", "incremental", "incremental"])
+        print("✓ Session solves extend and trim the previous Held-Karp tables.")
+
+    def test_solve_tsp_session_modes_and_cache(self):
+        print("\nTesting session solves with other Held-Karp modes and cached instances...")
+        rng = np.random.default_rng(23)
+        points = rng.uniform(0, 100, (7, 2))
+        dist = np.linalg.norm(points[:, None] - points[None], axis=2)
+        cities = [{"id": i, "name": chr(65 + i)} for i in range(7)]
+        payload = {
+            "cities": cities,
+            "home_city": "A",
+            "human_route": ["B", "C", "D", "E", "F", "G"],
+            "distances": {str(i): {str(j): float(dist[i, j]) for j in range(7)} for i in range(7)},
+            "session_id": "test-session-modes",
+            "held_karp_mode": "parallel"
+        }
+        _, cost = held_karp_tour(dist)
+        data = self.client.post("/api/solve_tsp", json=payload).get_json()
+        self.assertAlmostEqual(data["held_karp"]["distance"], cost)
+        # The parallel mode keeps no session tables
+        self.assertNotIn("session_update", data["held_karp"]["stats"])
+        payload["held_karp_mode"] = "serial"
+        data = self.client.post("/api/solve_tsp", json=payload).get_json()
+        self.assertTrue(data["held_karp"].get("cached"))
+        self.assertTrue(data["branch_bound"].get("cached"))
+        self.assertAlmostEqual(data["branch_bound"]["distance"], cost)
+        print("✓ Session solves honour held_karp_mode and answer repeats from the cache.")
+
+    def test_solve_tsp_stream(self):
+        print("\nTesting /api/solve_tsp_stream...")
+        payload = {
+            "cities": self.sample_cities,
+            "home_city": "A",
+            "human_route": ["B", "C"],
+            "distances": self.sample_distances,
+            "node_budget": 50
+        }
+        response = self.client.post("/api/solve_tsp_stream", json=payload)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/event-stream")
+        events = [block.split("\n") for block in response.get_data(as_text=True).strip().split("\n\n")]
+        self.assertEqual(events[0][0], "event: incumbent")
+        self.assertEqual(events[-1][0], "event: done")
+        done = json.loads(events[-1][1][len("data: "):])
+        self.assertEqual(done["status"], "exact")
+        self.assertAlmostEqual(done["distance"], 65)
+        print("✓ /api/solve_tsp_stream streams incumbents and a final result.")
+
+    def test_solve_tsp_batch(self):
+        print("\nTesting /api/solve_tsp_batch...")
+        instance = {
+            "cities": self.sample_cities,
+            "home_city": "A",
+            "human_route": ["B", "C"],
+            "distances": self.sample_distances
+        }
+        payload = {"instances": [instance, {"cities": []}, instance]}
+        response = self.client.post("/api/solve_tsp_batch", json=payload)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        lines = [json.loads(line) for line in response.get_data(as_text=True).strip().split("\n")]
+        self.assertEqual(sorted(line["index"] for line in lines), [0, 1, 2])
+        by_index = {line["index"]: line for line in lines}
+        self.assertIn("error", by_index[1])
+        self.assertAlmostEqual(by_index[0]["held_karp"]["distance"], 65)
+        self.assertAlmostEqual(by_index[2]["branch_bound"]["distance"], 65)
+        print("✓ /api/solve_tsp_batch streams one result per instance.")
+
     def test_save_game_session(self):
         print("\nTesting /api/save_game_session...")
         payload = {
@@ -97,6 +262,90 @@ class SalesmanAPITestCase(unittest.TestCase):
         self.assertIn(response.status_code, [200, 500])  # Accept 500 if session_id=1 doesn't exist
         print("✓ /api/save_win called (success or handled failure).")
 
+    def test_save_win_records_session(self):
+        print("\nTesting /api/save_win with a complete payload...")
+        payload = {
+            "player_name": "Winner",
+            "home_city": "A",
+            "selected_cities": ["B", "C"],
+            "human_route": ["A", "B", "C", "A"],
+            "human_distance": 65,
+            "nn_distance": 70, "bb_distance": 65, "hk_distance": 65,
+            "nn_time": 0.01, "bb_time": 0.02, "hk_time": 0.03,
+            "nn_route": ["A", "B", "C", "A"],
+            "bb_route": ["A", "C", "B", "A"],
+            "hk_route": ["A", "C", "B", "A"],
+            "solver_stats": {"branch_bound": {"bb_nodes": 7}}
+        }
+        response = self.client.post("/api/save_win", json=payload)
+        self.assertEqual(response.status_code, 200)
+        with sqlite3.connect(db.db_path) as conn:
+            stored = conn.execute(
+                "SELECT solver_stats FROM game_sessions WHERE player_name = 'Winner' ORDER BY id DESC LIMIT 1"
+            ).fetchone()[0]
+        self.assertEqual(json.loads(stored), payload["solver_stats"])
+        payload["route_format"] = "packed"
+        self.assertEqual(self.client.post("/api/save_win", json=payload).status_code, 200)
+        payload["route_format"] = "zip"
+        self.assertEqual(self.client.post("/api/save_win", json=payload).status_code, 400)
+        print("✓ /api/save_win saves the session and the win.")
+
+    def test_save_with_a_timed_out_solver(self):
+        print("\nTesting saves where a solver timed out...")
+        payload = {
+            "player_name": "Patient",
+            "home_city": "A",
+            "selected_cities": ["B", "C"],
+            "human_route": ["A", "B", "C", "A"],
+            "human_distance": 65,
+            "nn_distance": 70, "bb_distance": None, "hk_distance": 65,
+            "nn_time": 0.01, "bb_time": None, "hk_time": 0.03,
+            "nn_route": ["A", "B", "C", "A"],
+            "bb_route": [],
+            "hk_route": ["A", "C", "B", "A"]
+        }
+        response = self.client.post("/api/save_game_session", json=payload)
+        self.assertEqual(response.status_code, 200)
+        session_id = response.get_json()["session_id"]
+        with sqlite3.connect(db.db_path) as conn:
+            row = conn.execute(
+                "SELECT nn_distance, bb_distance, bb_time FROM game_sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+        self.assertEqual(row, (70.0, None, None))
+        self.assertEqual(self.client.post("/api/save_win", json=payload).status_code, 200)
+        stats = self.client.get("/api/tsp_assets/get_algorithm_stats").get_json()
+        # The newest rounds are charted with a gap where branch and bound has no time
+        self.assertIn(None, stats["bb_times"])
+        print("✓ Timed-out solvers are saved with NULL distances and times.")
+
+    def test_database_migrates_not_null_distances(self):
+        print("\nTesting the migration of NOT NULL distance columns...")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "old.db")
+            with sqlite3.connect(path) as conn:
+                conn.execute('''
+                    CREATE TABLE game_sessions (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        player_name TEXT NOT NULL, home_city TEXT NOT NULL, selected_cities TEXT NOT NULL,
+                        nn_distance REAL NOT NULL, bb_distance REAL NOT NULL, hk_distance REAL NOT NULL,
+                        nn_time REAL NOT NULL, bb_time REAL NOT NULL, hk_time REAL NOT NULL,
+                        nn_route TEXT, bb_route TEXT, hk_route TEXT,
+                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                conn.execute(
+                    "INSERT INTO game_sessions (player_name, home_city, selected_cities, nn_distance, bb_distance, "
+                    "hk_distance, nn_time, bb_time, hk_time) VALUES ('Old', 'A', '[]', 1, 2, 3, 4, 5, 6)"
+                )
+            migrated = TSPDatabase(path)
+            self.assertIsNotNone(migrated.record_game_session("New", "A", [], 1, None, 3, 4, None, 6))
+            with sqlite3.connect(path) as conn:
+                rows = conn.execute("SELECT id, player_name, bb_distance FROM game_sessions ORDER BY id").fetchall()
+                schema = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'win_players'").fetchone()[0]
+            self.assertEqual(rows, [(1, "Old", 2.0), (2, "New", None)])
+            self.assertIn("REFERENCES game_sessions(id)", schema)
+        print("✓ Old databases are rebuilt with nullable distance columns.")
+
     def test_db_viewer(self):
         print("\nTesting /api/db_viewer...")
         response = self.client.get("/api/db_viewer")
@@ -104,6 +353,35 @@ class SalesmanAPITestCase(unittest.TestCase):
         self.assertIn("<html>", response.get_data(as_text=True))
         print("✓ /api/db_viewer returns HTML successfully.")
 
+    def test_db_viewer_pages_with_keyset_cursor(self):
+        print("\nTesting /api/db_viewer pagination and /api/tsp_assets/get_algorithm_stats...")
+        session = {
+            "player_name": "Pager",
+            "home_city": "A",
+            "selected_cities": ["B", "C"],
+            "nn_distance": 70, "bb_distance": 65, "hk_distance": 65,
+            "nn_time": 0.01, "bb_time": 0.02, "hk_time": 0.03,
+        }
+        for _ in range(3):
+            self.assertEqual(self.client.post("/api/save_game_session", json=session).status_code, 200)
+
+        first = self.client.get("/api/db_viewer?page_size=2").get_data(as_text=True)
+        self.assertIn("<html>", first)
+        self.assertIn("Older sessions", first)
+        link = re.search(r'href="\?([^"]*before_id[^"]*)"', first).group(1)
+        second = self.client.get("/api/db_viewer?" + html.unescape(link)).get_data(as_text=True)
+        first_ids = re.findall(r"<tr><td>(\d+)</td>", first.split("<h2>Win Players</h2>")[0])
+        second_ids = re.findall(r"<tr><td>(\d+)</td>", second.split("<h2>Win Players</h2>")[0])
+        self.assertEqual(len(first_ids), 2)
+        self.assertTrue(second_ids)
+        self.assertLess(int(second_ids[0]), int(first_ids[-1]))
+        self.assertEqual(self.client.get("/api/db_viewer?page_size=0").status_code, 400)
+
+        stats = self.client.get("/api/tsp_assets/get_algorithm_stats").get_json()
+        self.assertEqual(len(stats["nn_times"]), 10)
+        self.assertEqual(stats["city_counts"][-1], 2)
+        print("✓ /api/db_viewer pages through sessions newest first.")
+
     def test_solve_tsp_missing_fields(self):
         print("\nTesting /api/solve_tsp with missing fields...")
         payload = {}  # Empty on purpose
@@ -111,6 +389,349 @@ class SalesmanAPITestCase(unittest.TestCase):
         self.assertEqual(response.status_code, 400)
         print("✓ /api/solve_tsp correctly handles missing input.")
 
+    def test_nearest_neighbor_with_distance_matrix(self):
+        print("\nTesting nearest neighbor on a per-request distance matrix...")
+        distances = DistanceMatrix.from_json(self.sample_distances)
+        route = [self.sample_cities[0], self.sample_cities[1], self.sample_cities[2], self.sample_cities[0]]
+        path, distance, _ = tsp_nearest_neighbor(route, distances)
+        self.assertEqual([city['id'] for city in path], [0, 1, 2, 0])
+        self.assertAlmostEqual(distance, 65)
+        self.assertAlmostEqual(distances.path_distance(path[:-1]), 65)
+        print("✓ Nearest neighbor reads distances from the request matrix.")
+
+    def test_held_karp_matches_brute_force(self):
+        print("\nTesting vectorized Held-Karp against brute force...")
+        rng = np.random.default_rng(7)
+        dist = rng.uniform(50, 100, (7, 7))
+        dist = (dist + dist.T) / 2
+        np.fill_diagonal(dist, 0)
+        tour, cost = held_karp_tour(dist)
+        best = min(
+            sum(dist[a, b] for a, b in zip((0,) + p, p + (0,)))
+            for p in permutations(range(1, 7))
+        )
+        self.assertAlmostEqual(cost, best)
+        self.assertEqual(tour[0], 0)
+        self.assertEqual(tour[-1], 0)
+        self.assertEqual(sorted(tour[1:-1]), list(range(1, 7)))
+        print("✓ Held-Karp returns the optimal tour.")
+
+    def test_parallel_held_karp_matches_serial(self):
+        print("\nTesting shared-memory parallel Held-Karp...")
+        rng = np.random.default_rng(11)
+        dist = rng.uniform(1, 100, (17, 17))
+        np.fill_diagonal(dist, 0)
+        tour, cost = held_karp_tour(dist)
+        parallel_tour, parallel_cost = parallel_held_karp_tour(dist, workers=2)
+        self.assertEqual(parallel_tour, tour)
+        self.assertAlmostEqual(parallel_cost, cost)
+        print("✓ Parallel Held-Karp finds the same tour as the serial engine.")
+
+    def test_out_of_core_held_karp_matches_in_memory(self):
+        print("\nTesting memory-mapped Held-Karp...")
+        rng = np.random.default_rng(13)
+        dist = rng.uniform(1, 100, (12, 12))
+        np.fill_diagonal(dist, 0)
+        tour, cost = held_karp_tour(dist)
+        disk_tour, disk_cost = out_of_core_held_karp_tour(dist)
+        self.assertEqual(sorted(disk_tour[1:-1]), list(range(1, 12)))
+        self.assertAlmostEqual(disk_cost, cost, places=3)
+        print("✓ Out-of-core Held-Karp finds an optimal tour.")
+
+    def test_solver_stats_counters_and_trace(self):
+        print("\nTesting solver instrumentation...")
+        rng = np.random.default_rng(17)
+        dist = rng.uniform(1, 100, (8, 8))
+        np.fill_diagonal(dist, 0)
+        result = run_solver("held_karp", dist, time.time() + 5)
+        # Layers 2..7 over 7 cities: sum of k * C(7, k)
+        self.assertEqual(result["stats"]["dp_cells"], 7 * 2 ** 6 - 7)
+        self.assertNotIn("trace", result["stats"])
+
+        result = run_solver("branch_bound", dist, time.time() + 5, resolve_options(trace=True))
+        self.assertTrue(result["stats"]["complete"])
+        self.assertGreater(result["stats"]["bound_evals"], 0)
+        events = {entry["event"] for entry in result["stats"]["trace"]}
+        self.assertEqual(events, {"incumbent", "expand"})
+        print("✓ Solvers report their counters and an optional trace.")
+
+    def test_lower_bound_below_optimum(self):
+        print("\nTesting the Held-Karp 1-tree lower bound...")
+        rng = np.random.default_rng(23)
+        for size in (6, 10, 14):
+            points = rng.uniform(0, 100, (size, 2))
+            dist = np.linalg.norm(points[:, None] - points[None], axis=2)
+            _, optimum = held_karp_tour(dist)
+            bound, _ = held_karp_lower_bound(dist)
+            self.assertLessEqual(bound, optimum + 1e-6)
+            self.assertGreater(bound, 0.9 * optimum)
+        print("✓ The lower bound stays below, and close to, the optimal tour.")
+
+    def test_metaheuristics_are_seeded_and_selectable(self):
+        print("\nTesting the simulated annealing / genetic solvers...")
+        rng = np.random.default_rng(29)
+        points = rng.uniform(0, 100, (25, 2))
+        dist = np.linalg.norm(points[:, None] - points[None], axis=2)
+        _, nn_cost = nearest_neighbor_tour(dist)
+        for solve, budget in ((simulated_annealing_tour, {"max_steps": 300}), (genetic_tour, {"max_generations": 30})):
+            tour, cost = solve(dist, seed=7, time_limit=None, **budget)
+            self.assertEqual(sorted(tour[:-1]), list(range(25)))
+            self.assertLessEqual(cost, nn_cost + 1e-9)
+            self.assertEqual(solve(dist, seed=7, time_limit=None, **budget), (tour, cost))
+            # An exhausted budget still returns the best tour of the initial population
+            tour, cost = solve(dist, seed=7, time_limit=0)
+            self.assertEqual(sorted(tour[:-1]), list(range(25)))
+            self.assertAlmostEqual(cost, tour_length(dist, tour))
+
+        payload = {
+            "cities": self.sample_cities,
+            "home_city": "A",
+            "human_route": ["B", "C"],
+            "distances": self.sample_distances,
+            "algorithms": ["simulated_annealing", "genetic"],
+            "time_budget": 0.2,
+            "seed": 1
+        }
+        response = self.client.post("/api/solve_tsp", json=payload)
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertAlmostEqual(data["genetic"]["distance"], 65)
+        self.assertNotIn("held_karp", data)
+        payload["algorithms"] = ["annealing"]
+        self.assertEqual(self.client.post("/api/solve_tsp", json=payload).status_code, 400)
+        print("✓ Metaheuristics are reproducible and can be requested by name.")
+
+    def test_metaheuristics_reproducible_through_the_api(self):
+        print("\nTesting seeded, iteration-bounded metaheuristics through /api/solve_tsp...")
+        rng = np.random.default_rng(31)
+        points = rng.uniform(0, 100, (14, 2))
+        dist = np.linalg.norm(points[:, None] - points[None], axis=2)
+        payload = {
+            "cities": [{"id": i, "name": chr(65 + i)} for i in range(14)],
+            "home_city": "A",
+            "human_route": [chr(65 + i) for i in range(1, 14)],
+            "distances": {str(i): {str(j): float(dist[i, j]) for j in range(14)} for i in range(14)},
+            "algorithms": ["simulated_annealing", "genetic"],
+            "time_budget": 30,
+            "seed": 5,
+            "iterations": 200
+        }
+        first = self.client.post("/api/solve_tsp", json=payload).get_json()
+        second = self.client.post("/api/solve_tsp", json=payload).get_json()
+        for name in ("simulated_annealing", "genetic"):
+            self.assertEqual(first[name]["route"], second[name]["route"])
+            self.assertEqual(first[name]["distance"], second[name]["distance"])
+        for iterations in (0, -3, 2.5, True, "100"):
+            payload["iterations"] = iterations
+            self.assertEqual(self.client.post("/api/solve_tsp", json=payload).status_code, 400)
+        self.assertEqual(resolve_options(iterations=10 ** 12)["iterations"], MAX_ITERATIONS)
+        print("✓ A seed and an iteration count reproduce the metaheuristic tours.")
+
+    def test_tsplib_loader_and_benchmark_regressions(self):
+        print("\nTesting the TSPLIB loader and benchmark regression check...")
+        explicit = parse_tsplib(
+            "NAME : tiny4\nTYPE : TSP\nDIMENSION : 4\nEDGE_WEIGHT_TYPE : EXPLICIT\n"
+            "EDGE_WEIGHT_FORMAT : UPPER_ROW\nEDGE_WEIGHT_SECTION\n3 4 5\n6 7\n8\nEOF\n"
+        )
+        self.assertEqual(explicit.name, "tiny4")
+        self.assertEqual(explicit.dist[0, 3], 5)
+        self.assertEqual(explicit.dist[3, 1], 7)
+        self.assertEqual(explicit.dist[2, 2], 0)
+        euclidean = parse_tsplib(
+            "NAME : triangle\nTYPE : TSP\nDIMENSION : 3\nEDGE_WEIGHT_TYPE : EUC_2D\n"
+            "NODE_COORD_SECTION\n1 0 0\n2 3 0\n3 3 4.4\nEOF\n"
+        )
+        # TSPLIB rounds to the nearest integer: sqrt(9 + 19.36) = 5.33 -> 5
+        self.assertEqual(euclidean.dist[0, 2], 5)
+
+        first = generate_instance("clustered", 12, seed=4)
+        second = generate_instance("clustered", 12, seed=4)
+        self.assertTrue(np.array_equal(first.dist, second.dist))
+        self.assertEqual(first.optimum, held_karp_tour(first.dist)[1])
+
+        baseline = [{"instance": "a", "engine": "held_karp", "status": "exact", "time": 1.0, "length": 100.0}]
+        current = [{"instance": "a", "engine": "held_karp", "status": "timed_out", "time": 2.0, "length": None}]
+        metrics = {item["metric"] for item in find_regressions(current, baseline)}
+        self.assertEqual(metrics, {"status", "length", "time"})
+        self.assertEqual(find_regressions(baseline, baseline), [])
+        print("✓ TSPLIB files load and benchmark regressions are detected.")
+
+    def test_benchmark_covers_held_karp_modes_and_euclidean(self):
+        print("\nTesting the benchmark's Held-Karp mode and Euclidean engines...")
+        instance = generate_instance("uniform", 9, seed=1)
+        engines = ["held_karp", "held_karp_parallel", "held_karp_out_of_core", "euclidean"]
+        records = run_benchmark([instance], engines, time_budget=5.0, measure_memory=False)
+        self.assertEqual([r["engine"] for r in records], engines)
+        for record in records[:3]:
+            self.assertEqual(record["status"], "exact")
+            self.assertAlmostEqual(record["length"], instance.optimum)
+        self.assertEqual(records[3]["status"], "heuristic")
+        self.assertGreaterEqual(records[3]["length"], instance.optimum - 1e-9)
+        # Instances without coordinates have nothing for the Euclidean solver to run on
+        instance.coords = None
+        self.assertEqual(run_benchmark([instance], ["euclidean"], measure_memory=False), [])
+        print("✓ The benchmark runs every Held-Karp mode and the Euclidean solver.")
+
+    def test_branch_and_bound_matches_held_karp(self):
+        print("\nTesting best-first branch and bound against Held-Karp...")
+        rng = np.random.default_rng(11)
+        dist = rng.uniform(50, 100, (9, 9))
+        dist = (dist + dist.T) / 2
+        np.fill_diagonal(dist, 0)
+        stats = SolverStats()
+        tour, cost = branch_and_bound_tour(dist, stats=stats)
+        self.assertAlmostEqual(cost, held_karp_tour(dist)[1])
+        self.assertEqual(sorted(tour[1:-1]), list(range(1, 9)))
+        self.assertGreater(stats.bb_nodes, 0)
+        self.assertGreater(stats.prunes, 0)
+        self.assertGreaterEqual(stats.bound_evals, stats.bb_nodes)
+        self.assertIsNone(stats.trace)
+        print("✓ Branch and bound is exact and reports its counters.")
+
+    def test_local_search_improves_nearest_neighbor(self):
+        print("\nTesting 2-opt / Or-opt local search...")
+        rng = np.random.default_rng(3)
+        points = rng.uniform(0, 100, (60, 2))
+        dist = np.linalg.norm(points[:, None] - points[None], axis=2)
+        nn_tour, nn_cost = nearest_neighbor_tour(dist)
+        tour, cost = improve_tour(dist, nn_tour)
+        self.assertEqual(tour[0], 0)
+        self.assertEqual(tour[-1], 0)
+        self.assertEqual(sorted(tour[:-1]), list(range(60)))
+        self.assertLess(cost, nn_cost)
+        self.assertAlmostEqual(cost, sum(dist[a, b] for a, b in zip(tour, tour[1:])))
+        print("✓ Local search shortens the greedy tour.")
+
+    def test_local_search_on_asymmetric_distances(self):
+        print("\nTesting local search on asymmetric distances...")
+        improved = 0
+        for seed in range(40):
+            rng = np.random.default_rng(seed)
+            n = 6 if seed == 0 else 30
+            dist = rng.uniform(1, 100, (n, n))
+            np.fill_diagonal(dist, 0)
+            nn_tour, nn_cost = nearest_neighbor_tour(dist)
+            # No deadline: the search has to stop on its own
+            tour, cost = improve_tour(dist, nn_tour)
+            self.assertEqual(sorted(tour[:-1]), list(range(n)))
+            self.assertAlmostEqual(cost, tour_length(dist, tour))
+            self.assertLessEqual(cost, nn_cost + 1e-9)
+            improved += cost < nn_cost - 1e-9
+        self.assertGreater(improved, 30)
+        print("✓ Local search scores reversals with directed costs and terminates.")
+
+    def test_local_search_never_returns_a_longer_tour(self):
+        print("\nTesting that local search keeps the given tour when it finds nothing better...")
+        rng = np.random.default_rng(41)
+        dist = rng.uniform(1, 100, (30, 30))
+        np.fill_diagonal(dist, 0)
+        rows = dist.tolist()
+        nn_tour, nn_cost = nearest_neighbor_tour(dist)
+        # A callable is taken to be symmetric, so on these distances the moves are misjudged
+        tour, cost = improve_tour(lambda a, b: rows[a][b], nn_tour, neighbors=candidate_lists(dist), time_limit=0.2)
+        self.assertLessEqual(cost, nn_cost + 1e-9)
+        self.assertAlmostEqual(cost, tour_length(dist, tour))
+        print("✓ Local search never hands back a longer tour.")
+
+    def test_multi_start_nearest_neighbor(self):
+        print("\nTesting multi-start nearest neighbor...")
+        rng = np.random.default_rng(11)
+        points = rng.uniform(0, 100, (80, 2))
+        dist = np.linalg.norm(points[:, None] - points[None], axis=2)
+        _, nn_cost = nearest_neighbor_tour(dist)
+        tour, cost = multi_start_nearest_neighbor_tour(dist)
+        self.assertEqual(tour[0], 0)
+        self.assertEqual(tour[-1], 0)
+        self.assertEqual(sorted(tour[:-1]), list(range(80)))
+        self.assertLessEqual(cost, nn_cost + 1e-9)
+        self.assertAlmostEqual(cost, sum(dist[a, b] for a, b in zip(tour, tour[1:])))
+
+        result = run_solver("nearest_neighbor", dist, time.time() + 5, resolve_options(nearest_neighbor_mode="multi_start"))
+        self.assertAlmostEqual(result["distance"], cost)
+        with self.assertRaises(ValueError):
+            resolve_options(nearest_neighbor_mode="every")
+        print("✓ The best of all starts is never longer than the home-city tour.")
+
+    def test_result_cache_matches_relabeled_instance(self):
+        print("\nTesting the canonical TSP result cache...")
+        rng = np.random.default_rng(5)
+        dist = rng.uniform(50, 100, (7, 7))
+        dist = (dist + dist.T) / 2
+        np.fill_diagonal(dist, 0)
+        perm = [0, 3, 6, 1, 5, 2, 4]
+        relabeled = dist[np.ix_(perm, perm)]
+        self.assertEqual(canonical_instance(dist)[0], canonical_instance(relabeled)[0])
+
+        cache = TSPResultCache()
+        first = solve_cached(dist, cache=cache)
+        second = solve_cached(relabeled, cache=cache)
+        self.assertTrue(second["held_karp"]["cached"])
+        self.assertAlmostEqual(second["held_karp"]["distance"], first["held_karp"]["distance"])
+        tour = second["held_karp"]["tour"]
+        self.assertAlmostEqual(sum(relabeled[a, b] for a, b in zip(tour, tour[1:])), first["held_karp"]["distance"])
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+        print("✓ Relabeled instances are served from the cache.")
+
+    def test_compact_route_encoding(self):
+        print("\nTesting compact route responses and packed route storage...")
+        self.assertEqual(unpack_route(pack_route(["A", "C", "B", "A"])), [0, 2, 1, 0])
+        self.assertEqual(unpack_route(pack_route([0, 300, 0])), [0, 300, 0])
+        self.assertEqual(decode_route_column(pack_route(["A", "C", "B", "A"])), ["A", "C", "B", "A"])
+        self.assertEqual(decode_route_column('["A", "B"]'), ["A", "B"])
+
+        payload = {
+            "cities": self.sample_cities,
+            "home_city": "A",
+            "human_route": ["B", "C"],
+            "distances": self.sample_distances,
+            "route_format": "compact"
+        }
+        response = self.client.post("/api/solve_tsp", json=payload)
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data["cities"][0]["name"], "A")
+        route = data["held_karp"]["route"]
+        self.assertEqual((route[0], route[-1]), (0, 0))
+        self.assertEqual(sorted(route[:-1]), [0, 1, 2])
+
+        payload["route_format"] = "tiny"
+        response = self.client.post("/api/solve_tsp", json=payload)
+        self.assertEqual(response.status_code, 400)
+
+        session = {
+            "player_name": "Packer",
+            "home_city": "A",
+            "selected_cities": ["B", "C"],
+            "nn_distance": 70, "bb_distance": 65, "hk_distance": 65,
+            "nn_time": 0.01, "bb_time": 0.02, "hk_time": 0.03,
+            "nn_route": ["A", "B", "C", "A"],
+            "bb_route": ["A", "C", "B", "A"],
+            "hk_route": ["A", "C", "B", "A"],
+            "route_format": "packed"
+        }
+        response = self.client.post("/api/save_game_session", json=session)
+        self.assertEqual(response.status_code, 200)
+        page = self.client.get("/api/db_viewer").get_data(as_text=True)
+        self.assertIn(html.escape(json.dumps(["A", "C", "B", "A"])), page)
+        print("✓ Compact routes are returned on request and packed routes decode in the viewer.")
+
+    def test_solve_tsp_euclidean(self):
+        print("\nTesting /api/solve_tsp_euclidean...")
+        payload = {"num_cities": 300, "seed": 7, "time_budget": 2}
+        response = self.client.post("/api/solve_tsp_euclidean", json=payload)
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        tour = data["tour"]
+        self.assertEqual(tour[0], 0)
+        self.assertEqual(tour[-1], 0)
+        self.assertEqual(sorted(tour[:-1]), list(range(300)))
+        self.assertLessEqual(data["distance"], data["construction_distance"] + 1e-6)
+
+        response = self.client.post("/api/solve_tsp_euclidean", json={"coordinates": [[0, 0], [1]]})
+        self.assertEqual(response.status_code, 400)
+        print("✓ /api/solve_tsp_euclidean returns a full tour for a coordinate instance.")
+
 if __name__ == "__main__":
     unittest.main()
 
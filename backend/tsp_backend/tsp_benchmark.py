@@ -0,0 +1,195 @@
+"""Benchmark every TSP engine over the reproducible corpus.
+
+    python -m tsp_backend.tsp_benchmark --output results.json
+    python -m tsp_backend.tsp_benchmark --baseline results.json --tsplib-dir ~/tsplib --optima optima.json
+
+Writes one JSON report (time, peak memory, tour length and gap to the known optimum per
+instance and engine) and, given a baseline report, exits with status 1 on regressions.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+from tsp_backend.tsp_corpus import load_corpus
+from tsp_backend.tsp_distance import tour_length
+from tsp_backend.tsp_euclidean import solve_euclidean
+from tsp_backend.tsp_executor import DEFAULT_TIME_BUDGETS, SOLVERS, resolve_options, run_solver
+
+# Randomized engines run a fixed number of steps / generations so a seed reproduces their
+# tours on any machine; the time budget only guards against runaway runs
+BENCHMARK_ITERATIONS = {'simulated_annealing': 5000, 'genetic': 300}
+# Engines besides the solver registry: Held-Karp in its other modes, and the matrix-free
+# Euclidean solver, which only runs on instances that come with coordinates
+HELD_KARP_MODE_ENGINES = {'held_karp_parallel': 'parallel', 'held_karp_out_of_core': 'out_of_core'}
+EUCLIDEAN_ENGINE = 'euclidean'
+EUCLIDEAN_TIME_BUDGET = 5.0
+ENGINES = list(SOLVERS) + list(HELD_KARP_MODE_ENGINES) + [EUCLIDEAN_ENGINE]
+# Exact engines are skipped above these sizes instead of spending their whole budget
+EXACT_MAX_CITIES = {'branch_bound': 16, 'held_karp': 18, 'held_karp_parallel': 18, 'held_karp_out_of_core': 18}
+# A result regresses when its tour gets longer by more than LENGTH_TOLERANCE (relative),
+# when it gets slower by more than TIME_TOLERANCE (relative) and MIN_TIME_DELTA seconds,
+# or when an exact result stops being exact
+LENGTH_TOLERANCE = 0.01
+TIME_TOLERANCE = 0.5
+MIN_TIME_DELTA = 0.05
+
+
+def _solver(engine):
+    # The registry solver behind an engine
+    return 'held_karp' if engine in HELD_KARP_MODE_ENGINES else engine
+
+
+def _run_euclidean(instance, budget):
+    # The tour is scored on the instance's matrix (TSPLIB rounds distances) so its gap
+    # compares with the other engines'
+    start_time = time.time()
+    tour, _, _ = solve_euclidean(instance.coords, time_limit=budget)
+    return {'tour': tour, 'distance': tour_length(instance.dist, tour), 'time': time.time() - start_time,
+            'status': 'heuristic'}
+
+
+def _run(engine, instance, budget, options):
+    try:
+        if engine == EUCLIDEAN_ENGINE:
+            return _run_euclidean(instance, budget)
+        return run_solver(_solver(engine), instance.dist, time.time() + budget, options)
+    except Exception as e:
+        return {'tour': None, 'distance': None, 'time': None, 'status': 'error', 'error': str(e)}
+
+
+def benchmark_engine(instance, engine, budget, seed=None, measure_memory=True):
+    """Time one engine on one instance; memory is measured in a second run so that
+    tracemalloc's overhead does not end up in the timing."""
+    options = resolve_options(
+        held_karp_mode=HELD_KARP_MODE_ENGINES.get(engine), seed=seed, iterations=BENCHMARK_ITERATIONS.get(engine)
+    )
+    result = _run(engine, instance, budget, options)
+    peak = None
+    if measure_memory and result['status'] != 'error':
+        tracemalloc.start()
+        try:
+            _run(engine, instance, budget, options)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    length = result['distance']
+    gap = None
+    if length is not None and instance.optimum:
+        gap = (length - instance.optimum) / instance.optimum
+    record = {
+        'instance': instance.name,
+        'kind': instance.kind,
+        'cities': len(instance),
+        'engine': engine,
+        'status': result['status'],
+        'time': result['time'],
+        'peak_memory_bytes': peak,
+        'length': length,
+        'optimum': instance.optimum,
+        'gap': gap,
+    }
+    if 'error' in result:
+        record['error'] = result['error']
+    return record
+
+
+def run_benchmark(instances, engines=None, time_budget=None, seed=0, measure_memory=True):
+    engines = engines or ENGINES
+    records = []
+    for instance in instances:
+        for engine in engines:
+            if len(instance) > EXACT_MAX_CITIES.get(engine, len(instance)):
+                continue
+            if engine == EUCLIDEAN_ENGINE and instance.coords is None:
+                continue
+            if time_budget is not None:
+                budget = time_budget
+            elif engine == EUCLIDEAN_ENGINE:
+                budget = EUCLIDEAN_TIME_BUDGET
+            else:
+                budget = DEFAULT_TIME_BUDGETS[_solver(engine)]
+            records.append(benchmark_engine(instance, engine, budget, seed, measure_memory))
+    return records
+
+
+def find_regressions(records, baseline_records):
+    """Compare a run against a baseline run, matching records by (instance, engine)."""
+    baseline = {(r['instance'], r['engine']): r for r in baseline_records}
+    regressions = []
+    for record in records:
+        old = baseline.get((record['instance'], record['engine']))
+        if old is None:
+            continue
+
+        def regressed(metric, before, after):
+            regressions.append({
+                'instance': record['instance'],
+                'engine': record['engine'],
+                'metric': metric,
+                'baseline': before,
+                'current': after,
+            })
+
+        if old['status'] == 'exact' and record['status'] != 'exact':
+            regressed('status', old['status'], record['status'])
+        if old['length'] is not None:
+            if record['length'] is None:
+                regressed('length', old['length'], None)
+            elif record['length'] > old['length'] * (1 + LENGTH_TOLERANCE) + 1e-9:
+                regressed('length', old['length'], record['length'])
+        if old['time'] is not None and record['time'] is not None:
+            if record['time'] > old['time'] * (1 + TIME_TOLERANCE) and record['time'] - old['time'] > MIN_TIME_DELTA:
+                regressed('time', old['time'], record['time'])
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the TSP engines over a reproducible corpus.")
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, help="Engines to run (default: all)")
+    parser.add_argument('--time-budget', type=float, help="Seconds per engine run (default: each engine's default budget)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the randomized engines")
+    parser.add_argument('--tsplib-dir', help="Also run every .tsp file in this directory")
+    parser.add_argument('--optima', help="JSON file mapping TSPLIB instance names to their optimal lengths")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc run")
+    parser.add_argument('--output', help="Write the JSON report here instead of stdout")
+    parser.add_argument('--baseline', help="Earlier JSON report to check for regressions")
+    args = parser.parse_args(argv)
+
+    instances = load_corpus(args.tsplib_dir, args.optima)
+    records = run_benchmark(instances, args.engines, args.time_budget, args.seed, not args.no_memory)
+    report = {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'time_budget': args.time_budget,
+        },
+        'results': records,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(records, json.load(f)['results'])
+        report['regressions'] = regressions
+        for item in regressions:
+            print(f"REGRESSION {item['instance']} / {item['engine']}: {item['metric']} "
+                  f"{item['baseline']} -> {item['current']}", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
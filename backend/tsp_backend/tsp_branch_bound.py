@@ -0,0 +1,152 @@
+import heapq
+import time
+import numpy as np
+from tsp_backend.tsp_distance import tour_length
+from tsp_backend.tsp_heuristics import nearest_neighbor_tour
+from tsp_backend.tsp_stats import TRACE_LIMIT
+
+
+class MSTBound:
+    """Lower bound on finishing a tour: cheapest edge out of the last city, an MST over the
+    unvisited cities and the cheapest edge back home.
+
+    The edge list is sorted once per instance and the MST part only depends on which
+    cities are left, so it is computed once per remaining set and reused by every node
+    that reaches that set through a different order.
+    """
+
+    def __init__(self, dist):
+        self.rows = dist.tolist()
+        n = len(dist)
+        # MST over undirected edges; min(d_ij, d_ji) keeps the bound valid for asymmetric input
+        sym = np.minimum(dist, dist.T)
+        i, j = np.triu_indices(n, 1)
+        keep = i > 0
+        i, j = i[keep], j[keep]
+        order = np.argsort(sym[i, j], kind='stable')
+        self.edges = list(zip(i[order].tolist(), j[order].tolist(), sym[i, j][order].tolist()))
+        self.n = n
+        self.remaining_cost = {}
+        self.evaluations = 0
+
+    def _remaining_cost(self, mask):
+        """MST weight of the cities in mask plus their cheapest edge back home (memoized)."""
+        cached = self.remaining_cost.get(mask)
+        if cached is not None:
+            return cached
+        cities = [c for c in range(1, self.n) if mask >> c & 1]
+        parent = list(range(self.n))
+
+        def find(v):
+            while parent[v] != v:
+                parent[v] = parent[parent[v]]
+                v = parent[v]
+            return v
+
+        weight = 0.0
+        needed = len(cities) - 1
+        for a, b, w in self.edges:
+            if needed == 0:
+                break
+            if not (mask >> a & 1 and mask >> b & 1):
+                continue
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[root_a] = root_b
+                weight += w
+                needed -= 1
+        cost = weight + min(self.rows[c][0] for c in cities)
+        self.remaining_cost[mask] = cost
+        return cost
+
+    def __call__(self, last, mask, cost):
+        self.evaluations += 1
+        row = self.rows[last]
+        to_unvisited = min(row[c] for c in range(1, self.n) if mask >> c & 1)
+        return cost + to_unvisited + self._remaining_cost(mask)
+
+
+def branch_and_bound_tour(dist, initial_tour=None, stats=None, deadline=None, max_nodes=None, on_improve=None):
+    """Exact best-first branch and bound over a dense distance matrix (home is index 0).
+
+    The search starts from `initial_tour` (the nearest-neighbor tour by default) as the
+    incumbent, so every node whose bound cannot beat it is pruned straight away.
+
+    It is also an anytime search: when `deadline` (a time.time() value) passes or
+    `max_nodes` nodes have been expanded it stops and returns the best tour so far.
+    `on_improve(tour, cost)` is called with the starting incumbent and every better one.
+    Returns (tour, cost); a SolverStats passed as `stats` receives the node, prune and
+    bound counters and `complete`, which is False when a budget stopped the search early.
+    """
+    dist = np.asarray(dist, dtype=np.float64)
+    n = len(dist)
+    if n <= 2:
+        tour = list(range(n)) + [0]
+        if stats is not None:
+            stats.complete = True
+        return tour, tour_length(dist, tour)
+
+    if initial_tour is None:
+        initial_tour, _ = nearest_neighbor_tour(dist)
+    best_tour = list(initial_tour)
+    best_cost = tour_length(dist, best_tour)
+    if on_improve is not None:
+        on_improve(best_tour, best_cost)
+    trace = stats.trace if stats is not None else None
+    if trace is not None:
+        stats.record('incumbent', cost=best_cost, nodes=0)
+
+    bound = MSTBound(dist)
+    rows = bound.rows
+    expanded = 0
+    pruned = 0
+    counter = 0  # Tie-breaker so the heap never compares paths
+
+    complete = True
+    full = ((1 << n) - 1) ^ 1
+    # Frontier entries: (bound, -depth, counter, cost, last city, unvisited mask, path)
+    frontier = [(bound(0, full, 0.0), -1, counter, 0.0, 0, full, (0,))]
+    while frontier:
+        node_bound, depth, _, cost, last, mask, path = heapq.heappop(frontier)
+        if node_bound >= best_cost:
+            pruned += 1
+            continue
+        if max_nodes is not None and expanded >= max_nodes:
+            complete = False
+            break
+        expanded += 1
+        if trace is not None and len(trace) < TRACE_LIMIT:
+            trace.append({'event': 'expand', 'city': last, 'depth': -depth, 'bound': node_bound, 'cost': cost})
+        if deadline is not None and expanded % 256 == 0 and time.time() > deadline:
+            complete = False
+            break
+        row = rows[last]
+        for city in range(1, n):
+            if not mask >> city & 1:
+                continue
+            child_cost = cost + row[city]
+            child_mask = mask ^ (1 << city)
+            if child_mask == 0:
+                total = child_cost + rows[city][0]
+                # Ignore float noise so the same tour summed in another order isn't "better"
+                if total < best_cost - 1e-9:
+                    best_cost = total
+                    best_tour = list(path) + [city, 0]
+                    if on_improve is not None:
+                        on_improve(best_tour, best_cost)
+                    if trace is not None:
+                        stats.record('incumbent', cost=best_cost, nodes=expanded)
+                continue
+            child_bound = bound(city, child_mask, child_cost)
+            if child_bound >= best_cost:
+                pruned += 1
+                continue
+            counter += 1
+            heapq.heappush(frontier, (child_bound, depth - 1, counter, child_cost, city, child_mask, path + (city,)))
+
+    if stats is not None:
+        stats.bb_nodes += expanded
+        stats.prunes += pruned
+        stats.bound_evals += bound.evaluations
+        stats.complete = complete
+    return best_tour, best_cost
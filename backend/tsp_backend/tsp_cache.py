@@ -0,0 +1,157 @@
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from tsp_backend.tsp_executor import DEFAULT_ALGORITHMS, solve_batch, solve_concurrently
+
+# Only exact results are shared between requests; heuristics are cheap to rerun
+EXACT_ALGORITHMS = ('branch_bound', 'held_karp')
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+def canonical_instance(dist):
+    """Relabel-invariant form of an instance (home stays at index 0).
+
+    The other cities are ordered by their distance profile, so two requests that pick the
+    same cities in a different order, or under different ids, get the same matrix.
+    Returns (key, perm) where canonical index k is index perm[k] of `dist`.
+    """
+    dist = np.asarray(dist, dtype=np.float64)
+    n = len(dist)
+
+    def profile(i):
+        return (dist[0, i], dist[i, 0], tuple(np.sort(dist[i])), tuple(np.sort(dist[:, i])))
+
+    perm = [0] + sorted(range(1, n), key=profile)
+    canonical = np.ascontiguousarray(dist[np.ix_(perm, perm)])
+    key = hashlib.sha256(n.to_bytes(4, 'little') + canonical.tobytes()).hexdigest()
+    return key, perm
+
+
+class TSPResultCache:
+    """Thread-safe LRU of optimal tours keyed by canonical instance, bounded by memory use."""
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _entry_size(key, tour):
+        return sys.getsizeof(key) + sys.getsizeof(tour) + 28 * len(tour) + 64
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def put(self, key, tour, cost):
+        tour = tuple(tour)
+        size = self._entry_size(key, tour)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size_bytes -= old[2]
+            self._entries[key] = (tour, cost, size)
+            self.size_bytes += size
+            while self.size_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size_bytes -= evicted[2]
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'size_bytes': self.size_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+result_cache = TSPResultCache()
+
+
+def lookup_exact(dist, algorithms, cache=result_cache):
+    """Check the cache for an instance. Returns (lookup, to_run): the solvers that still
+    have to run, and a lookup to pass to merge_exact once they have."""
+    key, perm = canonical_instance(dist)
+    exact = [name for name in algorithms if name in EXACT_ALGORITHMS]
+    hit = cache.get(key) if exact else None
+    to_run = [name for name in algorithms if hit is None or name not in EXACT_ALGORITHMS]
+    return (key, perm, exact, hit), to_run
+
+
+def merge_exact(lookup, results, elapsed, cache=result_cache):
+    """Fill exact solvers in from a cache hit, or store a fresh exact result."""
+    key, perm, exact, hit = lookup
+    if hit is not None:
+        tour, cost = hit
+        for name in exact:
+            results[name] = {
+                'tour': [perm[i] for i in tour],
+                'distance': cost,
+                'time': elapsed,
+                'status': 'exact',
+                'stats': {},
+                'cached': True,
+            }
+        return results
+    solved = next((results[name] for name in exact if results[name]['status'] == 'exact'), None)
+    if solved is not None:
+        position = {city: k for k, city in enumerate(perm)}
+        cache.put(key, [position[i] for i in solved['tour']], solved['distance'])
+    return results
+
+
+def solve_cached(dist, algorithms=None, budgets=None, cache=result_cache, options=None):
+    """solve_concurrently, but exact solvers are answered from the cache when the
+    instance (or a relabeling of it) has been solved before."""
+    algorithms = algorithms or DEFAULT_ALGORITHMS
+    start_time = time.time()
+    lookup, to_run = lookup_exact(dist, algorithms, cache)
+    results = solve_concurrently(dist, to_run, budgets, options) if to_run else {}
+    merge_exact(lookup, results, time.time() - start_time, cache)
+    return {name: results[name] for name in algorithms}
+
+
+def solve_batch_cached(dists, algorithms=None, budgets=None, cache=result_cache, options=None):
+    """Cached counterpart of solve_batch for a {job_id: dist} mapping; yields (job_id, results)
+    as instances finish, starting with the ones fully answered from the cache."""
+    algorithms = algorithms or DEFAULT_ALGORITHMS
+    lookups = {}
+    jobs = []
+    for job_id, dist in dists.items():
+        start_time = time.time()
+        lookup, to_run = lookup_exact(dist, algorithms, cache)
+        if to_run:
+            lookups[job_id] = lookup
+            jobs.append((job_id, dist, to_run))
+        else:
+            results = merge_exact(lookup, {}, time.time() - start_time, cache)
+            yield job_id, {name: results[name] for name in algorithms}
+    for job_id, results in solve_batch(jobs, budgets, options):
+        merge_exact(lookups[job_id], results, 0.0, cache)
+        yield job_id, {name: results[name] for name in algorithms}
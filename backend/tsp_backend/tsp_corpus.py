@@ -0,0 +1,69 @@
+import glob
+import json
+import os
+import numpy as np
+from tsp_backend.tsp_held_karp import held_karp_tour
+from tsp_backend.tsp_tsplib import TSPInstance, euc_2d_matrix, load_tsplib
+
+# (kind, cities, seed) of the generated part of the benchmark corpus; never change an entry,
+# add new ones instead, or results stop being comparable with older baselines
+DEFAULT_CORPUS = [
+    ('uniform', 8, 1),
+    ('uniform', 12, 2),
+    ('uniform', 16, 3),
+    ('clustered', 12, 4),
+    ('clustered', 16, 5),
+    ('uniform', 50, 6),
+    ('clustered', 50, 7),
+    ('uniform', 200, 8),
+    ('clustered', 200, 9),
+]
+# Generated instances up to this size get their optimum from Held-Karp
+OPTIMUM_MAX_CITIES = 16
+CORPUS_WIDTH = 1000.0
+
+
+def generate_coordinates(kind, num_cities, seed, width=CORPUS_WIDTH):
+    """Seeded city coordinates in a width x width square.
+
+    'uniform' spreads cities evenly; 'clustered' puts them in Gaussian clusters of about
+    eight cities around uniform centres, like towns around a few regional hubs.
+    """
+    rng = np.random.default_rng(seed)
+    if kind == 'uniform':
+        return rng.uniform(0.0, width, (num_cities, 2))
+    if kind == 'clustered':
+        centres = rng.uniform(0.1 * width, 0.9 * width, (max(1, num_cities // 8), 2))
+        owner = rng.integers(0, len(centres), num_cities)
+        points = centres[owner] + rng.normal(0.0, 0.04 * width, (num_cities, 2))
+        return np.clip(points, 0.0, width)
+    raise ValueError(f"Unknown instance kind: {kind}")
+
+
+def generate_instance(kind, num_cities, seed, solve_optimum=True):
+    """A reproducible instance with TSPLIB EUC_2D (integer) distances."""
+    coords = generate_coordinates(kind, num_cities, seed)
+    dist = euc_2d_matrix(coords)
+    optimum = None
+    if solve_optimum and num_cities <= OPTIMUM_MAX_CITIES:
+        _, optimum = held_karp_tour(dist)
+    return TSPInstance(f"{kind}-{num_cities}-s{seed}", dist, coords, optimum, kind)
+
+
+def load_corpus(tsplib_dir=None, optima_path=None, specs=DEFAULT_CORPUS):
+    """The generated corpus, followed by every .tsp file in `tsplib_dir`.
+
+    Optimal lengths for TSPLIB files come from `optima_path`, a JSON object mapping
+    instance NAME to length (as published with the library).
+    """
+    instances = [generate_instance(kind, size, seed) for kind, size, seed in specs]
+    if tsplib_dir:
+        optima = {}
+        if optima_path:
+            with open(optima_path) as f:
+                optima = json.load(f)
+        for path in sorted(glob.glob(os.path.join(tsplib_dir, '*.tsp'))):
+            instance = load_tsplib(path)
+            instance.optimum = optima.get(instance.name)
+            instances.append(instance)
+    return instances
@@ -2,6 +2,32 @@ import sqlite3
 import json
 import os
 from datetime import datetime
+from tsp_backend.tsp_route_codec import pack_route
+
+# Distances and times are NULL for a solver that timed out or failed without a tour
+GAME_SESSIONS_SCHEMA = '''
+    CREATE TABLE {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        player_name TEXT NOT NULL,
+        home_city TEXT NOT NULL,
+        selected_cities TEXT NOT NULL,
+        nn_distance REAL,
+        bb_distance REAL,
+        hk_distance REAL,
+        nn_time REAL,
+        bb_time REAL,
+        hk_time REAL,
+        nn_route TEXT,
+        bb_route TEXT,
+        hk_route TEXT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        solver_stats TEXT
+    )
+'''
+GAME_SESSIONS_COLUMNS = (
+    'id, player_name, home_city, selected_cities, nn_distance, bb_distance, hk_distance, '
+    'nn_time, bb_time, hk_time, nn_route, bb_route, hk_route, timestamp, solver_stats'
+)
 
 class TSPDatabase:
     def __init__(self, db_path="database/salesman.db"):
@@ -19,23 +45,30 @@ class TSPDatabase:
                 #cursor.execute('DROP TABLE IF EXISTS game_sessions')
                 #cursor.execute('DROP TABLE IF EXISTS win_players')
                 # Create game_sessions table (updated for BB)
+                cursor.execute(GAME_SESSIONS_SCHEMA.format(table='IF NOT EXISTS game_sessions'))
+
+                # Databases created before solver stats were recorded get the column appended
+                cursor.execute('PRAGMA table_info(game_sessions)')
+                columns = cursor.fetchall()
+                if 'solver_stats' not in [row[1] for row in columns]:
+                    cursor.execute('ALTER TABLE game_sessions ADD COLUMN solver_stats TEXT')
+
+                # Databases created while every solver had to report a distance and time are
+                # rebuilt with those columns nullable (SQLite cannot drop NOT NULL in place);
+                # the new table takes the old name last so win_players still references it
+                if any(row[1] == 'nn_distance' and row[3] for row in columns):
+                    cursor.execute(GAME_SESSIONS_SCHEMA.format(table='game_sessions_nullable'))
+                    cursor.execute(f"""
+                        INSERT INTO game_sessions_nullable ({GAME_SESSIONS_COLUMNS})
+                        SELECT {GAME_SESSIONS_COLUMNS} FROM game_sessions
+                    """)
+                    cursor.execute('DROP TABLE game_sessions')
+                    cursor.execute('ALTER TABLE game_sessions_nullable RENAME TO game_sessions')
+
+                # Newest-first reads (viewer pages, recent stats) walk this index instead of sorting the table
                 cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS game_sessions (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        player_name TEXT NOT NULL,
-                        home_city TEXT NOT NULL,
-                        selected_cities TEXT NOT NULL,
-                        nn_distance REAL NOT NULL,
-                        bb_distance REAL NOT NULL,
-                        hk_distance REAL NOT NULL,
-                        nn_time REAL NOT NULL,
-                        bb_time REAL NOT NULL,
-                        hk_time REAL NOT NULL,
-                        nn_route TEXT,
-                        bb_route TEXT,
-                        hk_route TEXT,
-                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                    )
+                    CREATE INDEX IF NOT EXISTS idx_game_sessions_timestamp
+                    ON game_sessions (timestamp DESC, id DESC)
                 ''')
 
                 # Create win_players table
@@ -59,13 +92,16 @@ class TSPDatabase:
         self, player_name, home_city, selected_cities,
         nn_distance, bb_distance, hk_distance,
         nn_time, bb_time, hk_time,
-        nn_route=None, bb_route=None, hk_route=None
+        nn_route=None, bb_route=None, hk_route=None, solver_stats=None, packed_routes=False
     ):
         try:
             selected_cities_json = json.dumps(selected_cities)
-            nn_route_json = json.dumps(nn_route or [])
-            bb_route_json = json.dumps(bb_route or [])
-            hk_route_json = json.dumps(hk_route or [])
+            # Packed routes are small BLOBs of city ids instead of JSON text (see tsp_route_codec)
+            encode = pack_route if packed_routes else json.dumps
+            nn_route_json = encode(nn_route or [])
+            bb_route_json = encode(bb_route or [])
+            hk_route_json = encode(hk_route or [])
+            solver_stats_json = json.dumps(solver_stats) if solver_stats is not None else None
 
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
@@ -74,13 +110,13 @@ class TSPDatabase:
                         player_name, home_city, selected_cities,
                         nn_distance, bb_distance, hk_distance,
                         nn_time, bb_time, hk_time,
-                        nn_route, bb_route, hk_route
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        nn_route, bb_route, hk_route, solver_stats
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (
                     player_name, home_city, selected_cities_json,
                     nn_distance, bb_distance, hk_distance,
                     nn_time, bb_time, hk_time,
-                    nn_route_json, bb_route_json, hk_route_json
+                    nn_route_json, bb_route_json, hk_route_json, solver_stats_json
                 ))
                 conn.commit()
                 print(f"Game session inserted successfully with ID {cursor.lastrowid}")
@@ -113,6 +149,52 @@ class TSPDatabase:
             print(f"Error fetching sessions: {e}")
             return []
 
+    def iter_sessions_page(self, before=None, limit=50):
+        """Yield up to `limit` sessions, newest first, starting after the keyset cursor
+        `before` = (timestamp, id) of the last row of the previous page.
+
+        Rows are read from the cursor as they are consumed, so a page never sits in memory
+        in full, and the timestamp index makes every page cost the same however deep it is.
+        """
+        query = 'SELECT * FROM game_sessions'
+        params = []
+        if before is not None:
+            query += ' WHERE (timestamp, id) < (?, ?)'
+            params.extend(before)
+        query += ' ORDER BY timestamp DESC, id DESC LIMIT ?'
+        params.append(limit)
+        with sqlite3.connect(self.db_path) as conn:
+            yield from conn.execute(query, params)
+
+    def iter_win_players_page(self, after=None, limit=50):
+        """Yield up to `limit` win_players rows as (player_name, human_route, human_distance,
+        session_id, player_id), in insertion order, starting after player_id `after`."""
+        with sqlite3.connect(self.db_path) as conn:
+            yield from conn.execute('''
+                SELECT player_name, human_route, human_distance, session_id, player_id
+                FROM win_players
+                WHERE player_id > ?
+                ORDER BY player_id
+                LIMIT ?
+            ''', (after or 0, limit))
+
+    def get_recent_session_stats(self, limit=10):
+        """(nn_time, bb_time, hk_time, number of selected cities) of the `limit` newest sessions,
+        newest first."""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                return conn.execute('''
+                    SELECT nn_time, bb_time, hk_time,
+                           CASE WHEN json_valid(selected_cities)
+                                THEN json_array_length(selected_cities) ELSE 0 END
+                    FROM game_sessions
+                    ORDER BY timestamp DESC, id DESC
+                    LIMIT ?
+                ''', (limit,)).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error fetching session stats: {e}")
+            return []
+
     def get_all_win_players(self):
         try:
             with sqlite3.connect(self.db_path) as conn:
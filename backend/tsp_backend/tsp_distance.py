@@ -0,0 +1,53 @@
+import numpy as np
+
+
+class DistanceMatrix:
+    """Distances for one request: a contiguous float array plus a city id -> row map."""
+
+    def __init__(self, values, ids):
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self.ids = list(ids)
+        self.index = {city_id: i for i, city_id in enumerate(self.ids)}
+
+    @classmethod
+    def from_json(cls, matrix):
+        """Build from the nested {"0": {"0": null, "1": 20, ...}, ...} payload format."""
+        ids = [str(k) for k in matrix.keys()]
+        index = {city_id: i for i, city_id in enumerate(ids)}
+        # Pairs missing from the payload stay unreachable
+        values = np.full((len(ids), len(ids)), np.inf)
+        for row_id, row in matrix.items():
+            i = index[str(row_id)]
+            for col_id, d in row.items():
+                col = index.get(str(col_id))
+                if col is not None:
+                    values[i, col] = 0.0 if d is None else float(d)
+        np.fill_diagonal(values, 0.0)
+        return cls(values, ids)
+
+    def __contains__(self, city):
+        return str(city['id']) in self.index
+
+    def indices(self, cities):
+        return [self.index[str(city['id'])] for city in cities]
+
+    def distance(self, a, b):
+        return float(self.values[self.index[str(a['id'])], self.index[str(b['id'])]])
+
+    def submatrix(self, cities):
+        """Dense matrix over the given cities, indexed in the same order as the list."""
+        idx = self.indices(cities)
+        return self.values[np.ix_(idx, idx)]
+
+    def path_distance(self, path):
+        """Length of the closed loop through path (the last city links back to the first)."""
+        if len(path) < 2:
+            return 0.0
+        idx = np.array(self.indices(path))
+        return float(self.values[idx, np.roll(idx, -1)].sum())
+
+
+def tour_length(dist, tour):
+    """Length of a tour given as a list of matrix indices, e.g. [0, 2, 1, 0]."""
+    tour = np.asarray(tour)
+    return float(dist[tour[:-1], tour[1:]].sum())
@@ -0,0 +1,226 @@
+import math
+import time
+import numpy as np
+from tsp_backend.tsp_local_search import improve_tour
+
+# Cities per grid cell the index aims for, and the most members of one cell a query looks at
+CELL_OCCUPANCY = 2
+MAX_CELL_MEMBERS = 32
+# Bits per axis for the Hilbert curve keys
+HILBERT_ORDER = 16
+
+
+def generate_euclidean_cities(num_cities, seed=None, width=1000.0):
+    """Uniform random city coordinates in a width x width square."""
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0.0, width, (num_cities, 2))
+
+
+class EuclideanDistances:
+    """Distances computed on demand from coordinates, so no n x n matrix is ever built."""
+
+    def __init__(self, coords):
+        self.coords = np.asarray(coords, dtype=np.float64)
+        self.xs = self.coords[:, 0].tolist()
+        self.ys = self.coords[:, 1].tolist()
+
+    def __len__(self):
+        return len(self.xs)
+
+    def __call__(self, a, b):
+        return math.hypot(self.xs[a] - self.xs[b], self.ys[a] - self.ys[b])
+
+    def tour_length(self, tour):
+        points = self.coords[np.asarray(tour)]
+        return float(np.hypot(*(points[1:] - points[:-1]).T).sum())
+
+
+def hilbert_keys(coords, order=HILBERT_ORDER):
+    """Position of every point along a Hilbert curve laid over the bounding box."""
+    coords = np.asarray(coords, dtype=np.float64)
+    side = 1 << order
+    low = coords.min(axis=0)
+    span = np.maximum(coords.max(axis=0) - low, 1e-12)
+    scaled = ((coords - low) / span * (side - 1)).astype(np.int64)
+    x, y = scaled[:, 0].copy(), scaled[:, 1].copy()
+    keys = np.zeros(len(coords), dtype=np.int64)
+    s = side >> 1
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        keys += s * s * ((3 * rx.astype(np.int64)) ^ ry.astype(np.int64))
+        # Rotate the quadrant so the curve stays continuous
+        flip = ~ry & rx
+        x = np.where(flip, side - 1 - x, x)
+        y = np.where(flip, side - 1 - y, y)
+        x, y = np.where(~ry, y, x), np.where(~ry, x, y)
+        s >>= 1
+    return keys
+
+
+class GridIndex:
+    """Uniform grid over the points for nearest-neighbor candidate queries."""
+
+    def __init__(self, coords, occupancy=CELL_OCCUPANCY):
+        self.coords = np.asarray(coords, dtype=np.float64)
+        n = len(self.coords)
+        self.size = max(1, int(math.sqrt(n / occupancy)))
+        self.low = self.coords.min(axis=0)
+        span = np.maximum(self.coords.max(axis=0) - self.low, 1e-12)
+        self.cell_size = span / self.size
+        cells = self.cells_of(self.coords)
+        self.cx = cells[:, 0]
+        self.cy = cells[:, 1]
+        cell_id = self.cx * self.size + self.cy
+
+        # Members of every cell padded to a fixed width, -1 where a cell has fewer
+        order = np.argsort(cell_id, kind='stable')
+        counts = np.bincount(cell_id, minlength=self.size * self.size)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        width = int(min(counts.max(), MAX_CELL_MEMBERS))
+        slot = np.arange(n) - starts[cell_id[order]]
+        keep = slot < width
+        self.members = np.full((self.size * self.size, width), -1, dtype=np.int64)
+        self.members[cell_id[order][keep], slot[keep]] = order[keep]
+
+    def cells_of(self, points):
+        cells = ((points - self.low) / self.cell_size).astype(np.int64)
+        return np.clip(cells, 0, self.size - 1)
+
+    def candidate_lists(self, k=8, chunk=8192):
+        """Approximate k nearest neighbors of every point, looking at the 3 x 3 block of
+        cells around it. Points in sparse areas may get fewer than k."""
+        n = len(self.coords)
+        dx, dy = np.meshgrid([-1, 0, 1], [-1, 0, 1])
+        dx, dy = dx.ravel(), dy.ravel()
+        result = []
+        for begin in range(0, n, chunk):
+            idx = np.arange(begin, min(begin + chunk, n))
+            ncx = self.cx[idx, None] + dx[None, :]
+            ncy = self.cy[idx, None] + dy[None, :]
+            valid = (ncx >= 0) & (ncx < self.size) & (ncy >= 0) & (ncy < self.size)
+            cand = self.members[np.where(valid, ncx * self.size + ncy, 0)]
+            cand[~valid] = -1
+            cand = cand.reshape(len(idx), -1)
+
+            diff = self.coords[cand] - self.coords[idx][:, None, :]
+            dd = np.hypot(diff[..., 0], diff[..., 1])
+            dd[(cand < 0) | (cand == idx[:, None])] = np.inf
+            kk = min(k, dd.shape[1])
+            nearest = np.argpartition(dd, kk - 1, axis=1)[:, :kk] if kk < dd.shape[1] else np.tile(np.arange(dd.shape[1]), (len(idx), 1))
+            rows = np.arange(len(idx))[:, None]
+            nearest = nearest[rows, np.argsort(dd[rows, nearest], axis=1)]
+            found = np.isfinite(dd[rows, nearest])
+            picked = cand[rows, nearest]
+            result.extend(row[ok].tolist() for row, ok in zip(picked, found))
+        return result
+
+
+def space_filling_curve_tour(coords):
+    """Visit the cities in Hilbert-curve order: O(n log n), typically ~25% above optimal."""
+    return np.argsort(hilbert_keys(coords), kind='stable').tolist()
+
+
+def _sorted_edges(coords, neighbors):
+    pairs = np.array([(i, j) for i, row in neighbors for j in row], dtype=np.int64).reshape(-1, 2)
+    pairs = np.unique(np.sort(pairs, axis=1), axis=0)
+    diff = coords[pairs[:, 0]] - coords[pairs[:, 1]]
+    return pairs[np.argsort(np.hypot(diff[:, 0], diff[:, 1]), kind='stable')].tolist()
+
+
+def greedy_edge_tour(coords, neighbors, rounds=4):
+    """Greedy matching over the candidate edges: add the shortest edge that keeps every
+    degree <= 2 and closes no cycle. Further rounds repeat this over the loose fragment
+    ends only, and whatever fragments remain are chained in Hilbert order."""
+    coords = np.asarray(coords, dtype=np.float64)
+    n = len(coords)
+    parent = list(range(n))
+
+    def find(v):
+        while parent[v] != v:
+            parent[v] = parent[parent[v]]
+            v = parent[v]
+        return v
+
+    degree = [0] * n
+    links = [[] for _ in range(n)]
+
+    def link(edges):
+        added = 0
+        for a, b in edges:
+            if degree[a] < 2 and degree[b] < 2:
+                root_a, root_b = find(a), find(b)
+                if root_a != root_b:
+                    parent[root_a] = root_b
+                    degree[a] += 1
+                    degree[b] += 1
+                    links[a].append(b)
+                    links[b].append(a)
+                    added += 1
+        return added
+
+    link(_sorted_edges(coords, enumerate(neighbors)))
+    for _ in range(rounds):
+        ends = np.array([v for v in range(n) if degree[v] < 2])
+        if len(ends) <= 2:
+            break
+        local = GridIndex(coords[ends]).candidate_lists(8)
+        ends_list = ends.tolist()
+        candidates = ((ends_list[i], [ends_list[j] for j in row]) for i, row in enumerate(local))
+        if link(_sorted_edges(coords, candidates)) == 0:
+            break
+
+    # Walk each path fragment from one of its ends
+    fragments = []
+    seen = [False] * n
+    for start in range(n):
+        if seen[start] or degree[start] == 2:
+            continue
+        path = []
+        prev, current = -1, start
+        while current != -1:
+            seen[current] = True
+            path.append(current)
+            following = [v for v in links[current] if v != prev]
+            prev, current = current, (following[0] if following else -1)
+        fragments.append(path)
+
+    keys = hilbert_keys(coords)
+    fragments.sort(key=lambda path: keys[path[0]])
+    distance = EuclideanDistances(coords)
+    order = []
+    for path in fragments:
+        if order and distance(order[-1], path[-1]) < distance(order[-1], path[0]):
+            path = path[::-1]
+        order.extend(path)
+    return order
+
+
+def solve_euclidean(coords, construction='greedy_edge', improve=True, time_limit=5.0, candidates=8):
+    """Tour for a large coordinate instance without an n x n matrix, starting at city 0.
+
+    Returns (tour, cost, construction_cost).
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    n = len(coords)
+    distance = EuclideanDistances(coords)
+    if n <= 3:
+        tour = list(range(n)) + [0]
+        cost = distance.tour_length(tour)
+        return tour, cost, cost
+
+    deadline = time.time() + time_limit
+    neighbors = GridIndex(coords).candidate_lists(candidates)
+    if construction == 'space_filling_curve':
+        order = space_filling_curve_tour(coords)
+    elif construction == 'greedy_edge':
+        order = greedy_edge_tour(coords, neighbors)
+    else:
+        raise ValueError(f"Unknown construction: {construction}")
+
+    k = order.index(0)
+    tour = order[k:] + order[:k] + [0]
+    construction_cost = distance.tour_length(tour)
+    if improve:
+        tour, _ = improve_tour(distance, tour, neighbors=neighbors, time_limit=max(0.0, deadline - time.time()))
+    return tour, distance.tour_length(tour), construction_cost
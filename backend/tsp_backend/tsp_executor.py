@@ -0,0 +1,249 @@
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from tsp_backend.tsp_branch_bound import branch_and_bound_tour
+from tsp_backend.tsp_held_karp import held_karp_tour, SolverTimeout
+from tsp_backend.tsp_held_karp_mmap import out_of_core_held_karp_tour
+from tsp_backend.tsp_held_karp_parallel import parallel_held_karp_tour
+from tsp_backend.tsp_heuristics import multi_start_nearest_neighbor_tour, nearest_neighbor_tour
+from tsp_backend.tsp_local_search import improve_tour
+from tsp_backend.tsp_metaheuristics import genetic_tour, simulated_annealing_tour
+from tsp_backend.tsp_stats import SolverStats
+
+# Seconds each solver may run for; a request can override any of these
+DEFAULT_TIME_BUDGETS = {
+    'nearest_neighbor': 2.0,
+    'local_search': 2.0,
+    'branch_bound': 10.0,
+    'held_karp': 10.0,
+    'simulated_annealing': 2.0,
+    'genetic': 2.0,
+}
+# Run when a request doesn't list its algorithms; the metaheuristics are opt-in
+DEFAULT_ALGORITHMS = ['nearest_neighbor', 'local_search', 'branch_bound', 'held_karp']
+# How long past its budget we keep waiting for a worker to hand back a cooperative result
+GRACE_PERIOD = 0.5
+# None lets the pool use one process per core
+SOLVER_WORKERS = None
+# 'parallel' splits every Held-Karp layer over its own process pool with shared-memory tables;
+# 'out_of_core' keeps the tables in memory-mapped files for instances that don't fit in RAM
+HELD_KARP_MODES = ('serial', 'parallel', 'out_of_core')
+# 'multi_start' builds a nearest-neighbor tour from every city at once and keeps the shortest
+NEAREST_NEIGHBOR_MODES = ('single', 'multi_start')
+# Simulated annealing steps / genetic generations a request may ask for; with a seed and an
+# iteration count the metaheuristics give the same tour on every run (the time budget still
+# stops them first if it runs out). Larger requests are clamped to this.
+MAX_ITERATIONS = 1000000
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _construct(dist, options):
+    if options.get('nearest_neighbor_mode') == 'multi_start':
+        return multi_start_nearest_neighbor_tour(dist)
+    return nearest_neighbor_tour(dist)
+
+
+def _nearest_neighbor(dist, deadline, stats, options):
+    tour, cost = _construct(dist, options)
+    return tour, cost, 'heuristic'
+
+
+def _local_search(dist, deadline, stats, options):
+    tour, _ = _construct(dist, options)
+    tour, cost = improve_tour(dist, tour, time_limit=max(0.0, deadline - time.time()))
+    return tour, cost, 'heuristic'
+
+
+def _branch_bound(dist, deadline, stats, options):
+    # A session passes its previous optimum, fitted to the new city set, as 'initial_tour'
+    tour, cost = branch_and_bound_tour(dist, initial_tour=options.get('initial_tour'), stats=stats, deadline=deadline)
+    return tour, cost, 'exact' if stats.complete else 'best_so_far'
+
+
+def _held_karp(dist, deadline, stats, options):
+    if options.get('held_karp_mode') == 'parallel':
+        tour, cost = parallel_held_karp_tour(dist, deadline=deadline, stats=stats)
+    elif options.get('held_karp_mode') == 'out_of_core':
+        tour, cost = out_of_core_held_karp_tour(dist, deadline=deadline, stats=stats)
+    else:
+        tour, cost = held_karp_tour(dist, deadline=deadline, stats=stats)
+    return tour, cost, 'exact'
+
+
+def _simulated_annealing(dist, deadline, stats, options):
+    tour, cost = simulated_annealing_tour(
+        dist, seed=options.get('seed'), time_limit=max(0.0, deadline - time.time()), max_steps=options.get('iterations')
+    )
+    return tour, cost, 'heuristic'
+
+
+def _genetic(dist, deadline, stats, options):
+    tour, cost = genetic_tour(
+        dist, seed=options.get('seed'), time_limit=max(0.0, deadline - time.time()), max_generations=options.get('iterations')
+    )
+    return tour, cost, 'heuristic'
+
+
+# Each solver takes (dense matrix, absolute deadline, SolverStats, options dict) and returns (tour, cost, status)
+SOLVERS = {
+    'nearest_neighbor': _nearest_neighbor,
+    'local_search': _local_search,
+    'branch_bound': _branch_bound,
+    'held_karp': _held_karp,
+    'simulated_annealing': _simulated_annealing,
+    'genetic': _genetic,
+}
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=SOLVER_WORKERS)
+        return _pool
+
+
+def reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def resolve_budgets(time_budget=None):
+    """Per-algorithm budgets from a request: None, one number for all, or a {name: seconds} dict."""
+    budgets = dict(DEFAULT_TIME_BUDGETS)
+    if time_budget is None:
+        return budgets
+    if isinstance(time_budget, dict):
+        overrides = time_budget
+    else:
+        overrides = {name: time_budget for name in budgets}
+    for name, seconds in overrides.items():
+        if name not in SOLVERS:
+            raise ValueError(f"Unknown algorithm in time_budget: {name}")
+        if isinstance(seconds, bool) or not isinstance(seconds, (int, float)) or seconds <= 0:
+            raise ValueError(f"Time budget for {name} must be a positive number of seconds")
+        budgets[name] = float(seconds)
+    return budgets
+
+
+def resolve_algorithms(algorithms=None):
+    """The solvers a request asked for, or DEFAULT_ALGORITHMS when it didn't say."""
+    if algorithms is None:
+        return list(DEFAULT_ALGORITHMS)
+    if not isinstance(algorithms, list) or not algorithms:
+        raise ValueError("algorithms must be a non-empty list")
+    for name in algorithms:
+        if name not in SOLVERS:
+            raise ValueError(f"Unknown algorithm: {name}")
+    return list(dict.fromkeys(algorithms))
+
+
+def resolve_options(held_karp_mode=None, trace=False, seed=None, nearest_neighbor_mode=None, iterations=None):
+    """Solver options from a request; anything left out keeps its default."""
+    options = {}
+    if trace:
+        options['trace'] = True
+    if seed is not None:
+        if isinstance(seed, bool) or not isinstance(seed, int) or seed < 0:
+            raise ValueError("seed must be a non-negative integer")
+        options['seed'] = seed
+    if held_karp_mode is not None:
+        if held_karp_mode not in HELD_KARP_MODES:
+            raise ValueError(f"held_karp_mode must be one of {', '.join(HELD_KARP_MODES)}")
+        options['held_karp_mode'] = held_karp_mode
+    if nearest_neighbor_mode is not None:
+        if nearest_neighbor_mode not in NEAREST_NEIGHBOR_MODES:
+            raise ValueError(f"nearest_neighbor_mode must be one of {', '.join(NEAREST_NEIGHBOR_MODES)}")
+        options['nearest_neighbor_mode'] = nearest_neighbor_mode
+    if iterations is not None:
+        if isinstance(iterations, bool) or not isinstance(iterations, int) or iterations <= 0:
+            raise ValueError("iterations must be a positive integer")
+        options['iterations'] = min(iterations, MAX_ITERATIONS)
+    return options
+
+
+def run_solver(name, dist, deadline, options=None):
+    """Run one solver to completion or to its deadline (executed inside a worker process)."""
+    start_time = time.time()
+    options = options or {}
+    stats = SolverStats(trace=options.get('trace', False))
+    try:
+        tour, cost, status = SOLVERS[name](dist, deadline, stats, options)
+    except SolverTimeout as e:
+        result = _failed('timed_out', time.time() - start_time, str(e))
+        result['stats'] = stats.as_dict()
+        return result
+    return {
+        'tour': tour,
+        'distance': cost,
+        'time': time.time() - start_time,
+        'status': status,
+        'stats': stats.as_dict(),
+    }
+
+
+def _failed(status, elapsed, error):
+    return {'tour': None, 'distance': None, 'time': elapsed, 'status': status, 'stats': {}, 'error': error}
+
+
+def solve_concurrently(dist, algorithms=None, budgets=None, options=None):
+    """Run the requested solvers side by side in the process pool.
+
+    Every result carries a status: 'exact', 'best_so_far' (stopped early with an
+    incumbent), 'heuristic', 'timed_out' or 'error'.
+    """
+    algorithms = algorithms or DEFAULT_ALGORITHMS
+    budgets = budgets or resolve_budgets()
+    submitted = time.time()
+    pool = get_pool()
+    futures = {
+        name: pool.submit(run_solver, name, dist, submitted + budgets[name], options)
+        for name in algorithms
+    }
+
+    results = {}
+    for name, future in futures.items():
+        wait = submitted + budgets[name] + GRACE_PERIOD - time.time()
+        try:
+            results[name] = future.result(timeout=max(0.0, wait))
+        except FutureTimeout:
+            future.cancel()
+            results[name] = _failed('timed_out', time.time() - submitted, f"Timed out after {budgets[name]:g} s")
+        except BrokenProcessPool:
+            reset_pool()
+            results[name] = _failed('error', time.time() - submitted, "Solver process crashed")
+        except Exception as e:
+            results[name] = _failed('error', time.time() - submitted, str(e))
+    return results
+
+
+def run_solvers(dist, algorithms, budgets, options=None):
+    """Run several solvers one after another in the current process, each with its own budget."""
+    return {name: run_solver(name, dist, time.time() + budgets[name], options) for name in algorithms}
+
+
+def solve_batch(jobs, budgets=None, options=None):
+    """Spread many instances over the pool, one instance per task.
+
+    `jobs` is an iterable of (job_id, dist, algorithms); yields (job_id, results) in the
+    order instances finish.
+    """
+    budgets = budgets or resolve_budgets()
+    pool = get_pool()
+    futures = {pool.submit(run_solvers, dist, algorithms, budgets, options): (job_id, algorithms) for job_id, dist, algorithms in jobs}
+    for future in as_completed(futures):
+        job_id, algorithms = futures[future]
+        try:
+            results = future.result()
+        except BrokenProcessPool:
+            reset_pool()
+            results = {name: _failed('error', 0.0, "Solver process crashed") for name in algorithms}
+        except Exception as e:
+            results = {name: _failed('error', 0.0, str(e)) for name in algorithms}
+        yield job_id, results
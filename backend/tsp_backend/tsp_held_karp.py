@@ -0,0 +1,99 @@
+import time
+import numpy as np
+
+# Dense tables take 2^(n-1) * (n-1) cells, so keep the vectorized engine to sizes that fit in RAM
+MAX_HELD_KARP_CITIES = 22
+
+
+class SolverTimeout(Exception):
+    """Raised when an exact solver runs past its deadline without a usable answer."""
+
+
+def subset_layers(m):
+    """Group every bitmask over m cities by the number of bits set (one array per subset size)."""
+    masks = np.arange(1 << m, dtype=np.int64)
+    popcount = np.zeros(1 << m, dtype=np.int8)
+    for bit in range(m):
+        popcount += ((masks >> bit) & 1).astype(np.int8)
+    order = np.argsort(popcount, kind='stable')
+    bounds = np.searchsorted(popcount[order], np.arange(m + 2))
+    return [order[bounds[k]:bounds[k + 1]] for k in range(m + 1)]
+
+
+def relax_layer(dp, parent, masks, dist):
+    """Fill dp/parent rows for every mask of one subset size from the previous layer.
+
+    Bit j of a mask stands for city j + 1 (city 0 is home). dp[mask, j] is the cheapest
+    path that leaves home, visits exactly the cities in mask and ends at city j + 1.
+    """
+    m = dp.shape[1]
+    inner = dist[1:, 1:]
+    for j in range(m):
+        bit = 1 << j
+        ending = masks[(masks & bit) != 0]
+        if len(ending) == 0:
+            continue
+        # Every candidate predecessor i in one gather; cities outside prev are +inf in dp
+        candidates = dp[ending ^ bit] + inner[:, j]
+        best = np.argmin(candidates, axis=1)
+        dp[ending, j] = candidates[np.arange(len(ending)), best]
+        parent[ending, j] = best
+
+
+def trace_tour(dp, parent, dist):
+    """Close the cheapest full path back home and walk the parent pointers to a tour."""
+    m = dp.shape[1]
+    full = (1 << m) - 1
+    closing = dp[full] + dist[1:, 0]
+    last = int(np.argmin(closing))
+    cost = float(closing[last])
+
+    # Walk the parent pointers back from the full set
+    order = []
+    bits = full
+    while bits:
+        order.append(last + 1)
+        prev = int(parent[bits, last])
+        bits ^= 1 << last
+        last = prev
+    return [0] + order[::-1] + [0], cost
+
+
+def held_karp_tables(dist, deadline=None, stats=None):
+    """Fill the full dp/parent tables for a dense distance matrix (see relax_layer).
+
+    Raises SolverTimeout if `deadline` (a time.time() value) passes between layers.
+    A SolverStats passed as `stats` counts the DP cells filled.
+    """
+    n = len(dist)
+    m = n - 1
+    if n > MAX_HELD_KARP_CITIES:
+        raise ValueError(f"Held-Karp is limited to {MAX_HELD_KARP_CITIES} cities, got {n}")
+
+    dp = np.full((1 << m, m), np.inf)
+    parent = np.zeros((1 << m, m), dtype=np.int8)
+    singles = 1 << np.arange(m)
+    dp[singles, np.arange(m)] = dist[0, 1:]
+
+    for size, masks in enumerate(subset_layers(m)[2:], start=2):
+        if deadline is not None and time.time() > deadline:
+            raise SolverTimeout("Held-Karp ran out of time")
+        relax_layer(dp, parent, masks, dist)
+        if stats is not None:
+            stats.dp_cells += size * len(masks)
+            stats.record('layer', size=size, masks=len(masks))
+    return dp, parent
+
+
+def held_karp_tour(dist, deadline=None, stats=None):
+    """Exact TSP tour over a dense distance matrix, starting and ending at index 0.
+
+    Returns (tour, cost) where tour is a list of indices like [0, 3, 1, 2, 0].
+    Raises SolverTimeout if `deadline` (a time.time() value) passes between layers.
+    A SolverStats passed as `stats` counts the DP cells filled.
+    """
+    dist = np.asarray(dist, dtype=np.float64)
+    if len(dist) <= 1:
+        return [0, 0], 0.0
+    dp, parent = held_karp_tables(dist, deadline, stats)
+    return trace_tour(dp, parent, dist)
@@ -0,0 +1,127 @@
+import math
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from tsp_backend.tsp_distance import tour_length
+from tsp_backend.tsp_held_karp import SolverTimeout
+
+# Costs on disk are float32 and parents uint8, so n = 25 needs ~0.4 GB of parent files
+MAX_OUT_OF_CORE_CITIES = 25
+# None puts the scratch files in the system temp directory
+HELD_KARP_SCRATCH_DIR = None
+# Masks relaxed per step, which bounds the in-memory working set
+OUT_OF_CORE_CHUNK = 1 << 16
+
+
+def popcounts(m):
+    """Number of bits set in every mask over m cities, as uint8."""
+    counts = np.zeros(1 << m, dtype=np.uint8)
+    step = 1 << 20
+    for begin in range(0, 1 << m, step):
+        masks = np.arange(begin, min(begin + step, 1 << m), dtype=np.int64)
+        for bit in range(m):
+            counts[begin:begin + len(masks)] += ((masks >> bit) & 1).astype(np.uint8)
+    return counts
+
+
+def colex_rank(mask):
+    """Position of a mask among the masks with the same popcount, in increasing order."""
+    rank = 0
+    i = 0
+    while mask:
+        low = mask & -mask
+        rank += math.comb(low.bit_length() - 1, i + 1)
+        mask ^= low
+        i += 1
+    return rank
+
+
+def _table(workdir, name, dtype, shape):
+    return np.lib.format.open_memmap(os.path.join(workdir, name), mode='w+', dtype=dtype, shape=shape)
+
+
+def _relax_chunked(prev_masks, prev_cost, masks, cost, parent, inner, deadline):
+    """relax_layer over one disk-backed layer, OUT_OF_CORE_CHUNK masks at a time.
+
+    Row r of a layer's tables belongs to masks[r]; the previous layer's row of a mask is
+    found by binary search in its (sorted) mask array.
+    """
+    m = inner.shape[0]
+    for begin in range(0, len(masks), OUT_OF_CORE_CHUNK):
+        if deadline is not None and time.time() > deadline:
+            raise SolverTimeout("Held-Karp ran out of time")
+        block = masks[begin:begin + OUT_OF_CORE_CHUNK]
+        block_cost = np.full((len(block), m), np.inf, dtype=np.float32)
+        block_parent = np.zeros((len(block), m), dtype=np.uint8)
+        for j in range(m):
+            bit = 1 << j
+            rows = np.flatnonzero(block & bit)
+            if len(rows) == 0:
+                continue
+            candidates = prev_cost[np.searchsorted(prev_masks, block[rows] ^ bit)] + inner[:, j]
+            best = np.argmin(candidates, axis=1)
+            block_cost[rows, j] = candidates[np.arange(len(rows)), best]
+            block_parent[rows, j] = best
+        cost[begin:begin + len(block)] = block_cost
+        parent[begin:begin + len(block)] = block_parent
+
+
+def out_of_core_held_karp_tour(dist, deadline=None, workdir=None, stats=None):
+    """Held-Karp with its tables in memory-mapped files, for instances too big for RAM.
+
+    Layers are filled in order of subset size. Costs are float32 and only the previous
+    layer is kept; the uint8 parent layers stay on disk until the tour has been traced.
+    All files live in a scratch directory that is removed afterwards.
+    Returns (tour, cost) like held_karp_tour, with the cost summed in float64.
+    """
+    dist = np.asarray(dist, dtype=np.float64)
+    n = len(dist)
+    if n <= 1:
+        return [0, 0], 0.0
+    if n > MAX_OUT_OF_CORE_CITIES:
+        raise ValueError(f"Out-of-core Held-Karp is limited to {MAX_OUT_OF_CORE_CITIES} cities, got {n}")
+    m = n - 1
+    inner = dist[1:, 1:].astype(np.float32)
+
+    workdir = tempfile.mkdtemp(prefix='held_karp_', dir=workdir or HELD_KARP_SCRATCH_DIR)
+    try:
+        counts = popcounts(m)
+        prev_masks = 1 << np.arange(m, dtype=np.int64)
+        prev_cost = np.full((m, m), np.inf, dtype=np.float32)
+        prev_cost[np.arange(m), np.arange(m)] = dist[0, 1:]
+        parents = [None, None]
+
+        for k in range(2, m + 1):
+            masks = np.flatnonzero(counts == k)
+            cost = _table(workdir, f'cost_{k}.npy', np.float32, (len(masks), m))
+            parent = _table(workdir, f'parent_{k}.npy', np.uint8, (len(masks), m))
+            _relax_chunked(prev_masks, prev_cost, masks, cost, parent, inner, deadline)
+            parent.flush()
+            parents.append(parent)
+            if stats is not None:
+                stats.dp_cells += k * len(masks)
+                stats.record('layer', size=k, masks=len(masks))
+            # Nothing reads a cost layer again once the next one is built
+            if isinstance(prev_cost, np.memmap):
+                del prev_cost
+                os.remove(os.path.join(workdir, f'cost_{k - 1}.npy'))
+            prev_masks, prev_cost = masks, cost
+
+        closing = prev_cost[-1].astype(np.float64) + dist[1:, 0]
+        last = int(np.argmin(closing))
+
+        # Walk the parent pointers back from the full set, one layer per step
+        order = []
+        bits = (1 << m) - 1
+        for k in range(m, 1, -1):
+            order.append(last + 1)
+            prev = int(parents[k][colex_rank(bits), last])
+            bits ^= 1 << last
+            last = prev
+        order.append(last + 1)
+        tour = [0] + order[::-1] + [0]
+        return tour, tour_length(dist, tour)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,114 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from tsp_backend.tsp_held_karp import MAX_HELD_KARP_CITIES, SolverTimeout, held_karp_tour, relax_layer, subset_layers, trace_tour
+
+# None uses one process per core
+HELD_KARP_WORKERS = None
+# Below this size the pool costs more than it saves, so the serial engine is used
+PARALLEL_MIN_CITIES = 16
+# Layers with fewer masks than this are relaxed in the calling process
+MIN_MASKS_PER_TASK = 4096
+
+# Views onto the shared tables, set up once per worker process
+_shared = {}
+
+
+def _attach(name, shape, dtype):
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _init_worker(names, m, dist):
+    # Pool workers report to the parent's resource tracker, which already owns these
+    # blocks, so attaching here does not hand their cleanup over to the worker
+    blocks = []
+    for key, name, shape, dtype in (
+        ('dp', names[0], (1 << m, m), np.float64),
+        ('parent', names[1], (1 << m, m), np.int8),
+        ('masks', names[2], (1 << m,), np.int64),
+    ):
+        block, view = _attach(name, shape, dtype)
+        blocks.append(block)
+        _shared[key] = view
+    _shared['blocks'] = blocks
+    _shared['dist'] = dist
+
+
+def _relax_range(start, stop):
+    """Relax the masks at positions [start, stop) of the popcount-sorted mask array."""
+    relax_layer(_shared['dp'], _shared['parent'], _shared['masks'][start:stop], _shared['dist'])
+
+
+def _chunks(start, stop, workers):
+    size = max(MIN_MASKS_PER_TASK, -(-(stop - start) // workers))
+    return [(begin, min(begin + size, stop)) for begin in range(start, stop, size)]
+
+
+def parallel_held_karp_tour(dist, deadline=None, workers=None, stats=None):
+    """Held-Karp with every subset-size layer split across a process pool.
+
+    The DP and parent tables live in shared memory: workers read the previous layer and
+    write their own rows of the current one in place, so nothing is copied between
+    processes. Masks in one layer never depend on each other, so any split is safe.
+    Same result and exceptions as held_karp_tour.
+    """
+    dist = np.asarray(dist, dtype=np.float64)
+    n = len(dist)
+    if n > MAX_HELD_KARP_CITIES:
+        raise ValueError(f"Held-Karp is limited to {MAX_HELD_KARP_CITIES} cities, got {n}")
+    workers = workers or HELD_KARP_WORKERS or os.cpu_count() or 1
+    if n < PARALLEL_MIN_CITIES or workers == 1:
+        return held_karp_tour(dist, deadline=deadline, stats=stats)
+    m = n - 1
+
+    layers = subset_layers(m)
+    cells = (1 << m) * m
+    blocks = [
+        shared_memory.SharedMemory(create=True, size=cells * 8),
+        shared_memory.SharedMemory(create=True, size=cells),
+        shared_memory.SharedMemory(create=True, size=(1 << m) * 8),
+    ]
+    dp = np.ndarray((1 << m, m), dtype=np.float64, buffer=blocks[0].buf)
+    parent = np.ndarray((1 << m, m), dtype=np.int8, buffer=blocks[1].buf)
+    masks = np.ndarray((1 << m,), dtype=np.int64, buffer=blocks[2].buf)
+    pool = None
+    try:
+        dp.fill(np.inf)
+        parent.fill(0)
+        masks[:] = np.concatenate(layers)
+        singles = 1 << np.arange(m)
+        dp[singles, np.arange(m)] = dist[0, 1:]
+
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=([block.name for block in blocks], m, dist),
+        )
+        start = len(layers[0]) + len(layers[1])
+        for size, layer in enumerate(layers[2:], start=2):
+            if deadline is not None and time.time() > deadline:
+                raise SolverTimeout("Held-Karp ran out of time")
+            stop = start + len(layer)
+            if len(layer) < MIN_MASKS_PER_TASK:
+                relax_layer(dp, parent, layer, dist)
+            else:
+                # The layer must be complete before the next one reads it
+                for future in [pool.submit(_relax_range, a, b) for a, b in _chunks(start, stop, workers)]:
+                    future.result()
+            start = stop
+            if stats is not None:
+                stats.dp_cells += size * len(layer)
+                stats.record('layer', size=size, masks=len(layer))
+
+        return trace_tour(dp, parent, dist)
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        # Views must go before the blocks can be closed
+        del dp, parent, masks
+        for block in blocks:
+            block.close()
+            block.unlink()
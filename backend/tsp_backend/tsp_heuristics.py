@@ -0,0 +1,74 @@
+import numpy as np
+
+
+def nearest_neighbor_tour(dist, start=0):
+    """Greedy tour over a dense distance matrix: always move to the closest unvisited city.
+
+    Returns (tour, cost) with the tour starting and ending at `start`.
+    """
+    dist = np.asarray(dist, dtype=np.float64)
+    n = len(dist)
+    tour = [start]
+    visited = np.zeros(n, dtype=bool)
+    visited[start] = True
+    current = start
+    cost = 0.0
+
+    for _ in range(n - 1):
+        row = np.where(visited, np.inf, dist[current])
+        next_city = int(np.argmin(row))
+        tour.append(next_city)
+        visited[next_city] = True
+        cost += row[next_city]
+        current = next_city
+
+    # Return to the start city
+    tour.append(start)
+    cost += dist[current, start]
+    return tour, float(cost)
+
+
+# Distance cells (starts x cities x steps) a multi-start run may scan; larger instances
+# try fewer, evenly spaced starts so the run stays within a few single-start runs' time
+MULTI_START_CELLS = 20_000_000
+
+
+def multi_start_nearest_neighbor_tour(dist, start=0, max_starts=None):
+    """Nearest-neighbor tours from every start city (at most `max_starts` of them) at once,
+    one masked argmin per step for all of them; the shortest is rotated to begin and end at `start`.
+
+    The run from `start` is one of the candidates, so the result is never longer than
+    nearest_neighbor_tour(dist, start). Returns (tour, cost).
+    """
+    dist = np.asarray(dist, dtype=np.float64)
+    n = len(dist)
+    if n < 3:
+        return nearest_neighbor_tour(dist, start)
+    if max_starts is None:
+        max_starts = max(2, MULTI_START_CELLS // (n * n))
+    if n <= max_starts:
+        starts = np.arange(n)
+    else:
+        starts = np.unique(np.append(np.linspace(0, n - 1, max_starts - 1).astype(np.intp), start))
+    rows = np.arange(len(starts))
+
+    tours = np.empty((len(starts), n), dtype=np.intp)
+    tours[:, 0] = starts
+    visited = np.zeros((len(starts), n), dtype=bool)
+    visited[rows, starts] = True
+    lengths = np.zeros(len(starts))
+    current = starts
+
+    for step in range(1, n):
+        candidates = np.where(visited, np.inf, dist[current])
+        next_city = np.argmin(candidates, axis=1)
+        lengths += candidates[rows, next_city]
+        visited[rows, next_city] = True
+        tours[:, step] = next_city
+        current = next_city
+    lengths += dist[current, starts]
+
+    best = int(np.argmin(lengths))
+    tour = tours[best].tolist()
+    offset = tour.index(start)
+    return tour[offset:] + tour[:offset] + [start], float(lengths[best])
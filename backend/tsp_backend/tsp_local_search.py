@@ -0,0 +1,241 @@
+import time
+from collections import deque
+import numpy as np
+
+# Moves must gain at least this much so float noise can't make the search cycle
+EPSILON = 1e-9
+# Every applied move shortens the tour, so the search ends on its own; this caps the moves
+# per city anyway, so a run without a deadline always terminates
+MAX_MOVES_PER_CITY = 100
+
+
+def candidate_lists(dist, k=8):
+    """The k nearest other cities of every city, closest first."""
+    dist = np.asarray(dist, dtype=np.float64)
+    n = len(dist)
+    k = min(k, n - 1)
+    if k <= 0:
+        return [[] for _ in range(n)]
+    sym = np.minimum(dist, dist.T)
+    np.fill_diagonal(sym, np.inf)
+    nearest = np.argpartition(sym, k - 1, axis=1)[:, :k]
+    rows = np.arange(n)[:, None]
+    nearest = nearest[rows, np.argsort(sym[rows, nearest], axis=1)]
+    return nearest.tolist()
+
+
+class LocalSearch:
+    """2-opt and Or-opt improvement of a single tour.
+
+    Cities whose surroundings have not changed since their last failed scan keep their
+    don't-look bit set and are skipped; applying a move clears the bits of its endpoints.
+    Moves are only tried against each city's candidate list of near neighbours.
+
+    With `symmetric=False` a reversed segment is scored with its directed costs, read off
+    prefix sums of the forward and backward edge costs along the tour.
+    """
+
+    def __init__(self, distance, order, neighbors, moves=('2opt', 'oropt'), symmetric=True):
+        self.d = distance
+        self.order = list(order)
+        self.n = len(self.order)
+        self.neighbors = neighbors
+        self.moves = moves
+        self.symmetric = symmetric
+        self.pos = {city: i for i, city in enumerate(self.order)}
+        self._index_paths()
+
+    def _index_paths(self):
+        # forward[k] / backward[k]: cost of walking positions 0..k along / against the tour
+        if self.symmetric:
+            return
+        d, order = self.d, self.order
+        self.forward = [0.0] * self.n
+        self.backward = [0.0] * self.n
+        for k in range(1, self.n):
+            self.forward[k] = self.forward[k - 1] + d(order[k - 1], order[k])
+            self.backward[k] = self.backward[k - 1] + d(order[k], order[k - 1])
+
+    def reversal_cost(self, i, j):
+        """Change in the cost of the path through positions i..j (forward, cyclic) when it is
+        walked backwards; always 0 on symmetric distances."""
+        if self.symmetric or i == j:
+            return 0.0
+        if i < j:
+            return (self.backward[j] - self.backward[i]) - (self.forward[j] - self.forward[i])
+        # The path wraps: positions i..n-1, then the closing edge, then 0..j
+        last, first = self.order[-1], self.order[0]
+        forward = self.forward[-1] - self.forward[i] + self.d(last, first) + self.forward[j]
+        backward = self.backward[-1] - self.backward[i] + self.d(first, last) + self.backward[j]
+        return backward - forward
+
+    def succ(self, city):
+        return self.order[(self.pos[city] + 1) % self.n]
+
+    def pred(self, city):
+        return self.order[(self.pos[city] - 1) % self.n]
+
+    def reverse(self, i, j):
+        """Reverse the cyclic segment running forward from position i to position j."""
+        n = self.n
+        i %= n
+        j %= n
+        length = (j - i) % n + 1
+        if 2 * length > n and self.symmetric:
+            # Reversing the complement gives the same cycle and touches fewer cities
+            # (on asymmetric distances it gives the cycle walked the other way round)
+            i, j = (j + 1) % n, (i - 1) % n
+            length = n - length
+        order, pos = self.order, self.pos
+        for k in range(length // 2):
+            a, b = (i + k) % n, (j - k) % n
+            order[a], order[b] = order[b], order[a]
+            pos[order[a]] = a
+            pos[order[b]] = b
+        self._index_paths()
+
+    def two_opt(self, a):
+        d = self.d
+        # Replace (a, succ a) and (c, succ c) with (a, c) and (succ a, succ c)
+        b = self.succ(a)
+        d_ab = d(a, b)
+        for c in self.neighbors[a]:
+            d_ac = d(a, c)
+            if d_ac >= d_ab - EPSILON:
+                break
+            e = self.succ(c)
+            if c == b or e == a:
+                continue
+            if d_ac + d(b, e) - d_ab - d(c, e) + self.reversal_cost(self.pos[b], self.pos[c]) < -EPSILON:
+                self.reverse(self.pos[b], self.pos[c])
+                return (a, b, c, e)
+        # Replace (pred a, a) and (pred c, c) with (c, a) and (pred c, pred a)
+        p = self.pred(a)
+        d_pa = d(p, a)
+        for c in self.neighbors[a]:
+            d_ca = d(c, a)
+            if d_ca >= d_pa - EPSILON:
+                break
+            f = self.pred(c)
+            if c == p or f == a:
+                continue
+            if d_ca + d(f, p) - d_pa - d(f, c) + self.reversal_cost(self.pos[c], self.pos[p]) < -EPSILON:
+                self.reverse(self.pos[c], self.pos[p])
+                return (a, p, c, f)
+        return None
+
+    def or_opt(self, a):
+        d = self.d
+        start = self.pos[a]
+        for length in (1, 2, 3):
+            if length >= self.n - 2:
+                break
+            segment = [self.order[(start + k) % self.n] for k in range(length)]
+            first, last = segment[0], segment[-1]
+            p = self.pred(first)
+            nxt = self.succ(last)
+            gain = d(p, first) + d(last, nxt) - d(p, nxt)
+            if gain <= EPSILON:
+                continue
+            inside = set(segment)
+            # Inserting the segment reversed also walks its inner edges backwards
+            turned = sum(d(y, x) - d(x, y) for x, y in zip(segment, segment[1:]))
+            for end in (first, last):
+                for c in self.neighbors[end]:
+                    if d(end, c) >= gain:
+                        break
+                    if c in inside:
+                        continue
+                    for u, v in ((c, self.succ(c)), (self.pred(c), c)):
+                        if u in inside or v in inside:
+                            continue
+                        forward = d(u, first) + d(last, v) - d(u, v)
+                        backward = d(u, last) + d(first, v) - d(u, v) + turned
+                        if min(forward, backward) < gain - EPSILON:
+                            self.move_segment(segment, u, backward < forward)
+                            return (p, nxt, u, v, first, last)
+        return None
+
+    def move_segment(self, segment, after, reversed_segment):
+        moved = segment[::-1] if reversed_segment else segment
+        i = self.pos[segment[0]]
+        length = len(segment)
+        if i + length > self.n:
+            # The segment wraps around the end of the array: rebuild everything
+            inside = set(segment)
+            rest = [city for city in self.order if city not in inside]
+            k = rest.index(after) + 1
+            self.order = rest[:k] + moved + rest[k:]
+            self.pos = {city: idx for idx, city in enumerate(self.order)}
+            self._index_paths()
+            return
+        rest = self.order[:i] + self.order[i + length:]
+        k = self.pos[after]
+        if k > i:
+            k -= length
+        k += 1
+        self.order = rest[:k] + moved + rest[k:]
+        # Only the cities between the old and new slot of the segment changed position
+        for idx in range(min(i, k), max(i, k) + length):
+            self.pos[self.order[idx]] = idx
+        self._index_paths()
+
+    def run(self, deadline=None):
+        if self.n < 4:
+            return self.order
+        queue = deque(self.order)
+        queued = set(self.order)
+        steps = 0
+        moves_left = MAX_MOVES_PER_CITY * self.n
+        while queue and moves_left > 0:
+            steps += 1
+            if deadline is not None and steps % 64 == 0 and time.time() > deadline:
+                break
+            a = queue.popleft()
+            queued.discard(a)
+            touched = None
+            if '2opt' in self.moves:
+                touched = self.two_opt(a)
+            if touched is None and 'oropt' in self.moves:
+                touched = self.or_opt(a)
+            if touched:
+                moves_left -= 1
+                for city in touched:
+                    if city not in queued:
+                        queued.add(city)
+                        queue.append(city)
+        return self.order
+
+
+def improve_tour(dist, tour, neighbors=None, candidates=8, moves=('2opt', 'oropt'), time_limit=None):
+    """Post-process any closed tour ([home, ..., home]) with 2-opt and Or-opt moves.
+
+    `dist` is a dense matrix, or a callable d(a, b) together with explicit `neighbors`
+    candidate lists (taken to be symmetric). Returns (tour, cost) with the tour rotated
+    back to start at home, never longer than the tour it was given.
+    """
+    symmetric = True
+    if callable(dist):
+        distance = dist
+    else:
+        matrix = np.asarray(dist, dtype=np.float64)
+        symmetric = np.array_equal(matrix, matrix.T)
+        rows = matrix.tolist()
+        distance = lambda a, b: rows[a][b]
+        if neighbors is None:
+            neighbors = candidate_lists(dist, candidates)
+
+    home = tour[0]
+    start = list(tour[:-1]) if len(tour) > 1 and tour[-1] == home else list(tour)
+    deadline = time.time() + time_limit if time_limit is not None else None
+    order = LocalSearch(distance, start, neighbors, moves, symmetric).run(deadline)
+
+    k = order.index(home)
+    closed = order[k:] + order[:k] + [home]
+    cost = sum(distance(a, b) for a, b in zip(closed, closed[1:]))
+    # Never hand back a longer tour than the one we were given
+    given = start + [home]
+    given_cost = sum(distance(a, b) for a, b in zip(given, given[1:]))
+    if given_cost <= cost:
+        return given, float(given_cost)
+    return closed, float(cost)
@@ -0,0 +1,98 @@
+import time
+import numpy as np
+from tsp_backend.tsp_held_karp import held_karp_tour
+from tsp_backend.tsp_heuristics import nearest_neighbor_tour
+
+# Subgradient steps for the Held-Karp bound and how long they may take
+LOWER_BOUND_ITERATIONS = 200
+LOWER_BOUND_TIME_LIMIT = 1.0
+
+
+def minimum_one_tree(weights):
+    """Minimum 1-tree: an MST over cities 1..n-1 plus the two cheapest edges at city 0.
+
+    Returns (cost, degree of every city). Prim's algorithm on the dense matrix, O(n^2).
+    """
+    n = len(weights)
+    degree = np.zeros(n, dtype=np.int64)
+    in_tree = np.zeros(n, dtype=bool)
+    in_tree[0] = True
+    in_tree[1] = True
+    best = weights[1].copy()
+    best_from = np.ones(n, dtype=np.int64)
+    cost = 0.0
+    for _ in range(n - 2):
+        candidates = np.where(in_tree, np.inf, best)
+        city = int(np.argmin(candidates))
+        cost += candidates[city]
+        degree[city] += 1
+        degree[best_from[city]] += 1
+        in_tree[city] = True
+        closer = weights[city] < best
+        best[closer] = weights[city][closer]
+        best_from[closer] = city
+
+    two = np.argpartition(weights[0, 1:], 1)[:2] + 1
+    cost += weights[0, two].sum()
+    degree[0] = 2
+    degree[two] += 1
+    return float(cost), degree
+
+
+def held_karp_lower_bound(dist, upper_bound=None, iterations=LOWER_BOUND_ITERATIONS, time_limit=LOWER_BOUND_TIME_LIMIT):
+    """Held-Karp (Lagrangian 1-tree) lower bound on the optimal tour length.
+
+    Every city gets a penalty pi added to its edges; any tour pays exactly 2 * sum(pi)
+    extra, so the 1-tree cost minus that is still a lower bound. Subgradient steps push
+    the penalties toward 1-trees where every city has degree 2. `upper_bound` (any tour
+    length) scales the steps; the nearest-neighbor tour is used when it is missing.
+    Asymmetric input is bounded through min(d_ij, d_ji).
+
+    Returns (bound, iterations run).
+    """
+    dist = np.asarray(dist, dtype=np.float64)
+    n = len(dist)
+    if n <= 3:
+        # Tiny instances are cheaper to solve exactly
+        _, cost = held_karp_tour(dist)
+        return cost, 0
+    sym = np.minimum(dist, dist.T)
+    np.fill_diagonal(sym, np.inf)
+    if upper_bound is None or not np.isfinite(upper_bound):
+        _, upper_bound = nearest_neighbor_tour(dist)
+
+    deadline = time.time() + time_limit if time_limit is not None else None
+    pi = np.zeros(n)
+    best = -np.inf
+    step_scale = 2.0
+    stalled = 0
+    k = 0
+    for k in range(1, iterations + 1):
+        cost, degree = minimum_one_tree(sym + pi[:, None] + pi[None, :])
+        bound = cost - 2.0 * pi.sum()
+        if bound > best + 1e-9:
+            best = bound
+            stalled = 0
+        else:
+            stalled += 1
+            if stalled >= 10:
+                # Halve the step size when the bound stops improving
+                step_scale /= 2.0
+                stalled = 0
+        subgradient = degree - 2
+        norm = float(subgradient @ subgradient)
+        if norm == 0 or step_scale < 1e-6:
+            # Degree 2 everywhere: the 1-tree is a tour and the bound is optimal
+            break
+        if deadline is not None and time.time() > deadline:
+            break
+        step = step_scale * max(upper_bound - bound, 1e-9) / norm
+        pi += step * subgradient
+    return float(min(best, upper_bound)), k
+
+
+def optimality_gap(distance, bound):
+    """How far a tour is at most from optimal, as a fraction of the lower bound."""
+    if distance is None or bound is None or bound <= 0:
+        return None
+    return max(0.0, (distance - bound) / bound)
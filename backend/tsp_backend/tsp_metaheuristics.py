@@ -0,0 +1,177 @@
+import time
+import numpy as np
+from tsp_backend.tsp_distance import tour_length
+from tsp_backend.tsp_heuristics import nearest_neighbor_tour
+
+# Chains (annealing) or individuals (genetic) evolved side by side
+POPULATION_SIZE = 32
+# Annealing temperature as a fraction of the mean edge length, at the start and at the end
+START_TEMPERATURE = 0.1
+END_TEMPERATURE = 0.001
+# Genetic algorithm: tournament size, share of children mutated and survivors copied unchanged
+TOURNAMENT_SIZE = 3
+MUTATION_RATE = 0.3
+ELITE_COUNT = 2
+
+# Populations hold the cities 1..n-1 only; home (index 0) is implied at both ends
+
+
+def population_lengths(dist, population):
+    """Length of every closed tour in a population with one gather over the matrix."""
+    homes = np.zeros((len(population), 1), dtype=population.dtype)
+    tours = np.hstack([homes, population, homes])
+    return dist[tours[:, :-1], tours[:, 1:]].sum(axis=1)
+
+
+def reverse_segments(population, starts, ends):
+    """Reverse population[r, starts[r]:ends[r] + 1] in every row at once."""
+    cols = np.arange(population.shape[1])[None, :]
+    starts = starts[:, None]
+    ends = ends[:, None]
+    inside = (cols >= starts) & (cols <= ends)
+    source = np.where(inside, starts + ends - cols, cols)
+    return np.take_along_axis(population, source, axis=1)
+
+
+def random_segments(rng, rows, m):
+    """One random segment [start, end] per row with start < end, over m positions."""
+    a = rng.integers(0, m, rows)
+    b = rng.integers(0, m - 1, rows)
+    b = np.where(b >= a, b + 1, b)
+    return np.minimum(a, b), np.maximum(a, b)
+
+
+def order_crossover(rng, first, second, length):
+    """OX crossover of row pairs: each child keeps a `length` slice of its first parent in
+    place and takes the remaining cities in the second parent's order. The fixed length
+    means every child takes the same number of cities from each parent, so the whole
+    population is crossed over with array operations."""
+    count, m = first.shape
+    rows = np.arange(count)[:, None]
+    starts = rng.integers(0, m - length + 1, count)[:, None]
+    slots = starts + np.arange(length)[None, :]
+    segment = first[rows, slots]
+
+    # Cities are 1..m, so a city's own value indexes the membership table
+    taken = np.zeros((count, m + 1), dtype=bool)
+    taken[rows, segment] = True
+    rest = second[~taken[rows, second]].reshape(count, m - length)
+
+    children = np.empty_like(first)
+    children[rows, slots] = segment
+    free = np.ones((count, m), dtype=bool)
+    free[rows, slots] = False
+    children[free] = rest.ravel()
+    return children
+
+
+def _initial_population(dist, rng, size):
+    m = len(dist) - 1
+    population = np.argsort(rng.random((size, m)), axis=1) + 1
+    # One member starts from the nearest-neighbor tour so the search never ends up worse
+    tour, _ = nearest_neighbor_tour(dist)
+    population[0] = tour[1:-1]
+    return population
+
+
+def _small_instance(dist):
+    tour, _ = nearest_neighbor_tour(dist)
+    return tour, tour_length(dist, tour)
+
+
+def simulated_annealing_tour(dist, seed=None, time_limit=2.0, population_size=POPULATION_SIZE, max_steps=None):
+    """Parallel simulated annealing with segment-reversal (2-opt) moves.
+
+    Every chain proposes one reversal per step and all of them are scored with a single
+    gather; the temperature falls geometrically over the budget (`time_limit` seconds
+    and/or `max_steps`). Returns (tour, cost) with tour = [0, ..., 0]. With a seed and
+    only a step budget the result is reproducible.
+    """
+    if time_limit is None and max_steps is None:
+        raise ValueError("Simulated annealing needs a time limit or a step budget")
+    dist = np.asarray(dist, dtype=np.float64)
+    n = len(dist)
+    if n <= 3:
+        return _small_instance(dist)
+    m = n - 1
+    rng = np.random.default_rng(seed)
+    population = _initial_population(dist, rng, population_size)
+    lengths = population_lengths(dist, population)
+    best = int(np.argmin(lengths))
+    best_order, best_cost = population[best].copy(), float(lengths[best])
+
+    finite = dist[np.isfinite(dist) & (dist > 0)]
+    scale = float(finite.mean()) if len(finite) else 1.0
+    start_time = time.time()
+    steps = 0
+    while True:
+        # Share of the budget used up, by time or by steps, whichever runs out first
+        # A budget of zero (or less) is already used up
+        if time_limit is None:
+            progress = 0.0
+        elif time_limit <= 0:
+            progress = 1.0
+        else:
+            progress = (time.time() - start_time) / time_limit
+        if max_steps is not None:
+            progress = max(progress, steps / max_steps)
+        if progress >= 1.0:
+            break
+        temperature = scale * START_TEMPERATURE * (END_TEMPERATURE / START_TEMPERATURE) ** progress
+        starts, ends = random_segments(rng, population_size, m)
+        candidates = reverse_segments(population, starts, ends)
+        candidate_lengths = population_lengths(dist, candidates)
+        delta = candidate_lengths - lengths
+        accept = (delta <= 0) | (rng.random(population_size) < np.exp(-np.maximum(delta, 0) / temperature))
+        population[accept] = candidates[accept]
+        lengths[accept] = candidate_lengths[accept]
+        best = int(np.argmin(lengths))
+        if lengths[best] < best_cost:
+            best_order, best_cost = population[best].copy(), float(lengths[best])
+        steps += 1
+
+    tour = [0] + best_order.tolist() + [0]
+    return tour, tour_length(dist, tour)
+
+
+def genetic_tour(dist, seed=None, time_limit=2.0, population_size=POPULATION_SIZE, max_generations=None):
+    """Genetic algorithm: tournament selection, OX crossover with a fixed segment length,
+    segment-reversal mutation and elitism, one array operation per stage for the whole
+    population. Returns (tour, cost) with tour = [0, ..., 0]; with a seed and only a
+    generation budget the result is reproducible."""
+    if time_limit is None and max_generations is None:
+        raise ValueError("The genetic algorithm needs a time limit or a generation budget")
+    dist = np.asarray(dist, dtype=np.float64)
+    n = len(dist)
+    if n <= 3:
+        return _small_instance(dist)
+    m = n - 1
+    rng = np.random.default_rng(seed)
+    population = _initial_population(dist, rng, population_size)
+    lengths = population_lengths(dist, population)
+    segment_length = max(1, m // 2)
+    children_count = population_size - ELITE_COUNT
+
+    start_time = time.time()
+    generations = 0
+    while max_generations is None or generations < max_generations:
+        if time_limit is not None and time.time() - start_time >= time_limit:
+            break
+        # Tournament selection: the shortest of TOURNAMENT_SIZE random individuals, per parent
+        entrants = rng.integers(0, population_size, (2 * children_count, TOURNAMENT_SIZE))
+        winners = entrants[np.arange(len(entrants)), np.argmin(lengths[entrants], axis=1)]
+        children = order_crossover(rng, population[winners[:children_count]], population[winners[children_count:]], segment_length)
+
+        mutate = rng.random(children_count) < MUTATION_RATE
+        if mutate.any():
+            starts, ends = random_segments(rng, int(mutate.sum()), m)
+            children[mutate] = reverse_segments(children[mutate], starts, ends)
+
+        elite = np.argsort(lengths)[:ELITE_COUNT]
+        population = np.vstack([population[elite], children])
+        lengths = np.concatenate([lengths[elite], population_lengths(dist, children)])
+        generations += 1
+
+    best = int(np.argmin(lengths))
+    tour = [0] + population[best].tolist() + [0]
+    return tour, tour_length(dist, tour)
@@ -0,0 +1,40 @@
+import json
+import numpy as np
+
+# First byte of a packed route; JSON route text always starts with '['
+PACKED_ROUTE_MAGIC = 0xA5
+
+
+def city_index(city):
+    """City id from a route entry: a letter ('C' -> 2) or an id already."""
+    if isinstance(city, str):
+        return ord(city.upper()) - ord('A')
+    return int(city)
+
+
+def city_letter(index):
+    return chr(ord('A') + index) if 0 <= index < 26 else str(index)
+
+
+def pack_route(route):
+    """A route of city letters or ids as bytes: the magic byte, the width of every id
+    (1 or 2 bytes) and the ids themselves, little-endian."""
+    ids = np.array([city_index(city) for city in route], dtype=np.int64)
+    if len(ids) and (ids.min() < 0 or ids.max() > 0xFFFF):
+        raise ValueError("Packed routes hold city ids from 0 to 65535")
+    width = 1 if not len(ids) or ids.max() <= 0xFF else 2
+    return bytes([PACKED_ROUTE_MAGIC, width]) + ids.astype(np.uint8 if width == 1 else '<u2').tobytes()
+
+
+def unpack_route(blob):
+    """City ids from a pack_route blob."""
+    if len(blob) < 2 or blob[0] != PACKED_ROUTE_MAGIC or blob[1] not in (1, 2):
+        raise ValueError("Not a packed route")
+    return np.frombuffer(blob[2:], dtype=np.uint8 if blob[1] == 1 else '<u2').tolist()
+
+
+def decode_route_column(value):
+    """A stored route column, packed or JSON text, as a list of city letters."""
+    if isinstance(value, (bytes, memoryview)):
+        return [city_letter(index) for index in unpack_route(bytes(value))]
+    return json.loads(value) if value else []
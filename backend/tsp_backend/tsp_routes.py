@@ -1,12 +1,28 @@
-from flask import Blueprint, request, jsonify
-from itertools import permutations, combinations
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from itertools import permutations
 import math
+import numpy as np
 import traceback
 import time
+import queue
+import threading
 import logging
 from tsp_backend.tsp_db import TSPDatabase
+from tsp_backend.tsp_distance import DistanceMatrix
+from tsp_backend.tsp_held_karp import held_karp_tour
+from tsp_backend.tsp_heuristics import nearest_neighbor_tour
+from tsp_backend.tsp_branch_bound import branch_and_bound_tour
+from tsp_backend.tsp_executor import resolve_algorithms, resolve_budgets, resolve_options
+from tsp_backend.tsp_stats import SolverStats
+from tsp_backend.tsp_session import sessions, solve_in_session
+from tsp_backend.tsp_lower_bound import held_karp_lower_bound, optimality_gap
+from tsp_backend.tsp_route_codec import decode_route_column
+from tsp_backend.tsp_cache import result_cache, solve_batch_cached, solve_cached
+from tsp_backend.tsp_euclidean import generate_euclidean_cities, solve_euclidean
 import random
 import json
+import html
+from urllib.parse import urlencode
 import sqlite3
 
 # Configure logging
@@ -16,313 +32,217 @@ logger = logging.getLogger(__name__)
 tsp_bp = Blueprint('tsp', __name__, url_prefix='/api')
 db = TSPDatabase()
 
+# Upper limit on instances in one /solve_tsp_batch request
+MAX_BATCH_INSTANCES = 10000
+# Upper limit on cities in one /solve_tsp_euclidean request
+MAX_EUCLIDEAN_CITIES = 200000
+# Rows per table on one /db_viewer page
+DB_VIEWER_PAGE_SIZE = 100
+MAX_DB_VIEWER_PAGE_SIZE = 1000
 
 
-def total_path_distance(path):
-    # This function calculates the total distance for a given route
-    distance = 0
-    for i in range(len(path)):
-        a = path[i]
-        b = path[(i + 1) % len(path)]  # This ensures the loop is closed
-        distance += calculate_distance(a, b)
-    return distance
 
-def tsp_nearest_neighbor(cities):
-    start_time = time.time()
-    n = len(cities)
-    home = cities[0]  # Home city
-    path = [home]  # Start with home
-    visited = {home['id']}  # Track visited cities
-    current = home
-    total_distance = 0
-
-    # Visit all cities except the last (home)
-    while len(path) < n - 1:
-        min_dist = float('inf')
-        next_city = None
-        # Find closest unvisited city
-        for city in cities[1:-1]:  # Skip home at start and end
-            if city['id'] not in visited:
-                dist = calculate_distance(current, city)
-                if dist < min_dist:
-                    min_dist = dist
-                    next_city = city
-        if next_city:
-            path.append(next_city)
-            visited.add(next_city['id'])
-            total_distance += min_dist
-            current = next_city
-
-    # Return to home
-    path.append(home)
-    total_distance += calculate_distance(current, home)
+def total_path_distance(path, distances):
+    # This function calculates the total distance for a given route (the loop is closed)
+    return distances.path_distance(path)
 
-    execution_time = time.time() - start_time
-    return path, total_distance, execution_time
+
+def tour_cities(cities):
+    # Routes come in as [home, ..., home]; the solvers visit each city once
+    if len(cities) > 1 and cities[-1]['id'] == cities[0]['id']:
+        return cities[:-1]
+    return cities
 
 
-def tsp_branch_and_bound(cities):
+def tsp_nearest_neighbor(cities, distances):
     start_time = time.time()
-    best_result = {'path': None, 'distance': float('inf')}
-
-    def find_mst(edges, vertices):
-        """Compute the weight of the Minimum Spanning Tree using Kruskal's algorithm."""
-        edges.sort(key=lambda x: x[2])
-        parent = {v: v for v in vertices}
-        rank = {v: 0 for v in vertices}
-
-        def find(v):
-            if parent[v] != v:
-                parent[v] = find(parent[v])
-            return parent[v]
-
-        def union(v1, v2):
-            root1, root2 = find(v1), find(v2)
-            if root1 != root2:
-                if rank[root1] < rank[root2]:
-                    parent[root1] = root2
-                elif rank[root1] > rank[root2]:
-                    parent[root2] = root1
-                else:
-                    parent[root2] = root1
-                    rank[root1] += 1
-
-        mst_weight = 0
-        for v1, v2, weight in edges:
-            if find(v1) != find(v2):
-                union(v1, v2)
-                mst_weight += weight
-        return mst_weight
-
-    def bound(current_path, visited, current_distance):
-        """Estimate lower bound: current distance + MST of unvisited cities + min edges to/from home."""
-        if not current_path:
-            return 0
-        last_city = current_path[-1]
-        remaining = [city for city in cities[1:] if city['id'] not in visited]
-        if not remaining:
-            return current_distance + calculate_distance(last_city, cities[0])
-        edges = []
-        vertices = [city['id'] for city in remaining]
-        for i, city1 in enumerate(remaining):
-            for j, city2 in enumerate(remaining[i+1:], i+1):
-                dist = calculate_distance(city1, city2)
-                edges.append((city1['id'], city2['id'], dist))
-        mst_weight = find_mst(edges, vertices) if edges else 0
-        min_to_unvisited = float('inf')
-        for city in remaining:
-            dist = calculate_distance(last_city, city)
-            if dist < min_to_unvisited:
-                min_to_unvisited = dist
-        min_to_home = float('inf')
-        for city in remaining:
-            dist = calculate_distance(city, cities[0])
-            if dist < min_to_home:
-                min_to_home = dist
-        return current_distance + min_to_unvisited + mst_weight + min_to_home
-
-    def branch(current_path, visited, current_distance):
-        estimate = bound(current_path, visited, current_distance)
-        if estimate >= best_result['distance']:
-            return
-        if len(current_path) == len(cities) - 1:
-            home = cities[0]
-            last_city = current_path[-1]
-            return_leg = calculate_distance(last_city, home)
-            total_distance = current_distance + return_leg
-            # Fix: Construct path with home city only once at the end
-            full_path = [home] + current_path
-            logger.debug("B&B candidate path:")
-            for i in range(len(full_path) - 1):
-                a = full_path[i]
-                b = full_path[i + 1]
-                logger.debug(f"BB: {a['id']} -> {b['id']}: {calculate_distance(a, b):.4f} km")
-            if total_distance < best_result['distance']:
-                best_result['distance'] = total_distance
-                best_result['path'] = full_path
-            return
-        for city in cities[1:]:
-            if city['id'] not in visited:
-                visited.add(city['id'])
-                last_city = current_path[-1] if current_path else cities[0]
-                dist = calculate_distance(last_city, city)
-                current_path.append(city)
-                branch(current_path, visited, current_distance + dist)
-                current_path.pop()
-                visited.remove(city['id'])
-
-    branch([], set(), 0)
+    route = tour_cities(cities)
+    tour, total_distance = nearest_neighbor_tour(distances.submatrix(route))
     execution_time = time.time() - start_time
-    return best_result['path'], best_result['distance'], execution_time
+    return [route[i] for i in tour], total_distance, execution_time
 
 
+def tsp_branch_and_bound(cities, distances, stats=None, time_limit=None, max_nodes=None, on_improve=None):
+    # Anytime search: with a time or node budget it returns the best tour found so far
+    start_time = time.time()
+    route = tour_cities(cities)
+    deadline = start_time + time_limit if time_limit is not None else None
+    improved = None
+    if on_improve is not None:
+        improved = lambda tour, distance: on_improve([route[i] for i in tour], distance)
+    tour, total_distance = branch_and_bound_tour(
+        distances.submatrix(route), stats=stats, deadline=deadline, max_nodes=max_nodes, on_improve=improved
+    )
+    execution_time = time.time() - start_time
+    return [route[i] for i in tour], total_distance, execution_time
+
 
-def tsp_held_karp(cities):
+def tsp_held_karp(cities, distances):
     start_time = time.time()
-    n = len(cities)
-    if n == 1:
-        return cities, 0, time.time() - start_time
-    dp = {}
-    parent = {}
-    for i in range(1, n):
-        dp[(1 << i, i)] = (calculate_distance(cities[0], cities[i]), 0)
-        parent[(1 << i, i)] = 0
-    for subset_size in range(2, n):
-        for subset in combinations(range(1, n), subset_size):
-            bits = sum(1 << i for i in subset)
-            for last in subset:
-                prev = bits ^ (1 << last)
-                min_dist = float('inf')
-                min_prev = None
-                for j in subset:
-                    if j == last:
-                        continue
-                    curr_dist = dp[(prev, j)][0] + calculate_distance(cities[j], cities[last])
-                    logger.debug(f"HK: {j} -> {last}: {calculate_distance(cities[j], cities[last]):.4f} km (partial sum: {curr_dist:.4f} km)")
-                    if curr_dist < min_dist:
-                        min_dist = curr_dist
-                        min_prev = j
-                dp[(bits, last)] = (min_dist, min_prev)
-                parent[(bits, last)] = min_prev
-    bits = (2 ** n - 1) ^ 1
-    min_dist = float('inf')
-    last = None
-    for i in range(1, n):
-        curr_dist = dp[(bits, i)][0] + calculate_distance(cities[i], cities[0])
-        logger.debug(f"HK: {i} -> 0: {calculate_distance(cities[i], cities[0]):.4f} km (final leg, total: {curr_dist:.4f} km)")
-        if curr_dist < min_dist:
-            min_dist = curr_dist
-            last = i
-    path = [0]
-    bits = (2 ** n - 1) ^ 1
-    current = last
-    for _ in range(n - 1):
-        path.append(current)
-        temp = parent[(bits, current)]
-        bits = bits ^ (1 << current)
-        current = temp
-    path = path[::-1]
-    path = [cities[i] for i in path]
-    logger.debug("Held-Karp final path:")
-    for i in range(len(path)):
-        a = path[i]
-        b = path[(i + 1) % len(path)]
-        d = calculate_distance(a, b)
-        if i == len(path) - 1:
-            logger.debug(f"HK: {a['id']} -> {b['id']} (last to home): {d:.4f} km")
-        else:
-            logger.debug(f"HK: {a['id']} -> {b['id']}: {d:.4f} km")
+    route = tour_cities(cities)
+    tour, min_dist = held_karp_tour(distances.submatrix(route))
+    path = [route[i] for i in tour]
     execution_time = time.time() - start_time
 
     return path, min_dist, execution_time
 
 
+def parse_tsp_request(data):
+    # Validates a solve payload and returns (selected_cities, distances); raises ValueError for a 400
+    distance_matrix_data = data.get('distances')
+    if not distance_matrix_data:
+        logger.error("Distance matrix not provided!")
+        raise ValueError('Distance matrix is required')
+
+    # Built once per request and handed to every solver
+    distances = DistanceMatrix.from_json(distance_matrix_data)
+
+    cities = data.get('cities')  # Full list of cities
+    home_city_char = data.get('home_city', None)  # Home city is now a character (A, B, C, ...)
+    human_route_chars = data.get('human_route', [])  # Human route is now a list of characters (A, B, C, ...)
+
+    if not cities:
+        logger.error("No cities provided in the request!")
+        raise ValueError('No cities provided')
+
+    if home_city_char is None or len(home_city_char) != 1 or not home_city_char.isalpha():
+        logger.error(f"Invalid home city: {home_city_char}")
+        raise ValueError('Invalid home city. Please provide a single character (A-J).')
+
+    # Convert the home city from a character (A, B, C, ...) to a numeric index
+    home_city_index = ord(home_city_char.upper()) - ord('A')  # Convert 'A' -> 0, 'B' -> 1, etc.
+
+    # Get the home city object based on the index
+    home_city = next((city for city in cities if city['id'] == home_city_index), None)
+    if home_city is None:
+        logger.error(f"Home city with index {home_city_index} not found in cities list!")
+        raise ValueError(f'Home city with index {home_city_index} not found in cities list!')
+
+    # Validate that all characters in human_route are valid (A-J)
+    if any(len(city) != 1 or not city.isalpha() for city in human_route_chars):
+        logger.error(f"Invalid human route characters: {human_route_chars}")
+        raise ValueError('Human route contains invalid characters. Please use single alphabetic characters (A-J).')
+
+    # Convert the human route characters (A, B, C, ...) back to the city indices
+    human_route_indices = [ord(city.upper()) - ord('A') for city in human_route_chars]  # Convert A -> 0, B -> 1, etc.
+
+    # Get the selected cities (excluding the home city from human route)
+    selected_cities = [city for city in cities if city['id'] in human_route_indices]
+
+    # Ensure the home city is at both ends of the path
+    selected_cities = [home_city] + selected_cities + [home_city]
+
+    # ✅ VALIDATE city IDs exist in the distance matrix
+    for city in selected_cities:
+        if city not in distances:
+            logger.error(f"City ID {city['id']} not found in distance matrix keys!")
+            raise ValueError(f"City ID {city['id']} not in distance matrix")
+
+    return selected_cities, distances
+
+
+def parse_route_format(data, formats=('full', 'compact')):
+    route_format = data.get('route_format', formats[0])
+    if route_format not in formats:
+        raise ValueError(f"route_format must be one of {', '.join(formats)}")
+    return route_format
+
+
+def build_solve_response(selected_cities, distances, results, budgets, route_format='full'):
+    # Turns solver results (tours of indices into the route) into the /solve_tsp response body.
+    # 'compact' sends the cities once and every route as indices into that table.
+    route = tour_cities(selected_cities)
+    response_data = {}
+    if route_format == 'compact':
+        response_data['cities'] = route
+    for name, result in results.items():
+        if result['tour'] is None:
+            path = None
+        elif route_format == 'compact':
+            path = result['tour']
+        else:
+            path = [route[i] for i in result['tour']]
+        entry = {
+            'route': path,
+            'distance': result['distance'],
+            'time': result['time'],
+            'status': result['status'],
+            'time_budget': budgets[name]
+        }
+        if result['stats']:
+            entry['stats'] = result['stats']
+        if 'error' in result:
+            entry['error'] = result['error']
+        if result.get('cached'):
+            entry['cached'] = True
+        response_data[name] = entry
+
+    # Check if human route matches the best algorithm route
+    found = [result['distance'] for result in results.values() if result['distance'] is not None]
+    best_algorithm_distance = min(found) if found else None
+    human_distance = total_path_distance(selected_cities, distances)
+
+    # Polynomial-time bound, so gaps are reported even when the exact solvers run out of time
+    start_time = time.time()
+    bound, iterations = held_karp_lower_bound(distances.submatrix(route), upper_bound=best_algorithm_distance)
+    response_data['lower_bound'] = {
+        'distance': bound,
+        'time': time.time() - start_time,
+        'iterations': iterations
+    }
+    if 'nearest_neighbor' in response_data:
+        response_data['nearest_neighbor']['gap'] = optimality_gap(response_data['nearest_neighbor']['distance'], bound)
+
+    response_data['human_route'] = {
+        'distance': human_distance,  # Now including home at both ends
+        'gap': optimality_gap(human_distance, bound)
+    }
+
+    # With no tour from any solver there is nothing to beat: the round is neither won nor lost
+    response_data['solved'] = best_algorithm_distance is not None
+    if best_algorithm_distance is None:
+        response_data['message'] = "No algorithm found a route in time, so this round can't be scored."
+    elif human_distance <= best_algorithm_distance:
+        response_data['message'] = "Congratulations! You matched the best algorithm's route!"
+    else:
+        response_data['message'] = "Nice try! The algorithm found a shorter route."
+    return response_data
+
+
 @tsp_bp.route('/solve_tsp', methods=['POST'])
 def solve_tsp():
     try:
         data = request.json
-        
-        distance_matrix_data = data.get('distances')
-        if not distance_matrix_data:
-            logger.error("Distance matrix not provided!")
-            return jsonify({'error': 'Distance matrix is required'}), 400
-
-        set_distance_matrix(distance_matrix_data)
-
-
-
-        cities = data.get('cities')  # Full list of cities
-        player_name = data.get('player_name', 'Anonymous')
-        home_city_char = data.get('home_city', None)  # Home city is now a character (A, B, C, ...)
-        human_route_chars = data.get('human_route', [])  # Human route is now a list of characters (A, B, C, ...)
-
-        if not cities:
-            logger.error("No cities provided in the request!")
-            return jsonify({'error': 'No cities provided'}), 400
-
-        if home_city_char is None or len(home_city_char) != 1 or not home_city_char.isalpha():
-            logger.error(f"Invalid home city: {home_city_char}")
-            return jsonify({'error': 'Invalid home city. Please provide a single character (A-J).'}), 400
-
-        # Convert the home city from a character (A, B, C, ...) to a numeric index
-        home_city_index = ord(home_city_char.upper()) - ord('A')  # Convert 'A' -> 0, 'B' -> 1, etc.
-
-        # Get the home city object based on the index
-        home_city = next((city for city in cities if city['id'] == home_city_index), None)
-        if home_city is None:
-            logger.error(f"Home city with index {home_city_index} not found in cities list!")
-            return jsonify({'error': f'Home city with index {home_city_index} not found in cities list!'}), 400
-
-        # Validate that all characters in human_route are valid (A-J)
-        if any(len(city) != 1 or not city.isalpha() for city in human_route_chars):
-            logger.error(f"Invalid human route characters: {human_route_chars}")
-            return jsonify({'error': 'Human route contains invalid characters. Please use single alphabetic characters (A-J).'}), 400
-
-        # Convert the human route characters (A, B, C, ...) back to the city indices
-        human_route_indices = [ord(city.upper()) - ord('A') for city in human_route_chars]  # Convert A -> 0, B -> 1, etc.
-
-        # Get the selected cities (excluding the home city from human route)
-        selected_cities = [city for city in cities if city['id'] in human_route_indices]
-
-        # Ensure the home city is at both ends of the path
-        selected_cities = [home_city] + selected_cities + [home_city]
-
-        if len(selected_cities) < 2:
-            return jsonify({'error': 'At least two cities must be selected for the path'}), 400
-
-        # ✅ VALIDATE city IDs exist in the distance matrix
-# ✅ VALIDATE city IDs exist in the distance matrix
-        for city in selected_cities:
-            city_id_str = str(city['id'])
-            if city_id_str not in distance_matrix:
-                logger.error(f"City ID {city_id_str} not found in distance_matrix keys!")
-                logger.debug(f"Available keys in distance_matrix: {list(distance_matrix.keys())}")
-                return jsonify({'error': f"City ID {city_id_str} not in distance matrix"}), 400
-
-
-        # Perform TSP calculations only on selected cities (which include home city at both ends)
-        nn_path, nn_distance, nn_time = tsp_nearest_neighbor(selected_cities)
-        bb_path, bb_distance, bb_time = tsp_branch_and_bound(selected_cities)
-        hk_path, hk_distance, hk_time = tsp_held_karp(selected_cities)
-
-        # Check if human route matches the best algorithm route
-        best_algorithm_distance = min(nn_distance, bb_distance, hk_distance)
-        human_distance = total_path_distance(selected_cities)
-
-        response_data = {
-            'nearest_neighbor': {
-                'route': nn_path,
-                'distance': nn_distance,
-                'time': nn_time
-            },
-            'branch_bound': {
-                'route': bb_path,
-                'distance': bb_distance,
-                'time': bb_time
-            },
-            'held_karp': {
-                'route': hk_path,
-                'distance': hk_distance,
-                'time': hk_time
-            },
-            'human_route': {
-                'distance': human_distance  # Now including home at both ends
-            },
-            'message': ""  # Placeholder for a message if the human matches the best algorithm
-        }
 
-        if human_distance <= best_algorithm_distance:
-            response_data['message'] = "Congratulations! You matched the best algorithm's route!"
+        try:
+            selected_cities, distances = parse_tsp_request(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        try:
+            budgets = resolve_budgets(data.get('time_budget'))
+            algorithms = resolve_algorithms(data.get('algorithms'))
+            options = resolve_options(
+                data.get('held_karp_mode'), bool(data.get('trace')), data.get('seed'), data.get('nearest_neighbor_mode'),
+                data.get('iterations')
+            )
+            route_format = parse_route_format(data)
+            # Optional: repeat solves in one session reuse the work of the previous city set
+            session_id = data.get('session_id')
+            if session_id is not None and (not isinstance(session_id, str) or not 0 < len(session_id) <= 128):
+                raise ValueError('session_id must be a non-empty string of at most 128 characters')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Run every solver concurrently on the selected cities (home once, index 0)
+        route = tour_cities(selected_cities)
+        dist = distances.submatrix(route)
+        if session_id is not None:
+            ids = [city['id'] for city in route]
+            results = solve_in_session(sessions.get(session_id), ids, dist, algorithms, budgets, options)
         else:
-            response_data['message'] = "Nice try! The algorithm found a shorter route."
-
-        logger.debug("Human route distances:")
-        for i in range(len(selected_cities)):
-            a = selected_cities[i]
-            b = selected_cities[(i + 1) % len(selected_cities)]
-            d = calculate_distance(a, b)
-            logger.debug(f"Human: {a['id']} -> {b['id']}: {d:.4f} km")
-
+            results = solve_cached(dist, algorithms, budgets, options=options)
+        response_data = build_solve_response(selected_cities, distances, results, budgets, route_format)
         return jsonify(response_data)
 
     except Exception as e:
@@ -331,6 +251,169 @@ def solve_tsp():
         return jsonify({'error': f"Error in solve_tsp: {str(e)}"}), 500
 
 
+@tsp_bp.route('/solve_tsp_batch', methods=['POST'])
+def solve_tsp_batch():
+    # Many /solve_tsp payloads at once; streams one JSON object per line (NDJSON) as each finishes
+    data = request.json or {}
+    instances = data.get('instances')
+    if not isinstance(instances, list) or not instances:
+        return jsonify({'error': 'instances must be a non-empty list'}), 400
+    if len(instances) > MAX_BATCH_INSTANCES:
+        return jsonify({'error': f'At most {MAX_BATCH_INSTANCES} instances per batch'}), 400
+    try:
+        budgets = resolve_budgets(data.get('time_budget'))
+        algorithms = resolve_algorithms(data.get('algorithms'))
+        options = resolve_options(
+            data.get('held_karp_mode'), bool(data.get('trace')), data.get('seed'), data.get('nearest_neighbor_mode'),
+            data.get('iterations')
+        )
+        route_format = parse_route_format(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    parsed = {}
+    invalid = []
+    for index, instance in enumerate(instances):
+        try:
+            parsed[index] = parse_tsp_request(instance or {})
+        except (ValueError, TypeError, AttributeError, KeyError) as e:
+            invalid.append({'index': index, 'error': str(e)})
+
+    def stream():
+        for line in invalid:
+            yield json.dumps(line) + "\n"
+        dists = {
+            index: distances.submatrix(tour_cities(selected_cities))
+            for index, (selected_cities, distances) in parsed.items()
+        }
+        for index, results in solve_batch_cached(dists, algorithms, budgets, options=options):
+            selected_cities, distances = parsed[index]
+            line = build_solve_response(selected_cities, distances, results, budgets, route_format)
+            line['index'] = index
+            yield json.dumps(line) + "\n"
+
+    return Response(stream(), mimetype='application/x-ndjson')
+
+
+@tsp_bp.route('/tsp_cache_stats', methods=['GET'])
+def tsp_cache_stats():
+    return jsonify(result_cache.stats())
+
+
+def parse_euclidean_request(data):
+    """Coordinates from a /solve_tsp_euclidean payload: explicit `coordinates` or a seeded
+    random instance of `num_cities`. Raises ValueError on bad input."""
+    if data.get('coordinates') is not None:
+        try:
+            coords = np.asarray(data['coordinates'], dtype=np.float64)
+        except (TypeError, ValueError):
+            raise ValueError('coordinates must be a list of [x, y] pairs')
+        if coords.ndim != 2 or coords.shape[1] != 2 or len(coords) == 0:
+            raise ValueError('coordinates must be a list of [x, y] pairs')
+        if not np.isfinite(coords).all():
+            raise ValueError('coordinates must be finite numbers')
+    else:
+        num_cities = data.get('num_cities')
+        if isinstance(num_cities, bool) or not isinstance(num_cities, int) or num_cities <= 0:
+            raise ValueError('Provide coordinates or a positive integer num_cities')
+        coords = None
+    count = len(coords) if coords is not None else num_cities
+    if count > MAX_EUCLIDEAN_CITIES:
+        raise ValueError(f'At most {MAX_EUCLIDEAN_CITIES} cities per request')
+    if coords is None:
+        coords = generate_euclidean_cities(num_cities, seed=data.get('seed'))
+    return coords
+
+
+@tsp_bp.route('/solve_tsp_euclidean', methods=['POST'])
+def solve_tsp_euclidean():
+    # Large instances given as points: distances are computed on demand instead of stored
+    data = request.json or {}
+    try:
+        coords = parse_euclidean_request(data)
+        time_budget = data.get('time_budget', 5.0)
+        if isinstance(time_budget, bool) or not isinstance(time_budget, (int, float)) or time_budget <= 0:
+            raise ValueError('time_budget must be a positive number of seconds')
+        start_time = time.time()
+        tour, distance, construction_distance = solve_euclidean(
+            coords,
+            construction=data.get('construction', 'greedy_edge'),
+            improve=bool(data.get('improve', True)),
+            time_limit=float(time_budget),
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in solve_tsp_euclidean: {str(e)}")
+        return jsonify({'error': f"Error in solve_tsp_euclidean: {str(e)}"}), 500
+
+    return jsonify({
+        'tour': tour,
+        'distance': distance,
+        'construction_distance': construction_distance,
+        'time': time.time() - start_time,
+        'num_cities': len(coords),
+    })
+
+
+def sse_event(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+@tsp_bp.route('/solve_tsp_stream', methods=['POST'])
+def solve_tsp_stream():
+    # Same payload as /solve_tsp; streams every improved branch-and-bound route as Server-Sent Events
+    data = request.json or {}
+    try:
+        selected_cities, distances = parse_tsp_request(data)
+        time_limit = resolve_budgets(data.get('time_budget'))['branch_bound']
+        node_budget = data.get('node_budget')
+        if node_budget is not None and (isinstance(node_budget, bool) or not isinstance(node_budget, int) or node_budget <= 0):
+            raise ValueError('node_budget must be a positive integer')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    events = queue.Queue()
+    start_time = time.time()
+
+    def on_improve(path, distance):
+        events.put(('incumbent', {'route': path, 'distance': distance, 'elapsed': time.time() - start_time}))
+
+    def search():
+        try:
+            stats = SolverStats(trace=bool(data.get('trace')))
+            path, distance, execution_time = tsp_branch_and_bound(
+                selected_cities, distances, stats=stats,
+                time_limit=time_limit, max_nodes=node_budget, on_improve=on_improve
+            )
+            events.put(('done', {
+                'route': path,
+                'distance': distance,
+                'time': execution_time,
+                'status': 'exact' if stats.complete else 'best_so_far',
+                'stats': stats.as_dict()
+            }))
+        except Exception as e:
+            logger.error(f"Error in solve_tsp_stream: {str(e)}")
+            events.put(('error', {'error': f"Error in solve_tsp_stream: {str(e)}"}))
+
+    threading.Thread(target=search, daemon=True).start()
+
+    def stream():
+        while True:
+            event, payload = events.get()
+            yield sse_event(event, payload)
+            if event != 'incumbent':
+                break
+
+    return Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+
+def optional_round(value, digits):
+    # A solver that timed out or failed reports no distance or time; it is stored as NULL
+    return round(float(value), digits) if value is not None else None
+
+
 @tsp_bp.route('/save_game_session', methods=['POST'])
 def save_game_session():
     try:
@@ -340,17 +423,24 @@ def save_game_session():
         player_name = data.get('player_name')
         home_city_char = data.get('home_city')
         selected_cities = data.get('selected_cities')
-        nn_distance = round(float(data.get('nn_distance')), 2)
-        bb_distance = round(float(data.get('bb_distance')), 2)
-        hk_distance = round(float(data.get('hk_distance')), 2)
-        nn_time = round(float(data.get('nn_time')), 2)
-        bb_time = round(float(data.get('bb_time')), 2)
-        hk_time = round(float(data.get('hk_time')), 2)
+        nn_distance = optional_round(data.get('nn_distance'), 2)
+        bb_distance = optional_round(data.get('bb_distance'), 2)
+        hk_distance = optional_round(data.get('hk_distance'), 2)
+        nn_time = optional_round(data.get('nn_time'), 2)
+        bb_time = optional_round(data.get('bb_time'), 2)
+        hk_time = optional_round(data.get('hk_time'), 2)
 
         # 🆕 Extract the routes
         nn_route = data.get('nn_route', [])
         bb_route = data.get('bb_route', [])
         hk_route = data.get('hk_route', [])
+        # Per-algorithm work counters from the /solve_tsp response, if the client sent them
+        solver_stats = data.get('solver_stats')
+        try:
+            # 'packed' stores the routes as compact BLOBs instead of JSON text
+            packed_routes = parse_route_format(data, ('json', 'packed')) == 'packed'
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
         # Save to DB including routes
         game_session_id = db.record_game_session(
@@ -365,7 +455,9 @@ def save_game_session():
             hk_time,
             nn_route,
             bb_route,
-            hk_route
+            hk_route,
+            solver_stats,
+            packed_routes=packed_routes
         )
 
         return jsonify({"message": "Game session saved successfully!", "session_id": game_session_id}), 200
@@ -388,16 +480,23 @@ def save_win():
         selected_cities = data.get('selected_cities')
         human_route = data.get('human_route')
         human_distance = round(float(data.get('human_distance')), 1)
-        nn_distance = round(float(data.get('nn_distance')), 1)
-        bb_distance = round(float(data.get('bb_distance')), 1)
-        hk_distance = round(float(data.get('hk_distance')), 1)
-        nn_time = round(float(data.get('nn_time')), 1)
-        bb_time = round(float(data.get('bb_time')), 1)
-        hk_time = round(float(data.get('hk_time')), 1)
+        nn_distance = optional_round(data.get('nn_distance'), 1)
+        bb_distance = optional_round(data.get('bb_distance'), 1)
+        hk_distance = optional_round(data.get('hk_distance'), 1)
+        nn_time = optional_round(data.get('nn_time'), 1)
+        bb_time = optional_round(data.get('bb_time'), 1)
+        hk_time = optional_round(data.get('hk_time'), 1)
 
         nn_route = data.get('nn_route', [])
         bb_route = data.get('bb_route', [])
         hk_route = data.get('hk_route', [])
+        # Per-algorithm work counters from the /solve_tsp response, if the client sent them
+        solver_stats = data.get('solver_stats')
+        try:
+            # 'packed' stores the routes as compact BLOBs instead of JSON text
+            packed_routes = parse_route_format(data, ('json', 'packed')) == 'packed'
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
         session_id = data.get('session_id')
 
@@ -414,7 +513,9 @@ def save_win():
             hk_time,
             nn_route,
             bb_route,
-            hk_route
+            hk_route,
+            solver_stats,
+            packed_routes=packed_routes
         )
 
         # Insert the win player data into the win_players table
@@ -433,14 +534,7 @@ def save_win():
         return jsonify({"error": f"Error saving win data: {str(e)}"}), 500
 
 
-
-@tsp_bp.route('/db_viewer', methods=['GET'])
-def db_viewer():
-    try:
-        game_sessions = db.get_all_sessions()
-        win_players = db.get_all_win_players()
-
-        html = """
+DB_VIEWER_HEAD = """
         <html>
         <head>
             <title>Database Viewer - Travelling Salesman Game</title>
@@ -587,31 +681,12 @@ def db_viewer():
                             <th>HK Route</th>
                             <th>Timestamp</th>
                         </tr>
-        """
-
-        for session in game_sessions:
-            html += f"""
-                <tr>
-                    <td>{session[0]}</td>
-                    <td>{session[1]}</td>
-                    <td>{session[2]}</td>
-                    <td>{session[3]}</td>
-                    <td>{session[4]}</td>
-                    <td>{session[5]}</td>
-                    <td>{session[6]}</td>
-                    <td>{session[7]}</td>
-                    <td>{session[8]}</td>
-                    <td>{session[9]}</td>
-                    <td>{session[10]}</td>
-                    <td>{session[11]}</td>
-                    <td>{session[12]}</td>
-                    <td>{session[13]}</td>
-                </tr>
-            """
-
-        html += """
+"""
+DB_VIEWER_TABLE_END = """
                     </table>
                 </div>
+"""
+DB_VIEWER_WIN_PLAYERS_HEAD = """
                 <h2>Win Players</h2>
                 <div class="table-wrapper">
                     <table class="win-players-table">
@@ -621,59 +696,67 @@ def db_viewer():
                             <th>Human Distance</th>
                             <th>Session ID</th>
                         </tr>
-        """
-
-        for win_player in win_players:
-            html += f"""
-                <tr>
-                    <td>{win_player[0]}</td>
-                    <td>{win_player[1]}</td>
-                    <td>{win_player[2]}</td>
-                    <td>{win_player[3]}</td>
-                </tr>
-            """
-
-        html += """
-                    </table>
-                </div>
+"""
+DB_VIEWER_TAIL = """
             </div>
         </body>
         </html>
-        """
+"""
 
-        return html
-    except Exception as e:
-        return f"Error viewing database: {str(e)}", 500
-
-
-# Global holder (in memory for now)
-distance_matrix = {}
-
-def set_distance_matrix(matrix):
-    global distance_matrix
-    distance_matrix = {
-        str(k): {str(sub_k): v for sub_k, v in sub.items()}
-        for k, sub in matrix.items()
-    }
 
+@tsp_bp.route('/db_viewer', methods=['GET'])
+def db_viewer():
+    # One page of each table, streamed row by row; the "next page" links carry keyset cursors,
+    # so a deep page costs the same as the first one
+    page_size = request.args.get('page_size', DB_VIEWER_PAGE_SIZE, type=int)
+    if not 0 < page_size <= MAX_DB_VIEWER_PAGE_SIZE:
+        return f"page_size must be between 1 and {MAX_DB_VIEWER_PAGE_SIZE}", 400
+    before_time = request.args.get('before_time')
+    before_id = request.args.get('before_id', type=int)
+    before = (before_time, before_id) if before_time is not None and before_id is not None else None
+    players_after = request.args.get('players_after', type=int)
+
+    def page_link(label, **cursors):
+        params = {'page_size': page_size, 'before_time': before_time, 'before_id': before_id, 'players_after': players_after}
+        params.update(cursors)
+        query = urlencode({key: value for key, value in params.items() if value is not None})
+        return f'<p><a href="?{html.escape(query)}">{label} &rarr;</a></p>'
+
+    def row(cells):
+        # NULL cells (a solver without a result) are left blank
+        return "<tr>" + "".join(f"<td>{html.escape('' if cell is None else str(cell))}</td>" for cell in cells) + "</tr>\n"
+
+    def render():
+        try:
+            yield DB_VIEWER_HEAD
+            # One row past the page tells us whether there is a next page
+            last = None
+            for count, session in enumerate(db.iter_sessions_page(before, page_size + 1)):
+                if count == page_size:
+                    yield DB_VIEWER_TABLE_END + page_link("Older sessions", before_time=last[13], before_id=last[0])
+                    break
+                last = session
+                routes = [json.dumps(decode_route_column(session[i])) for i in (10, 11, 12)]
+                yield row(list(session[:10]) + routes + [session[13]])
+            else:
+                yield DB_VIEWER_TABLE_END
+
+            yield DB_VIEWER_WIN_PLAYERS_HEAD
+            for count, win_player in enumerate(db.iter_win_players_page(players_after, page_size + 1)):
+                if count == page_size:
+                    yield DB_VIEWER_TABLE_END + page_link("More win players", players_after=last[4])
+                    break
+                last = win_player
+                yield row(win_player[:4])
+            else:
+                yield DB_VIEWER_TABLE_END
+            yield DB_VIEWER_TAIL
+        except Exception as e:
+            # Headers are already sent; end the page with the error instead of a 500
+            logger.error(f"Error viewing database: {str(e)}")
+            yield f"<p>Error viewing database: {html.escape(str(e))}</p>" + DB_VIEWER_TAIL
 
-
-def calculate_distance(a, b):
-    global distance_matrix
-
-    a_id = str(a['id'])
-    b_id = str(b['id'])
-
-    try:
-        d = distance_matrix[a_id][b_id]
-        if d is None:
-            logger.warning(f"Distance between {a_id} and {b_id} is None (possibly same city)")
-            return 0.0
-        return d
-    except KeyError as e:
-        logger.error(f"City ID {e} not found in distance_matrix keys!")
-        logger.debug(f"Available keys in distance_matrix: {list(distance_matrix.keys())}")
-        raise
+    return Response(stream_with_context(render()), mimetype='text/html')
 
 
 def generate_city_list():
@@ -700,7 +783,6 @@ def get_city_distances():
     try:
         cities = generate_city_list()
         matrix = generate_random_distance_matrix()
-        set_distance_matrix(matrix)  # <- This sets the global matrix
 
         return jsonify({
             'cities': cities,
@@ -714,40 +796,22 @@ def get_city_distances():
 @tsp_bp.route('/tsp_assets/get_algorithm_stats', methods=['GET'])
 def get_algorithm_stats():
     try:
-        # Fetch the most recent 10 game sessions
-        game_sessions = db.get_all_sessions()[:10]  # Already ordered by timestamp DESC
+        # The 10 most recent sessions, newest first; only the columns the chart needs
+        game_sessions = db.get_recent_session_stats(10)
         if not game_sessions:
             return jsonify({'error': 'No game sessions found'}), 404
 
         # Reverse the sessions so the most recent is last (will be round 10)
         game_sessions = list(reversed(game_sessions))
 
-        # Prepare data for the chart
-        nn_times = []
-        bb_times = []
-        hk_times = []
-        city_counts = []  # List to store the number of cities selected (excluding home city)
+        # Prepare data for the chart (times are stored in seconds, charted in milliseconds)
+        # A solver that timed out or failed in a round has no time (a gap in the chart)
+        nn_times = [float(session[0]) * 1000 if session[0] is not None else None for session in game_sessions]
+        bb_times = [float(session[1]) * 1000 if session[1] is not None else None for session in game_sessions]
+        hk_times = [float(session[2]) * 1000 if session[2] is not None else None for session in game_sessions]
+        city_counts = [session[3] for session in game_sessions]  # Cities selected (excluding home city)
         rounds = list(range(1, min(len(game_sessions) + 1, 11)))  # Game rounds 1 to 10
 
-        for session in game_sessions:
-            # session indices: nn_time=7, bb_time=8, hk_time=9 (convert seconds to milliseconds)
-            nn_times.append(float(session[7]) * 1000)  # Convert to milliseconds
-            bb_times.append(float(session[8]) * 1000)
-            hk_times.append(float(session[9]) * 1000)
-
-            # session[3] is selected_cities, a JSON string like ['B', 'C']
-            
-            try:
-                selected_cities = json.loads(session[3])
-                if selected_cities:
-                    # Count all cities in the route
-                    city_counts.append(len(selected_cities))
-                else:
-                    city_counts.append(0)
-            except json.JSONDecodeError:
-                logger.error(f"Error parsing selected_cities: {session[3]}")
-                city_counts.append(0)
-
         # If fewer than 10 sessions, pad with zeros
         while len(nn_times) < 10:
             nn_times.append(0)
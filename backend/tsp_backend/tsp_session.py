@@ -0,0 +1,222 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from tsp_backend.tsp_cache import lookup_exact, merge_exact, solve_cached
+from tsp_backend.tsp_executor import DEFAULT_ALGORITHMS, resolve_budgets, solve_concurrently
+from tsp_backend.tsp_held_karp import SolverTimeout, held_karp_tables, relax_layer, subset_layers, trace_tour
+from tsp_backend.tsp_stats import SolverStats
+
+# Sessions kept at once; the least recently used one is dropped first
+MAX_SESSIONS = 64
+# Instances outside this range are solved without keeping any state (16 cities is ~4 MB of tables)
+MIN_SESSION_CITIES = 3
+MAX_SESSION_CITIES = 16
+# Solvers seeded from the session's state (previous optimum and Held-Karp tables)
+SESSION_ALGORITHMS = ('branch_bound', 'held_karp')
+
+
+def remove_city(dp, parent, bit_index):
+    """Held-Karp tables without one city: the rows of masks that never visit it, minus its column."""
+    m = dp.shape[1]
+    compact = np.arange(1 << (m - 1), dtype=np.int64)
+    low = (1 << bit_index) - 1
+    rows = (compact & low) | ((compact >> bit_index) << (bit_index + 1))
+    cols = [c for c in range(m) if c != bit_index]
+    new_dp = dp[rows][:, cols]
+    new_parent = parent[rows][:, cols]
+    new_parent[new_parent > bit_index] -= 1
+    return new_dp, new_parent
+
+
+def add_city(dp, parent, dist, deadline=None, stats=None):
+    """Held-Karp tables with one more city, the last row and column of `dist`.
+
+    The new city takes the top bit, so every existing row stays valid as it is and only
+    the masks containing the new city are computed.
+    """
+    m = dp.shape[1]
+    top = 1 << m
+    new_dp = np.full((top << 1, m + 1), np.inf)
+    new_parent = np.zeros((top << 1, m + 1), dtype=np.int8)
+    new_dp[:top, :m] = dp
+    new_parent[:top, :m] = parent
+    new_dp[top, m] = dist[0, m + 1]
+    for size, masks in enumerate(subset_layers(m)[1:], start=2):
+        if deadline is not None and time.time() > deadline:
+            raise SolverTimeout("Held-Karp ran out of time")
+        relax_layer(new_dp, new_parent, top | masks, dist)
+        if stats is not None:
+            stats.dp_cells += size * len(masks)
+    return new_dp, new_parent
+
+
+def insert_cheapest(dist, tour, city):
+    """Insert city into a closed tour where it adds the least distance."""
+    a = np.array(tour[:-1])
+    b = np.array(tour[1:])
+    added = dist[a, city] + dist[city, b] - dist[a, b]
+    k = int(np.argmin(added)) + 1
+    return tour[:k] + [city] + tour[k:]
+
+
+class SolverSession:
+    """State kept between one player's solves while they edit their city set.
+
+    `ids` are the city ids in table order (home first); `dist`, `dp` and `parent` are the
+    Held-Karp tables over them, and `tour` is the last optimal tour as city ids.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.ids = None
+        self.dist = None
+        self.dp = None
+        self.parent = None
+        self.tour = None
+
+    def seed_tour(self, ids, dist):
+        """The previous optimum fitted to a new city set, as indices into `ids`: dropped
+        cities are shortcut and new ones inserted where they cost least."""
+        if self.tour is None or self.tour[0] != ids[0]:
+            return None
+        position = {city: i for i, city in enumerate(ids)}
+        tour = [position[city] for city in self.tour if city in position]
+        for index in range(1, len(ids)):
+            if index not in tour:
+                tour = insert_cheapest(dist, tour, index)
+        return tour
+
+    def held_karp(self, ids, dist, deadline=None, stats=None):
+        """Optimal tour over `ids` (home first), reusing the stored tables when the set only
+        gained or lost cities. Returns (tour as indices into ids, cost, how the tables
+        were updated: 'unchanged', 'incremental' or 'cold')."""
+        update = self._update_tables(ids, dist, deadline, stats)
+        tour, cost = trace_tour(self.dp, self.parent, self.dist)
+        self.tour = [self.ids[i] for i in tour]
+        position = {city: i for i, city in enumerate(ids)}
+        return [position[city] for city in self.tour], cost, update
+
+    def _update_tables(self, ids, dist, deadline, stats):
+        position = {city: i for i, city in enumerate(ids)}
+        if self.ids is not None and self.ids[0] == ids[0]:
+            kept = [city for city in self.ids if city in position]
+            kept_old = [i for i, city in enumerate(self.ids) if city in position]
+            kept_new = [position[city] for city in kept]
+            # Cities whose distances changed invalidate every row that visits them
+            if len(kept) >= MIN_SESSION_CITIES and np.array_equal(
+                dist[np.ix_(kept_new, kept_new)], self.dist[np.ix_(kept_old, kept_old)]
+            ):
+                if len(kept) == len(self.ids) == len(ids):
+                    return 'unchanged'
+                dp, parent = self.dp, self.parent
+                # Highest index first so the lower bit positions stay put
+                for index in reversed(range(1, len(self.ids))):
+                    if self.ids[index] not in position:
+                        dp, parent = remove_city(dp, parent, index - 1)
+                order = list(kept)
+                for city in ids:
+                    if city not in order:
+                        order.append(city)
+                        rows = [position[c] for c in order]
+                        dp, parent = add_city(dp, parent, dist[np.ix_(rows, rows)], deadline, stats)
+                rows = [position[c] for c in order]
+                self.ids, self.dist, self.dp, self.parent = order, dist[np.ix_(rows, rows)], dp, parent
+                return 'incremental'
+
+        dp, parent = held_karp_tables(dist, deadline, stats)
+        self.ids, self.dist, self.dp, self.parent = list(ids), dist, dp, parent
+        return 'cold'
+
+
+class SessionStore:
+    """Bounded, thread-safe map of session id to SolverSession (least recently used goes first)."""
+
+    def __init__(self, max_sessions=MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = SolverSession()
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+
+sessions = SessionStore()
+
+
+def _run_in_session(solve, budget, options):
+    start_time = time.time()
+    stats = SolverStats(trace=options.get('trace', False))
+    try:
+        tour, cost, status, update = solve(start_time + budget, stats)
+    except SolverTimeout as e:
+        return {'tour': None, 'distance': None, 'time': time.time() - start_time, 'status': 'timed_out',
+                'stats': stats.as_dict(), 'error': str(e)}
+    data = stats.as_dict()
+    data['session_update'] = update
+    return {'tour': tour, 'distance': cost, 'time': time.time() - start_time, 'status': status, 'stats': data}
+
+
+def solve_in_session(session, ids, dist, algorithms=None, budgets=None, options=None):
+    """solve_cached for a player session: branch and bound starts from the previous
+    optimum and serial Held-Karp extends or trims the previous tables; `ids` are the city
+    ids of the rows of `dist`, home first.
+
+    The session's Held-Karp runs in a thread of this process (its tables live here) while
+    every other solver, seeded branch and bound included, runs in the pool at the same time.
+    The parallel and out-of-core Held-Karp modes keep no session tables and run in the pool.
+    """
+    algorithms = algorithms or DEFAULT_ALGORITHMS
+    budgets = budgets or resolve_budgets()
+    options = options or {}
+    dist = np.asarray(dist, dtype=np.float64)
+    if not MIN_SESSION_CITIES <= len(ids) <= MAX_SESSION_CITIES:
+        with session.lock:
+            session.reset()
+        return solve_cached(dist, algorithms, budgets, options=options)
+
+    start_time = time.time()
+    lookup, to_run = lookup_exact(dist, algorithms)
+    with session.lock:
+        seed = session.seed_tour(ids, dist)
+    in_session = 'held_karp' in to_run and options.get('held_karp_mode', 'serial') == 'serial'
+    pooled = [name for name in to_run if not (in_session and name == 'held_karp')]
+    pooled_options = dict(options, initial_tour=seed) if seed and 'branch_bound' in pooled else options
+
+    def held_karp(deadline, stats):
+        with session.lock:
+            tour, cost, update = session.held_karp(ids, dist, deadline, stats)
+        return tour, cost, 'exact', update
+
+    with ThreadPoolExecutor(max_workers=1) as thread:
+        future = thread.submit(_run_in_session, held_karp, budgets['held_karp'], options) if in_session else None
+        results = solve_concurrently(dist, pooled, budgets, pooled_options) if pooled else {}
+        if future is not None:
+            results['held_karp'] = future.result()
+    if 'branch_bound' in pooled and results['branch_bound']['tour'] is not None:
+        results['branch_bound']['stats']['session_update'] = 'reseeded' if seed else 'cold'
+    merge_exact(lookup, results, time.time() - start_time)
+
+    # Keep the optimum (fresh or cached) to seed the next solve
+    solved = next((results[name] for name in SESSION_ALGORITHMS
+                   if name in results and results[name]['status'] == 'exact'), None)
+    if solved is not None:
+        with session.lock:
+            session.tour = [ids[i] for i in solved['tour']]
+    return {name: results[name] for name in algorithms}
@@ -0,0 +1,35 @@
+# Most trace entries one solver run keeps; later events are dropped
+TRACE_LIMIT = 10000
+
+
+class SolverStats:
+    """Work counters for one solver run, plus an optional event trace.
+
+    Solvers count in local variables inside their loops and add the totals here when
+    they finish, so the counters cost nothing on the hot path. `trace` is None unless
+    tracing was asked for, and solvers only build trace entries behind that check.
+    """
+
+    COUNTERS = ('dp_cells', 'bb_nodes', 'prunes', 'bound_evals')
+    __slots__ = COUNTERS + ('complete', 'trace')
+
+    def __init__(self, trace=False):
+        self.dp_cells = 0
+        self.bb_nodes = 0
+        self.prunes = 0
+        self.bound_evals = 0
+        # Set by anytime solvers: False when a budget stopped the search early
+        self.complete = None
+        self.trace = [] if trace else None
+
+    def record(self, event, **fields):
+        if self.trace is not None and len(self.trace) < TRACE_LIMIT:
+            self.trace.append(dict(fields, event=event))
+
+    def as_dict(self):
+        data = {name: getattr(self, name) for name in self.COUNTERS}
+        if self.complete is not None:
+            data['complete'] = self.complete
+        if self.trace is not None:
+            data['trace'] = self.trace
+        return data
@@ -0,0 +1,109 @@
+import numpy as np
+
+# Explicit weight layouts, as (which triangle is listed row by row, whether the diagonal is included).
+# The column-wise layouts of a symmetric matrix list the same numbers as the opposite row-wise ones.
+EDGE_WEIGHT_LAYOUTS = {
+    'UPPER_ROW': ('upper', False),
+    'LOWER_COL': ('upper', False),
+    'LOWER_ROW': ('lower', False),
+    'UPPER_COL': ('lower', False),
+    'UPPER_DIAG_ROW': ('upper', True),
+    'LOWER_DIAG_COL': ('upper', True),
+    'LOWER_DIAG_ROW': ('lower', True),
+    'UPPER_DIAG_COL': ('lower', True),
+}
+SECTIONS = ('NODE_COORD_SECTION', 'EDGE_WEIGHT_SECTION', 'DISPLAY_DATA_SECTION', 'FIXED_EDGES_SECTION', 'TOUR_SECTION')
+
+
+class TSPInstance:
+    """A named instance: dense distance matrix (city 0 is home), optional coordinates and,
+    when known, the optimal tour length."""
+
+    def __init__(self, name, dist, coords=None, optimum=None, kind='tsplib'):
+        self.name = name
+        self.dist = np.asarray(dist, dtype=np.float64)
+        self.coords = coords
+        self.optimum = optimum
+        self.kind = kind
+
+    def __len__(self):
+        return len(self.dist)
+
+
+def euc_2d_matrix(coords):
+    """TSPLIB EUC_2D distances: Euclidean distance rounded to the nearest integer."""
+    coords = np.asarray(coords, dtype=np.float64)
+    diff = coords[:, None, :] - coords[None, :, :]
+    return np.floor(np.sqrt((diff ** 2).sum(axis=2)) + 0.5)
+
+
+def _explicit_matrix(values, n, layout):
+    if layout == 'FULL_MATRIX':
+        if len(values) < n * n:
+            raise ValueError(f"FULL_MATRIX needs {n * n} weights, got {len(values)}")
+        return np.array(values[:n * n], dtype=np.float64).reshape(n, n)
+    if layout not in EDGE_WEIGHT_LAYOUTS:
+        raise ValueError(f"Unsupported EDGE_WEIGHT_FORMAT: {layout}")
+    triangle, diagonal = EDGE_WEIGHT_LAYOUTS[layout]
+    offset = 0 if diagonal else 1
+    if triangle == 'upper':
+        i, j = np.triu_indices(n, offset)
+    else:
+        i, j = np.tril_indices(n, -offset)
+    if len(values) < len(i):
+        raise ValueError(f"{layout} needs {len(i)} weights, got {len(values)}")
+    dist = np.zeros((n, n))
+    dist[i, j] = values[:len(i)]
+    dist[j, i] = values[:len(i)]
+    return dist
+
+
+def parse_tsplib(text, optimum=None):
+    """Parse a TSPLIB .tsp file (TYPE TSP or ATSP, EDGE_WEIGHT_TYPE EXPLICIT or EUC_2D)."""
+    header = {}
+    sections = {}
+    current = None
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line or line == 'EOF':
+            continue
+        keyword = line.split(':')[0].strip().upper()
+        if keyword in SECTIONS:
+            current = keyword
+            sections[current] = []
+        elif current is None or ':' in line:
+            if ':' not in line:
+                raise ValueError(f"Malformed TSPLIB header line: {line}")
+            key, value = line.split(':', 1)
+            header[key.strip().upper()] = value.strip()
+            current = None
+        else:
+            sections[current].extend(line.split())
+
+    if 'DIMENSION' not in header:
+        raise ValueError("TSPLIB file has no DIMENSION")
+    n = int(header['DIMENSION'])
+    if header.get('TYPE', 'TSP').split()[0].upper() not in ('TSP', 'ATSP'):
+        raise ValueError(f"Unsupported TSPLIB TYPE: {header['TYPE']}")
+    weight_type = header.get('EDGE_WEIGHT_TYPE', '').upper()
+
+    coords = None
+    if weight_type == 'EUC_2D':
+        numbers = np.array(sections.get('NODE_COORD_SECTION', []), dtype=np.float64)
+        if len(numbers) < 3 * n:
+            raise ValueError(f"NODE_COORD_SECTION needs {n} nodes")
+        coords = numbers[:3 * n].reshape(n, 3)[:, 1:]
+        dist = euc_2d_matrix(coords)
+    elif weight_type == 'EXPLICIT':
+        values = [float(v) for v in sections.get('EDGE_WEIGHT_SECTION', [])]
+        dist = _explicit_matrix(values, n, header.get('EDGE_WEIGHT_FORMAT', 'FULL_MATRIX').upper())
+    else:
+        raise ValueError(f"Unsupported EDGE_WEIGHT_TYPE: {weight_type or 'missing'}")
+
+    np.fill_diagonal(dist, 0.0)
+    return TSPInstance(header.get('NAME', 'unnamed'), dist, coords, optimum)
+
+
+def load_tsplib(path, optimum=None):
+    with open(path) as f:
+        return parse_tsplib(f.read(), optimum)
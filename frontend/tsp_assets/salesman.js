@@ -28,6 +28,8 @@ homeCityIcon.onerror = () => {
 };
 
 let cities = [];
+// Lets the backend reuse the previous solve while the player edits their city set
+const solverSessionId = Math.random().toString(36).slice(2);
 let playerRoute = [];
 let nnRoute = [];
 let bbRoute = [];
@@ -444,7 +446,8 @@ function compareWithAlgorithms() {
         player_name: playerName,
         home_city: homeCityChar,
         human_route: selectedCityChars,
-        distances: distanceMatrix
+        distances: distanceMatrix,
+        session_id: solverSessionId
     };
 
     fetch('http://127.0.0.1:5000/api/solve_tsp', {
@@ -461,7 +464,7 @@ function compareWithAlgorithms() {
         console.log("API response:", data);
         const idToCity = (c) => typeof c === 'object' ? cities.find(city => city.id === c.id) : cities.find(city => city.id === c);
 
-        if (data.nearest_neighbor && !data.nearest_neighbor.error) {
+        if (data.nearest_neighbor && !data.nearest_neighbor.error && data.nearest_neighbor.route) {
             nnRoute = data.nearest_neighbor.route.map(idToCity);
             const nnDistanceElement = document.getElementById("nnDistance");
             const nnTimeElement = document.getElementById("nnTime");
@@ -483,7 +486,7 @@ function compareWithAlgorithms() {
             }
         }
 
-        if (data.branch_bound && !data.branch_bound.error) {
+        if (data.branch_bound && !data.branch_bound.error && data.branch_bound.route) {
             bbRoute = data.branch_bound.route.map(idToCity);
             const bbDistanceElement = document.getElementById("bbDistance");
             const bbTimeElement = document.getElementById("bbTime");
@@ -505,7 +508,7 @@ function compareWithAlgorithms() {
             }
         }
 
-        if (data.held_karp && !data.held_karp.error) {
+        if (data.held_karp && !data.held_karp.error && data.held_karp.route) {
             hkRoute = data.held_karp.route.map(idToCity);
             const hkDistanceElement = document.getElementById("hkDistance");
             const hkTimeElement = document.getElementById("hkTime");
@@ -540,7 +543,10 @@ function compareWithAlgorithms() {
             parseFloat(hkDistance) || Infinity
         );
 
-        if (humanDistanceNum <= bestAlgorithmDistance) {
+        if (data.solved === false) {
+            // Every solver timed out or failed: nothing to compare against, so no win and no save
+            resultMessage = data.message;
+        } else if (humanDistanceNum <= bestAlgorithmDistance) {
             resultMessage = "Congratulations! You found the shortest route!";
             saveWinToDatabase(data, humanDistance, selectedCityChars);
         } else {
@@ -575,6 +581,20 @@ function toCharRoute(route) {
     ];
 }
 
+// A solver's route as city letters; empty when it timed out or failed without one
+function resultCharRoute(result) {
+    return result && result.route ? result.route.map(c => String.fromCharCode(65 + c.id)) : [];
+}
+
+// Per-algorithm work counters from the /solve_tsp response, saved with the session
+function resultSolverStats(data) {
+    return {
+        nearest_neighbor: data.nearest_neighbor.stats || null,
+        branch_bound: data.branch_bound.stats || null,
+        held_karp: data.held_karp.stats || null,
+    };
+}
+
 function saveGameSessionToDatabase(data, selectedCityIds) {
     const requestData = {
         player_name: playerName,
@@ -586,9 +606,10 @@ function saveGameSessionToDatabase(data, selectedCityIds) {
         nn_time: data.nearest_neighbor.time,
         bb_time: data.branch_bound.time,
         hk_time: data.held_karp.time,
-        nn_route: data.nearest_neighbor.route.map(c => String.fromCharCode(65 + c.id)),
-        bb_route: data.branch_bound.route.map(c => String.fromCharCode(65 + c.id)),
-        hk_route: data.held_karp.route.map(c => String.fromCharCode(65 + c.id)),
+        nn_route: resultCharRoute(data.nearest_neighbor),
+        bb_route: resultCharRoute(data.branch_bound),
+        hk_route: resultCharRoute(data.held_karp),
+        solver_stats: resultSolverStats(data),
     };
 
     fetch('http://127.0.0.1:5000/api/save_game_session', {
@@ -619,9 +640,10 @@ function saveWinToDatabase(data, humanDistance, humanRoute) {
         nn_time: data.nearest_neighbor.time,
         bb_time: data.branch_bound.time,
         hk_time: data.held_karp.time,
-        nn_route: data.nearest_neighbor.route.map(c => String.fromCharCode(65 + c.id)),
-        bb_route: data.branch_bound.route.map(c => String.fromCharCode(65 + c.id)),
-        hk_route: data.held_karp.route.map(c => String.fromCharCode(65 + c.id)),
+        nn_route: resultCharRoute(data.nearest_neighbor),
+        bb_route: resultCharRoute(data.branch_bound),
+        hk_route: resultCharRoute(data.held_karp),
+        solver_stats: resultSolverStats(data),
     };
 
     fetch('http://127.0.0.1:5000/api/save_win', {